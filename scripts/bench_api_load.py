@@ -0,0 +1,69 @@
+"""Load-test the API in-process at increasing concurrency levels."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+import ia_sarah.core.interfaces.api.server as server  # noqa: E402
+from ia_sarah.core.use_cases import controllers  # noqa: E402
+
+
+async def _carga(total: int, concorrencia: int, alunos: int) -> float:
+    transport = ASGITransport(app=server.app)
+    sem = asyncio.Semaphore(concorrencia)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def req(i: int) -> None:
+            async with sem:
+                resp = await client.get(f"/students/{i % alunos + 1}")
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(req(i) for i in range(total)))
+        return total / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Print requests/sec for each concurrency level."""
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--alunos", type=int, default=1000)
+    parser.add_argument(
+        "--latencia",
+        type=float,
+        default=0.0,
+        help="Extra seconds per DB call, simulating slow storage",
+    )
+    parser.add_argument("--niveis", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        controllers.db.DB_NAME = str(Path(tmp) / "bench.db")
+        controllers.init_app()
+        for i in range(args.alunos):
+            controllers.adicionar_aluno(f"Aluno {i}", f"aluno{i}@bench.com")
+        if args.latencia:
+            obter = controllers.obter_aluno
+
+            def lento(aluno_id: int):
+                time.sleep(args.latencia)
+                return obter(aluno_id)
+
+            controllers.obter_aluno = lento  # type: ignore[assignment]
+        for nivel in args.niveis:
+            rps = asyncio.run(_carga(args.requests, nivel, args.alunos))
+            print(f"concorrência {nivel:>3}: {rps:,.0f} req/s")
+        controllers.db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compare batch plan export against one export call per plan."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ia_sarah.core.use_cases import controllers  # noqa: E402
+
+
+def main() -> None:
+    """Print plans/sec for sequential and batch PDF export."""
+    parser = argparse.ArgumentParser(description="Benchmark batch export")
+    parser.add_argument("--alunos", type=int, default=500)
+    parser.add_argument("--exercicios", type=int, default=40)
+    parser.add_argument("--processos", type=int, default=0)
+    args = parser.parse_args()
+
+    exercicios = json.dumps(
+        [
+            {"nome": f"Exercício {i}", "series": 4, "reps": 12, "obs": "2-0-2"}
+            for i in range(args.exercicios)
+        ]
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        controllers.db.DB_NAME = str(Path(tmp) / "batch.db")
+        controllers.init_app()
+        for i in range(args.alunos):
+            aluno_id = controllers.adicionar_aluno(f"Aluno {i}", f"a{i}@bench.com")
+            controllers.adicionar_plano(aluno_id, "Semana", "", exercicios)
+
+        start = time.perf_counter()
+        for aluno in controllers.db.iterar_alunos(com_planos=True):
+            for p in aluno[9]:
+                controllers.exportar_treino(
+                    "pdf", p[1], p[3], Path(tmp) / f"seq_{p[0]}.pdf"
+                )
+        sequencial = args.alunos / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        controllers.exportar_treinos_lote(
+            Path(tmp) / "turma.zip", processos=args.processos or None
+        )
+        lote = args.alunos / (time.perf_counter() - start)
+        controllers.db.close_pool()
+
+    print(f"sequencial: {sequencial:,.0f} planos/s")
+    print(f"lote: {lote:,.0f} planos/s ({lote / sequencial:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark repository throughput with and without the connection pool."""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ia_sarah.core.adapters.repositories import db  # noqa: E402
+
+
+def _obter_aluno_sem_pool(aluno_id: int) -> tuple | None:
+    """Previous behaviour: open a fresh connection for every call."""
+    with sqlite3.connect(db.DB_NAME) as conn:
+        conn.execute("PRAGMA foreign_keys = ON")
+        cur = conn.execute(
+            "SELECT id, nome, email, data_inicio, plano, pagamento, "
+            "progresso, dieta, treino FROM alunos WHERE id=?",
+            (aluno_id,),
+        )
+        return cur.fetchone()
+
+
+def _run(func, total: int, threads: int, alunos: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda i: func(i % alunos + 1), range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Print requests/sec for point lookups before and after pooling."""
+    parser = argparse.ArgumentParser(description="Benchmark SQLite access")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--alunos", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = str(Path(tmp) / "bench.db")
+        db.init_db()
+        for i in range(args.alunos):
+            db.adicionar_aluno(f"Aluno {i}", f"aluno{i}@bench.com")
+
+        antes = _run(_obter_aluno_sem_pool, args.requests, args.threads, args.alunos)
+        depois = _run(db.obter_aluno, args.requests, args.threads, args.alunos)
+        db.close_pool()
+
+    print(f"sem pool: {antes:,.0f} req/s")
+    print(f"com pool: {depois:,.0f} req/s ({depois / antes:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
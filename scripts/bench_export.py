@@ -0,0 +1,61 @@
+"""Measure time to first chunk and peak memory of the student export."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ia_sarah.core.adapters.services.importers import CAMPOS_ALUNO  # noqa: E402
+from ia_sarah.core.use_cases import controllers  # noqa: E402
+
+
+def _popular(alunos: int) -> None:
+    lote = 10_000
+    for inicio in range(0, alunos, lote):
+        registros = [
+            (f"Aluno {i}", f"aluno{i}@bench.com", "2024-01-01", "Mensal", "Pix")
+            + (None,) * (len(CAMPOS_ALUNO) - 5)
+            for i in range(inicio, min(inicio + lote, alunos))
+        ]
+        controllers.db.adicionar_alunos_lote(registros)
+
+
+def main() -> None:
+    """Print time to first chunk, throughput and peak traced memory."""
+    parser = argparse.ArgumentParser(description="Benchmark streaming export")
+    parser.add_argument("--alunos", type=int, default=1_000_000)
+    parser.add_argument("--formato", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        controllers.db.DB_NAME = str(Path(tmp) / "export.db")
+        controllers.init_app()
+        _popular(args.alunos)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        primeiro = None
+        total = 0
+        for chunk in controllers.exportar_alunos(args.formato, args.lote):
+            if primeiro is None:
+                primeiro = time.perf_counter() - start
+            total += len(chunk)
+        elapsed = time.perf_counter() - start
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        controllers.db.close_pool()
+
+    print(f"primeiro bloco: {primeiro * 1000:.1f} ms")
+    print(f"{args.alunos:,} alunos em {elapsed:.1f}s ({total / 2**20:,.0f} MiB)")
+    print(f"pico de memória: {pico / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
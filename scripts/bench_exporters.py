@@ -0,0 +1,53 @@
+"""Measure time and peak memory of CSV/XLSX exports of very long plans."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Iterator
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ia_sarah.core.adapters.services.exporters import get_exporter  # noqa: E402
+
+
+def _exercicios(linhas: int) -> Iterator[dict]:
+    for i in range(linhas):
+        yield {
+            "nome": f"Exercício {i}",
+            "series": 4,
+            "reps": 12,
+            "peso": f"{i % 100} kg",
+            "descanso": "60s",
+        }
+
+
+def main() -> None:
+    """Print duration and peak traced memory per format."""
+    parser = argparse.ArgumentParser(description="Benchmark streaming exporters")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--formatos", nargs="+", default=["csv", "xlsx"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formatos:
+            destino = Path(tmp) / f"plano.{fmt}"
+            tracemalloc.start()
+            start = time.perf_counter()
+            get_exporter(fmt).export("Plano", _exercicios(args.linhas), destino)
+            elapsed = time.perf_counter() - start
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            tamanho = destino.stat().st_size / 2**20
+            print(
+                f"{fmt}: {args.linhas:,} linhas em {elapsed:.1f}s, "
+                f"{tamanho:,.1f} MiB, pico de memória {pico / 2**20:.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
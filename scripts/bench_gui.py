@@ -0,0 +1,82 @@
+"""Compare the old QTableWidget student list with the paged table model."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem  # noqa: E402
+
+from ia_sarah.core.interfaces.views.gui_qt import AlunosPage  # noqa: E402
+from ia_sarah.core.use_cases import controllers  # noqa: E402
+
+
+def _tabela_antiga() -> QTableWidget:
+    """Fill a QTableWidget the way ``AlunosPage.load_data`` used to."""
+    table = QTableWidget(0, 3)
+    for row, aluno in enumerate(controllers.listar_alunos()):
+        table.insertRow(row)
+        for col, value in enumerate((aluno.id, aluno.nome, aluno.email)):
+            table.setItem(row, col, QTableWidgetItem(str(value)))
+    return table
+
+
+def _medir(app: QApplication, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    app.processEvents()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Print the time to show the roster and to apply one edit."""
+    parser = argparse.ArgumentParser(description="Benchmark the student table")
+    parser.add_argument("--alunos", type=int, default=50_000)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        controllers.db.DB_NAME = str(Path(tmp) / "gui.db")
+        controllers.init_app()
+        controllers.db.adicionar_alunos_lote(
+            [
+                (f"Aluno {i:06}", f"aluno{i}@bench.com") + (None,) * 6
+                for i in range(args.alunos)
+            ]
+        )
+
+        antiga = _medir(app, _tabela_antiga)
+        page = None
+
+        def abrir() -> None:
+            nonlocal page
+            page = AlunosPage()
+            page.show()
+
+        nova = _medir(app, abrir)
+        aluno_id = page.model.student_at(0).id
+
+        def editar() -> None:
+            aluno = controllers.atualizar_aluno_campos(aluno_id, {"nome": "Aluno 0z"})
+            page.model.update_student(page.model.row_of(aluno_id), aluno)
+
+        incremental = _medir(app, editar)
+        recarga = _medir(app, _tabela_antiga)
+        controllers.db.close_pool()
+
+    print(f"{args.alunos:,} alunos")
+    print(f"QTableWidget completo: {antiga * 1000:,.0f} ms")
+    print(f"modelo paginado:       {nova * 1000:,.0f} ms ({antiga / nova:.0f}x)")
+    print(f"edição com recarga:    {recarga * 1000:,.0f} ms")
+    print(f"edição incremental:    {incremental * 1000:,.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
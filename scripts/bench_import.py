@@ -0,0 +1,63 @@
+"""Benchmark the bulk student import against row-by-row inserts."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ia_sarah.core.use_cases import controllers  # noqa: E402
+
+
+def _gerar_csv(path: Path, linhas: int) -> None:
+    with path.open("w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["nome", "email", "plano", "pagamento"])
+        for i in range(linhas):
+            writer.writerow([f"Aluno {i}", f"aluno{i}@bench.com", "Mensal", "Pix"])
+
+
+def main() -> None:
+    """Print rows/sec for the bulk importer and for single inserts."""
+    parser = argparse.ArgumentParser(description="Benchmark bulk import")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument(
+        "--amostra",
+        type=int,
+        default=5000,
+        help="Rows inserted one by one for comparison",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = Path(tmp) / "alunos.csv"
+        _gerar_csv(arquivo, args.linhas)
+
+        controllers.db.DB_NAME = str(Path(tmp) / "lote.db")
+        controllers.init_app()
+        start = time.perf_counter()
+        report = controllers.importar_alunos_arquivo(arquivo, args.lote)
+        lote = report.inseridos / (time.perf_counter() - start)
+
+        controllers.db.DB_NAME = str(Path(tmp) / "unitario.db")
+        controllers.init_app()
+        start = time.perf_counter()
+        for i in range(args.amostra):
+            controllers.adicionar_aluno_completo(
+                f"Aluno {i}", f"aluno{i}@bench.com", plano="Mensal", pagamento="Pix"
+            )
+        unitario = args.amostra / (time.perf_counter() - start)
+        controllers.db.close_pool()
+
+    print(f"importação em lote: {report.inseridos:,} linhas, {lote:,.0f} linhas/s")
+    print(f"inserção unitária: {unitario:,.0f} linhas/s ({lote / unitario:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
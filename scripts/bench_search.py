@@ -0,0 +1,70 @@
+"""Benchmark full-text search latency on a large database."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ia_sarah.core.adapters.repositories import db  # noqa: E402
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Hugo"]
+EXERCICIOS = ["Supino", "Agachamento", "Remada", "Leg press", "Rosca", "Prancha"]
+DESCRICOES = ["Treino de força", "Hipertrofia", "Resistência", "Mobilidade"]
+
+
+def main() -> None:
+    """Print median and p95 latency for a set of search terms."""
+    parser = argparse.ArgumentParser(description="Benchmark search")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_NAME = str(Path(tmp) / "bench.db")
+        db.init_db()
+        db.adicionar_alunos_lote(
+            [
+                (f"{NOMES[i % 8]} {i}", f"aluno{i}@bench.com", "2024-01-01")
+                + (None,) * 5
+                for i in range(args.linhas)
+            ]
+        )
+        with db.get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO planos (aluno_id, nome, descricao, exercicios)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        i + 1,
+                        f"Plano {i}",
+                        DESCRICOES[i % 4],
+                        json.dumps([{"nome": EXERCICIOS[i % 6]}]),
+                    )
+                    for i in range(args.linhas)
+                ),
+            )
+
+        for termo in ["ana", "fabio 123", "agach", "remada força", "aluno99"]:
+            tempos = []
+            for _ in range(args.repeticoes):
+                start = time.perf_counter()
+                db.buscar(termo)
+                tempos.append((time.perf_counter() - start) * 1000)
+            tempos.sort()
+            p95 = tempos[int(len(tempos) * 0.95) - 1]
+            print(
+                f"{termo!r:>16}: mediana {statistics.median(tempos):.2f} ms,"
+                f" p95 {p95:.2f} ms"
+            )
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
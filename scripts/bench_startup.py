@@ -0,0 +1,61 @@
+"""Measure import time of the CLI and API entry modules with ``-X importtime``."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _importtime(modulo: str) -> dict[str, int]:
+    """Return the cumulative import time in microseconds of every module."""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    tempos: dict[str, int] = {}
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:") :].split("|")
+        tempos[nome.strip()] = int(acumulado)
+    return tempos
+
+
+def main() -> None:
+    """Print the median import time of each module and its heaviest imports."""
+    parser = argparse.ArgumentParser(description="Benchmark startup imports")
+    parser.add_argument(
+        "modulos",
+        nargs="*",
+        default=["ia_sarah.core.cli", "ia_sarah.core.interfaces.api.server"],
+    )
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for modulo in args.modulos:
+        amostras = [_importtime(modulo) for _ in range(args.repeticoes)]
+        total = statistics.median(a[modulo] for a in amostras) / 1000
+        print(f"{modulo}: {total:.1f} ms (mediana de {args.repeticoes})")
+        ultima = amostras[-1]
+        pesados = sorted(
+            (n for n in ultima if "." not in n and n != modulo.split(".")[0]),
+            key=ultima.__getitem__,
+            reverse=True,
+        )
+        for nome in pesados[: args.top]:
+            print(f"  {nome:<24} {ultima[nome] / 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
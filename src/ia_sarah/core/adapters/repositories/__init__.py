@@ -1 +1,2 @@
+from ia_sarah.core.adapters.repositories.backup import *  # noqa: F401,F403
 from ia_sarah.core.adapters.repositories.db import *  # noqa: F401,F403
@@ -0,0 +1,222 @@
+"""Online backups of the SQLite database: compression, rotation, restore."""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from ia_sarah.core import events
+from ia_sarah.core.adapters.repositories import db
+
+logger = logging.getLogger(__name__)
+
+# Directory used by scheduled backups.
+BACKUP_DIR: Path = Path(os.getenv("BACKUP_DIR", str(db.DB_DIR / "backups")))
+# Seconds between scheduled backups; ``0`` disables the scheduler.
+BACKUP_INTERVAL: float = float(os.getenv("BACKUP_INTERVAL", "0"))
+# Number of scheduled backups kept in ``BACKUP_DIR``.
+BACKUP_KEEP: int = int(os.getenv("BACKUP_KEEP", "7"))
+
+PREFIXO = "ia_sarah-"
+
+Progresso = Callable[[int, int], None]
+
+
+def _comprimido(path: Path) -> bool:
+    return path.suffix == ".gz"
+
+
+def criar_backup(
+    dest: Path | str,
+    comprimir: bool | None = None,
+    progresso: Progresso | None = None,
+) -> Path:
+    """Write a consistent backup of the live database to ``dest``.
+
+    Parameters
+    ----------
+    dest:
+        Target file.
+    comprimir:
+        Gzip the backup. Defaults to ``True`` when ``dest`` ends in ``.gz``.
+    progresso:
+        Optional ``callback(copiadas, total)`` called after each page step.
+    """
+    path = Path(dest)
+    if comprimir is None:
+        comprimir = _comprimido(path)
+    if not comprimir:
+        db.backup_database(path, progresso=progresso)
+        return path
+    with tempfile.TemporaryDirectory(dir=path.parent) as tmp:
+        bruto = Path(tmp) / "backup.sqlite"
+        db.backup_database(bruto, progresso=progresso)
+        parcial = Path(tmp) / "backup.sqlite.gz"
+        try:
+            with bruto.open("rb") as src, gzip.open(parcial, "wb") as out:
+                shutil.copyfileobj(src, out, 1 << 20)
+            os.replace(parcial, path)
+        except OSError as exc:
+            logger.error("Erro ao comprimir backup: %s", exc)
+            raise
+    return path
+
+
+def listar_backups(diretorio: Path | str = BACKUP_DIR) -> list[Path]:
+    """Return scheduled backups in ``diretorio``, oldest first."""
+    diretorio = Path(diretorio)
+    if not diretorio.is_dir():
+        return []
+    return sorted(
+        p
+        for p in diretorio.iterdir()
+        if p.name.startswith(PREFIXO)
+        and (p.name.endswith(".sqlite") or p.name.endswith(".sqlite.gz"))
+    )
+
+
+def rotacionar_backups(
+    diretorio: Path | str = BACKUP_DIR, manter: int = BACKUP_KEEP
+) -> list[Path]:
+    """Delete all but the ``manter`` newest backups and return the removed."""
+    antigos = listar_backups(diretorio)[:-manter] if manter > 0 else []
+    for path in antigos:
+        try:
+            path.unlink()
+        except OSError as exc:  # pragma: no cover - I/O
+            logger.error("Erro ao remover backup %s: %s", path, exc)
+    return antigos
+
+
+def backup_rotativo(
+    diretorio: Path | str = BACKUP_DIR,
+    manter: int = BACKUP_KEEP,
+    comprimir: bool = True,
+    progresso: Progresso | None = None,
+) -> Path:
+    """Create a timestamped backup in ``diretorio`` and rotate old ones."""
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    nome = PREFIXO + datetime.now().strftime("%Y%m%d-%H%M%S-%f") + ".sqlite"
+    if comprimir:
+        nome += ".gz"
+    path = criar_backup(diretorio / nome, comprimir, progresso)
+    rotacionar_backups(diretorio, manter)
+    return path
+
+
+def verificar_integridade(path: Path | str) -> list[str]:
+    """Return the problems reported by ``PRAGMA integrity_check``.
+
+    An empty list means the database file is sound.
+    """
+    conn = sqlite3.connect(f"file:{Path(path)}?mode=ro", uri=True)
+    try:
+        resultado = [r[0] for r in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    return [] if resultado == ["ok"] else resultado
+
+
+def restaurar_backup(origem: Path | str, progresso: Progresso | None = None) -> None:
+    """Replace the live database with the backup at ``origem``.
+
+    The backup (gzip or plain) is checked with ``PRAGMA integrity_check``
+    before anything is touched; pooled connections are closed and the data
+    is copied in with the backup API, then pending migrations are applied.
+
+    Raises
+    ------
+    ValueError
+        When the backup is not a valid SQLite database or fails the
+        integrity check.
+    """
+    origem = Path(origem)
+    with tempfile.TemporaryDirectory() as tmp:
+        if _comprimido(origem):
+            bruto = Path(tmp) / "restore.sqlite"
+            try:
+                with gzip.open(origem, "rb") as src, bruto.open("wb") as out:
+                    shutil.copyfileobj(src, out, 1 << 20)
+            except (OSError, EOFError) as exc:
+                raise ValueError(f"Backup inválido: {exc}") from exc
+        else:
+            bruto = origem
+        try:
+            problemas = verificar_integridade(bruto)
+        except sqlite3.DatabaseError as exc:
+            raise ValueError(f"Backup inválido: {exc}") from exc
+        if problemas:
+            raise ValueError("Backup corrompido: " + "; ".join(problemas[:5]))
+
+        def _step(status: int, remaining: int, total: int) -> None:
+            if progresso is not None:
+                progresso(total - remaining, total)
+
+        db.close_pool()
+        try:
+            fonte = sqlite3.connect(bruto)
+            try:
+                target = sqlite3.connect(db.DB_NAME, timeout=db.DB_POOL_TIMEOUT)
+                try:
+                    fonte.backup(target, pages=db.BACKUP_PAGES, progress=_step)
+                finally:
+                    target.close()
+            finally:
+                fonte.close()
+        except sqlite3.Error as exc:
+            logger.error("Erro ao restaurar backup: %s", exc)
+            raise
+    db.init_db()
+    events.publish(events.DADOS, events.RESET)
+
+
+class BackupScheduler:
+    """Thread running :func:`backup_rotativo` every ``intervalo`` seconds."""
+
+    def __init__(
+        self,
+        intervalo: float = BACKUP_INTERVAL,
+        diretorio: Path | str = BACKUP_DIR,
+        manter: int = BACKUP_KEEP,
+        comprimir: bool = True,
+    ) -> None:
+        self.intervalo = intervalo
+        self.diretorio = Path(diretorio)
+        self.manter = manter
+        self.comprimir = comprimir
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.intervalo):
+            try:
+                path = backup_rotativo(self.diretorio, self.manter, self.comprimir)
+                logger.info("Backup agendado criado em %s", path)
+            except (OSError, sqlite3.Error) as exc:
+                logger.error("Falha no backup agendado: %s", exc)
+
+    def start(self) -> None:
+        """Start the scheduler thread if it is not running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="backup-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler and wait for a running backup to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+import queue
+import re
 import sqlite3
-import shutil
+import sys
+import threading
+from contextlib import closing, contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterator, Optional, Sequence, cast
+
+from ia_sarah.core import events
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +22,88 @@ DB_DIR: Path = Path(__file__).resolve().parents[5] / "data"
 DB_DIR.mkdir(parents=True, exist_ok=True)
 DB_NAME: str = str(DB_DIR / "db.sqlite")
 
-MIGRATIONS: list[str] = [
+# Maximum number of simultaneous connections per database file.
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+# Seconds to wait for a free connection before giving up.
+DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Prepared statements kept per connection by ``sqlite3``.
+DB_STATEMENT_CACHE: int = int(os.getenv("DB_STATEMENT_CACHE", "128"))
+# Pages copied per step by ``backup_database``.
+BACKUP_PAGES: int = int(os.getenv("BACKUP_PAGES", "1024"))
+
+# Normalized exercises, see ``_migrar_exercicios``. ``extras`` holds what
+# the TEXT columns cannot hold as given: unknown keys and non-string values,
+# as a JSON object merged back over the columns.
+_EXERCICIOS_TABELA = """
+    DROP TRIGGER IF EXISTS planos_busca_ai;
+    DROP TRIGGER IF EXISTS planos_busca_au;
+    CREATE TABLE IF NOT EXISTS exercicios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        plano_id INTEGER NOT NULL,
+        ordem INTEGER NOT NULL,
+        nome TEXT,
+        series TEXT,
+        reps TEXT,
+        peso TEXT,
+        descanso TEXT,
+        obs TEXT,
+        extras TEXT,
+        FOREIGN KEY(plano_id) REFERENCES planos(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_exercicios_plano ON exercicios(plano_id, ordem);
+"""
+
+_EXERCICIOS_GATILHOS = """
+    CREATE TRIGGER IF NOT EXISTS planos_busca_ai AFTER INSERT ON planos BEGIN
+        INSERT INTO planos_busca(rowid, nome, descricao)
+            VALUES (new.id, new.nome, new.descricao);
+    END;
+    CREATE TRIGGER IF NOT EXISTS planos_busca_au
+    AFTER UPDATE OF nome, descricao ON planos BEGIN
+        UPDATE planos_busca SET nome = new.nome, descricao = new.descricao
+            WHERE rowid = new.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS exercicios_busca_ai
+    AFTER INSERT ON exercicios BEGIN
+        UPDATE planos_busca SET exercicios = (
+            SELECT group_concat(nome, ' ') FROM exercicios
+            WHERE plano_id = new.plano_id
+        ) WHERE rowid = new.plano_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS exercicios_busca_ad
+    AFTER DELETE ON exercicios BEGIN
+        UPDATE planos_busca SET exercicios = (
+            SELECT group_concat(nome, ' ') FROM exercicios
+            WHERE plano_id = old.plano_id
+        ) WHERE rowid = old.plano_id;
+    END;
+"""
+
+
+def _migrar_exercicios(conn: sqlite3.Connection) -> None:
+    """Move JSON arrays of exercise objects to rows of ``exercicios``.
+
+    The converted ``planos.exercicios`` are cleared; any other text,
+    including arrays with entries that are not objects, is kept as legacy
+    content.
+    """
+    conn.executescript(_EXERCICIOS_TABELA)
+    planos = conn.execute(
+        "SELECT id, exercicios FROM planos WHERE exercicios IS NOT NULL"
+    ).fetchall()
+    for plano_id, texto in planos:
+        try:
+            exercicios = parse_exercicios(texto)
+        except ValueError:
+            continue
+        if exercicios is None:
+            continue
+        _gravar_exercicios(conn, plano_id, exercicios)
+        conn.execute("UPDATE planos SET exercicios = NULL WHERE id = ?", (plano_id,))
+    conn.executescript(_EXERCICIOS_GATILHOS)
+
+
+MIGRATIONS: list[str | Callable[[sqlite3.Connection], None]] = [
     """
     CREATE TABLE IF NOT EXISTS alunos (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -38,6 +127,167 @@ MIGRATIONS: list[str] = [
         FOREIGN KEY(aluno_id) REFERENCES alunos(id) ON DELETE CASCADE
     );
     """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_alunos_nome_id ON alunos(nome, id);
+    """,
+    # idx_alunos_nome_id already serves ``ORDER BY nome`` and name lookups.
+    """
+    CREATE INDEX IF NOT EXISTS idx_alunos_email ON alunos(email);
+    CREATE INDEX IF NOT EXISTS idx_planos_aluno_id ON planos(aluno_id, id);
+    """,
+    # Full-text search. The FTS rowid is the id of the indexed row and the
+    # triggers keep both indexes in sync with their source tables.
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS alunos_busca USING fts5(
+        nome, email,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5'
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS planos_busca USING fts5(
+        nome, descricao, exercicios,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5'
+    );
+    INSERT INTO alunos_busca(rowid, nome, email)
+        SELECT id, nome, email FROM alunos;
+    INSERT INTO planos_busca(rowid, nome, descricao, exercicios)
+        SELECT id, nome, descricao, CASE
+            WHEN json_valid(exercicios) AND json_type(exercicios) = 'array' THEN (
+                SELECT group_concat(json_extract(value, '$.nome'), ' ')
+                FROM json_each(exercicios) WHERE type = 'object'
+            ) END
+        FROM planos;
+    INSERT INTO alunos_busca(alunos_busca, rank) VALUES ('rank', 'bm25(10.0, 1.0)');
+    INSERT INTO planos_busca(planos_busca, rank)
+        VALUES ('rank', 'bm25(10.0, 2.0, 4.0)');
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_ai AFTER INSERT ON alunos BEGIN
+        INSERT INTO alunos_busca(rowid, nome, email)
+            VALUES (new.id, new.nome, new.email);
+    END;
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_au
+    AFTER UPDATE OF nome, email ON alunos BEGIN
+        UPDATE alunos_busca SET nome = new.nome, email = new.email
+            WHERE rowid = new.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_ad AFTER DELETE ON alunos BEGIN
+        DELETE FROM alunos_busca WHERE rowid = old.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS planos_busca_ai AFTER INSERT ON planos BEGIN
+        INSERT INTO planos_busca(rowid, nome, descricao, exercicios)
+            VALUES (new.id, new.nome, new.descricao, CASE
+                WHEN json_valid(new.exercicios)
+                    AND json_type(new.exercicios) = 'array' THEN (
+                    SELECT group_concat(json_extract(value, '$.nome'), ' ')
+                    FROM json_each(new.exercicios) WHERE type = 'object'
+                ) END);
+    END;
+    CREATE TRIGGER IF NOT EXISTS planos_busca_au AFTER UPDATE ON planos BEGIN
+        UPDATE planos_busca SET
+            nome = new.nome,
+            descricao = new.descricao,
+            exercicios = CASE
+                WHEN json_valid(new.exercicios)
+                    AND json_type(new.exercicios) = 'array' THEN (
+                    SELECT group_concat(json_extract(value, '$.nome'), ' ')
+                    FROM json_each(new.exercicios) WHERE type = 'object'
+                ) END
+            WHERE rowid = new.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS planos_busca_ad AFTER DELETE ON planos BEGIN
+        DELETE FROM planos_busca WHERE rowid = old.id;
+    END;
+    """,
+    _migrar_exercicios,
+    # Background jobs. ``disponivel_em`` (unix time) delays retries.
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL,
+        params TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        max_tentativas INTEGER NOT NULL DEFAULT 3,
+        feitos INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        resultado TEXT,
+        erro TEXT,
+        criado_em TEXT NOT NULL DEFAULT (datetime('now')),
+        atualizado_em TEXT NOT NULL DEFAULT (datetime('now')),
+        disponivel_em REAL NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_fila ON jobs(status, id);
+    """,
+    # Dashboard counters kept by triggers: ``('alunos', '')``,
+    # ``('planos', '')`` and one row per distinct ``alunos.plano`` and
+    # ``alunos.pagamento`` (NULL stored as ''). Groups reaching zero are
+    # removed. ``verificar_estatisticas`` rebuilds the table if it drifts.
+    """
+    CREATE TABLE IF NOT EXISTS estatisticas (
+        chave TEXT NOT NULL,
+        valor TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (chave, valor)
+    ) WITHOUT ROWID;
+    INSERT INTO estatisticas VALUES ('alunos', '', (SELECT COUNT(*) FROM alunos));
+    INSERT INTO estatisticas VALUES ('planos', '', (SELECT COUNT(*) FROM planos));
+    INSERT INTO estatisticas
+        SELECT 'plano', coalesce(plano, ''), COUNT(*) FROM alunos GROUP BY 2;
+    INSERT INTO estatisticas
+        SELECT 'pagamento', coalesce(pagamento, ''), COUNT(*) FROM alunos
+        GROUP BY 2;
+    CREATE TRIGGER IF NOT EXISTS estatisticas_alunos_ai
+    AFTER INSERT ON alunos BEGIN
+        UPDATE estatisticas SET total = total + 1
+            WHERE chave = 'alunos' AND valor = '';
+        INSERT INTO estatisticas VALUES ('plano', coalesce(new.plano, ''), 1)
+            ON CONFLICT DO UPDATE SET total = total + 1;
+        INSERT INTO estatisticas
+            VALUES ('pagamento', coalesce(new.pagamento, ''), 1)
+            ON CONFLICT DO UPDATE SET total = total + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS estatisticas_alunos_ad
+    AFTER DELETE ON alunos BEGIN
+        UPDATE estatisticas SET total = total - 1
+            WHERE chave = 'alunos' AND valor = '';
+        UPDATE estatisticas SET total = total - 1
+            WHERE chave = 'plano' AND valor = coalesce(old.plano, '');
+        UPDATE estatisticas SET total = total - 1
+            WHERE chave = 'pagamento' AND valor = coalesce(old.pagamento, '');
+        DELETE FROM estatisticas WHERE total <= 0 AND (
+            (chave = 'plano' AND valor = coalesce(old.plano, ''))
+            OR (chave = 'pagamento' AND valor = coalesce(old.pagamento, ''))
+        );
+    END;
+    CREATE TRIGGER IF NOT EXISTS estatisticas_alunos_au_plano
+    AFTER UPDATE OF plano ON alunos
+    WHEN old.plano IS NOT new.plano BEGIN
+        UPDATE estatisticas SET total = total - 1
+            WHERE chave = 'plano' AND valor = coalesce(old.plano, '');
+        DELETE FROM estatisticas WHERE total <= 0
+            AND chave = 'plano' AND valor = coalesce(old.plano, '');
+        INSERT INTO estatisticas VALUES ('plano', coalesce(new.plano, ''), 1)
+            ON CONFLICT DO UPDATE SET total = total + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS estatisticas_alunos_au_pagamento
+    AFTER UPDATE OF pagamento ON alunos
+    WHEN old.pagamento IS NOT new.pagamento BEGIN
+        UPDATE estatisticas SET total = total - 1
+            WHERE chave = 'pagamento' AND valor = coalesce(old.pagamento, '');
+        DELETE FROM estatisticas WHERE total <= 0
+            AND chave = 'pagamento' AND valor = coalesce(old.pagamento, '');
+        INSERT INTO estatisticas
+            VALUES ('pagamento', coalesce(new.pagamento, ''), 1)
+            ON CONFLICT DO UPDATE SET total = total + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS estatisticas_planos_ai
+    AFTER INSERT ON planos BEGIN
+        UPDATE estatisticas SET total = total + 1
+            WHERE chave = 'planos' AND valor = '';
+    END;
+    CREATE TRIGGER IF NOT EXISTS estatisticas_planos_ad
+    AFTER DELETE ON planos BEGIN
+        UPDATE estatisticas SET total = total - 1
+            WHERE chave = 'planos' AND valor = '';
+    END;
+    """,
 ]
 
 # Allowed columns that can be updated via ``atualizar_aluno``.
@@ -53,26 +303,142 @@ VALID_UPDATE_FIELDS: set[str] = {
 }
 
 
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections for a single database file.
+
+    Connections are opened lazily, configured once (WAL journal,
+    ``synchronous=NORMAL``, foreign keys and statement cache) and reused
+    across calls and threads. At most ``size`` connections are handed out
+    at the same time; extra callers wait up to ``timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int = DB_POOL_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+    ) -> None:
+        self.path = path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE,
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection wrapped in a transaction.
+
+        The transaction is committed when the block exits normally and
+        rolled back on error; the connection then returns to the pool.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("connection pool exhausted")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                if self._closed:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close idle connections; busy ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the connection pool bound to the current ``DB_NAME``."""
+    path = DB_NAME
+    pool = _POOLS.get(path)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(path)
+            if pool is None:
+                pool = ConnectionPool(path)
+                _POOLS[path] = pool
+    return pool
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection for ``DB_NAME`` inside a transaction."""
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def _abrir_leitura() -> sqlite3.Connection:
+    """Open a read-only connection to ``DB_NAME`` outside the pool.
+
+    Long-running readers (streamed exports) use it so a slow client does
+    not keep one of the ``DB_POOL_SIZE`` connections checked out.
+    """
+    uri = Path(DB_NAME).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(
+        uri, uri=True, timeout=DB_POOL_TIMEOUT, check_same_thread=False
+    )
+
+
+def close_pool() -> None:
+    """Close every pooled connection, e.g. before replacing the file."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
 def init_db() -> None:
     """Create or upgrade database schema."""
     try:
-        with sqlite3.connect(DB_NAME) as conn:
-            conn.execute("PRAGMA foreign_keys = ON")
+        with get_connection() as conn:
             cur = conn.execute("PRAGMA user_version")
             (version,) = cur.fetchone()
             for idx, script in enumerate(MIGRATIONS, start=1):
                 if idx > version:
-                    conn.executescript(script)
+                    if callable(script):
+                        script(conn)
+                    else:
+                        conn.executescript(script)
                     conn.execute(f"PRAGMA user_version = {idx}")
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao inicializar banco: %s", exc)
         raise
 
 
-def listar_alunos() -> list[tuple]:
+def listar_alunos() -> list[tuple[Any, ...]]:
     """Return basic information for all students."""
     try:
-        with sqlite3.connect(DB_NAME) as conn:
+        with get_connection() as conn:
             cur = conn.execute(
                 "SELECT id, nome, email, data_inicio FROM alunos ORDER BY nome"
             )
@@ -82,10 +448,79 @@ def listar_alunos() -> list[tuple]:
         raise
 
 
-def obter_aluno(aluno_id: int) -> Optional[tuple]:
+def _prefix_range(prefix: str) -> tuple[str, str | None]:
+    """Return ``[low, high)`` bounds matching strings starting with ``prefix``.
+
+    Range comparisons can be answered by an index, unlike ``LIKE 'x%'``.
+    ``high`` is ``None`` (no upper bound) when every character of
+    ``prefix`` is the last code point, U+10FFFF.
+    """
+    base = prefix.rstrip(chr(sys.maxunicode))
+    if not base:
+        return prefix, None
+    proximo = ord(base[-1]) + 1
+    if 0xD800 <= proximo <= 0xDFFF:
+        # Surrogates cannot be encoded as UTF-8; skip to the next character.
+        proximo = 0xE000
+    return prefix, base[:-1] + chr(proximo)
+
+
+def _filtro_prefixo(coluna: str, prefix: str, params: list[object]) -> str:
+    """Return a WHERE clause for ``coluna`` starting with ``prefix``."""
+    low, high = _prefix_range(prefix)
+    params.append(low)
+    if high is None:
+        return f"{coluna} >= ?"
+    params.append(high)
+    return f"{coluna} >= ? AND {coluna} < ?"
+
+
+def listar_alunos_page(
+    limit: int = 100,
+    after: tuple[str, int] | None = None,
+    nome: str | None = None,
+    email: str | None = None,
+) -> list[tuple[Any, ...]]:
+    """Return one page of students ordered by ``(nome, id)``.
+
+    Parameters
+    ----------
+    limit:
+        Maximum number of rows to return.
+    after:
+        ``(nome, id)`` of the last row of the previous page; rows strictly
+        after this key are returned (keyset pagination).
+    nome, email:
+        Optional case-sensitive prefixes to filter by.
+    """
+    clauses: list[str] = []
+    params: list[object] = []
+    if after is not None:
+        clauses.append("(nome, id) > (?, ?)")
+        params.extend(after)
+    if nome:
+        clauses.append(_filtro_prefixo("nome", nome, params))
+    if email:
+        clauses.append(_filtro_prefixo("email", email, params))
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    params.append(limit)
+    try:
+        with get_connection() as conn:
+            cur = conn.execute(
+                "SELECT id, nome, email, data_inicio FROM alunos "
+                f"{where}ORDER BY nome, id LIMIT ?",
+                params,
+            )
+            return cur.fetchall()
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao listar página de alunos: %s", exc)
+        raise
+
+
+def obter_aluno(aluno_id: int) -> Optional[tuple[Any, ...]]:
     """Return full information for one student."""
     try:
-        with sqlite3.connect(DB_NAME) as conn:
+        with get_connection() as conn:
             cur = conn.execute(
                 (
                     "SELECT id, nome, email, data_inicio, plano, pagamento, "
@@ -93,7 +528,8 @@ def obter_aluno(aluno_id: int) -> Optional[tuple]:
                 ),
                 (aluno_id,),
             )
-            return cur.fetchone()
+            row: tuple[Any, ...] | None = cur.fetchone()
+            return row
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao obter aluno: %s", exc)
         raise
@@ -105,15 +541,17 @@ def adicionar_aluno(nome: str, email: str) -> int:
 
     data_inicio = datetime.now().strftime("%Y-%m-%d")
     try:
-        with sqlite3.connect(DB_NAME) as conn:
+        with get_connection() as conn:
             cur = conn.execute(
                 "INSERT INTO alunos (nome, email, data_inicio) VALUES (?, ?, ?)",
                 (nome, email, data_inicio),
             )
-            return cur.lastrowid
+            aluno_id = cast(int, cur.lastrowid)
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao adicionar aluno: %s", exc)
         raise
+    events.publish(events.ALUNO, events.CREATED, aluno_id)
+    return aluno_id
 
 
 def adicionar_aluno_completo(
@@ -132,7 +570,7 @@ def adicionar_aluno_completo(
 
     data_inicio = data_inicio or datetime.now().strftime("%Y-%m-%d")
     try:
-        with sqlite3.connect(DB_NAME) as conn:
+        with get_connection() as conn:
             cur = conn.execute(
                 """
                 INSERT INTO alunos (
@@ -142,10 +580,46 @@ def adicionar_aluno_completo(
                 """,
                 (nome, email, data_inicio, plano, pagamento, progresso, dieta, treino),
             )
-            return cur.lastrowid
+            aluno_id = cast(int, cur.lastrowid)
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao adicionar aluno completo: %s", exc)
         raise
+    events.publish(events.ALUNO, events.CREATED, aluno_id)
+    return aluno_id
+
+
+def adicionar_alunos_lote(registros: Sequence[tuple[Any, ...]]) -> int:
+    """Insert many students in a single transaction.
+
+    Each tuple holds ``nome, email, data_inicio, plano, pagamento,
+    progresso, dieta, treino`` in this order. Either every row is inserted
+    or, on error, none of them.
+
+    A single change event without ``id`` is published for the batch.
+
+    Returns
+    -------
+    int
+        Number of inserted rows.
+    """
+    try:
+        with get_connection() as conn:
+            cur = conn.executemany(
+                """
+                INSERT INTO alunos (
+                    nome, email, data_inicio, plano, pagamento,
+                    progresso, dieta, treino
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                registros,
+            )
+            inseridos = cur.rowcount
+    except sqlite3.Error as exc:
+        logger.error("Erro ao adicionar alunos em lote: %s", exc)
+        raise
+    if inseridos:
+        events.publish(events.ALUNO, events.CREATED)
+    return inseridos
 
 
 def atualizar_aluno(aluno_id: int, campo: str, valor: str) -> None:
@@ -153,102 +627,463 @@ def atualizar_aluno(aluno_id: int, campo: str, valor: str) -> None:
     if campo not in VALID_UPDATE_FIELDS:
         raise ValueError(f"Invalid column name: {campo}")
     try:
-        with sqlite3.connect(DB_NAME) as conn:
-            conn.execute(
+        with get_connection() as conn:
+            cur = conn.execute(
                 f"UPDATE alunos SET {campo}=? WHERE id=?",
                 (valor, aluno_id),
             )
+            alterado = cur.rowcount > 0
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao atualizar aluno: %s", exc)
         raise
+    if alterado:
+        events.publish(events.ALUNO, events.UPDATED, aluno_id)
+
+
+def atualizar_aluno_campos(
+    aluno_id: int, campos: dict[str, Any]
+) -> Optional[tuple[Any, ...]]:
+    """Update several columns of a student in a single statement.
 
+    Returns the updated row in the same layout as :func:`obter_aluno`, or
+    ``None`` when no student has ``aluno_id``.
 
-def remover_aluno(aluno_id: int) -> None:
-    """Delete a student."""
+    Raises
+    ------
+    ValueError
+        When ``campos`` is empty or names a column outside
+        ``VALID_UPDATE_FIELDS``.
+    """
+    if not campos:
+        raise ValueError("No fields to update")
+    invalidos = set(campos) - VALID_UPDATE_FIELDS
+    if invalidos:
+        raise ValueError(f"Invalid column name: {', '.join(sorted(invalidos))}")
+    # Sorted so the same set of fields always reuses one cached statement.
+    colunas = sorted(campos)
+    atribuicoes = ", ".join(f"{c}=?" for c in colunas)
     try:
-        with sqlite3.connect(DB_NAME) as conn:
-            conn.execute("DELETE FROM alunos WHERE id=?", (aluno_id,))
+        with get_connection() as conn:
+            cur = conn.execute(
+                f"UPDATE alunos SET {atribuicoes} WHERE id=? "
+                "RETURNING id, nome, email, data_inicio, plano, pagamento, "
+                "progresso, dieta, treino",
+                (*(campos[c] for c in colunas), aluno_id),
+            )
+            row: tuple[Any, ...] | None = cur.fetchone()
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao atualizar aluno: %s", exc)
+        raise
+    if row is not None:
+        events.publish(events.ALUNO, events.UPDATED, aluno_id)
+    return row
+
+
+def remover_aluno(aluno_id: int) -> bool:
+    """Delete a student and return whether a row was removed."""
+    try:
+        with get_connection() as conn:
+            cur = conn.execute("DELETE FROM alunos WHERE id=?", (aluno_id,))
+            removido = cur.rowcount > 0
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao remover aluno: %s", exc)
         raise
+    if removido:
+        # The student's plans are removed by ``ON DELETE CASCADE``.
+        events.publish(events.ALUNO, events.DELETED, aluno_id)
+    return removido
 
 
 # ----- Planos de treino -----
 
 
-def listar_planos(aluno_id: int) -> list[tuple]:
-    """Return all training plans for a student."""
+# Columns of ``exercicios`` mirrored from the exercise dictionaries.
+CAMPOS_EXERCICIO: tuple[str, ...] = (
+    "nome",
+    "series",
+    "reps",
+    "peso",
+    "descanso",
+    "obs",
+)
+
+
+def parse_exercicios(exercicios_json: str | None) -> list[dict[str, Any]] | None:
+    """Return the exercise dictionaries or ``None`` if not a JSON array.
+
+    Raises
+    ------
+    ValueError
+        When the array has entries that are not JSON objects.
+    """
     try:
-        with sqlite3.connect(DB_NAME) as conn:
-            cur = conn.execute(
-                "SELECT id, nome, descricao, exercicios FROM planos "
-                "WHERE aluno_id=? ORDER BY id",
-                (aluno_id,),
-            )
-            return cur.fetchall()
+        data = json.loads(exercicios_json or "[]")
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, list):
+        return None
+    if not all(isinstance(ex, dict) for ex in data):
+        raise ValueError("Exercises must be JSON objects")
+    return list(data)
+
+
+def _linha_exercicio(ex: dict[str, Any]) -> tuple[Any, ...]:
+    """Return the column values and ``extras`` JSON of one exercise.
+
+    Known keys are also copied as text so search and exports can use them;
+    anything that would not survive that conversion goes to ``extras``.
+    """
+    extras = {
+        k: v
+        for k, v in ex.items()
+        if k not in CAMPOS_EXERCICIO or not isinstance(v, str)
+    }
+    colunas = tuple(
+        str(ex[c]) if ex.get(c) is not None else None for c in CAMPOS_EXERCICIO
+    )
+    return colunas + (json.dumps(extras, ensure_ascii=False) if extras else None,)
+
+
+def _exercicio_da_linha(valores: Sequence[Any]) -> dict[str, Any]:
+    """Rebuild an exercise from its columns followed by ``extras``."""
+    ex = {c: v for c, v in zip(CAMPOS_EXERCICIO, valores) if v is not None}
+    extras = valores[len(CAMPOS_EXERCICIO)]
+    if extras:
+        ex.update(json.loads(extras))
+    return ex
+
+
+def _gravar_exercicios(
+    conn: sqlite3.Connection, plano_id: int, exercicios: list[dict[str, Any]]
+) -> None:
+    """Replace the exercise rows of a plan."""
+    conn.execute("DELETE FROM exercicios WHERE plano_id=?", (plano_id,))
+    conn.executemany(
+        "INSERT INTO exercicios "
+        "(plano_id, ordem, nome, series, reps, peso, descanso, obs, extras) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (plano_id, ordem) + _linha_exercicio(ex)
+            for ordem, ex in enumerate(exercicios)
+        ],
+    )
+
+
+def _carregar_planos(
+    conn: sqlite3.Connection, where: str, params: Sequence[object]
+) -> list[tuple[Any, ...]]:
+    """Load plans and their exercises with a single query.
+
+    Returns ``(id, aluno_id, nome, descricao, exercicios, exercicios_json)``
+    tuples. Plans whose legacy ``exercicios`` text is not a JSON array keep
+    that text in ``exercicios_json`` and have no exercise rows.
+    """
+    cur = conn.execute(
+        f"""
+        SELECT p.id, p.aluno_id, p.nome, p.descricao, p.exercicios, e.id,
+               e.nome, e.series, e.reps, e.peso, e.descanso, e.obs, e.extras
+        FROM planos AS p
+        LEFT JOIN exercicios AS e ON e.plano_id = p.id
+        WHERE {where}
+        ORDER BY p.id, e.ordem
+        """,
+        params,
+    )
+    planos: list[tuple[Any, ...]] = []
+    atual: tuple[Any, ...] | None = None
+    for row in cur:
+        if atual is None or atual[0] != row[0]:
+            atual = (row[0], row[1], row[2], row[3], [], row[4])
+            planos.append(atual)
+        if row[5] is not None:
+            atual[4].append(_exercicio_da_linha(row[6:]))
+    return [
+        p if p[5] is not None else p[:5] + (json.dumps(p[4], ensure_ascii=False),)
+        for p in planos
+    ]
+
+
+def listar_planos_completos(aluno_id: int) -> list[tuple[Any, ...]]:
+    """Return a student's plans with exercises already decoded.
+
+    Returns
+    -------
+    list[tuple[Any, ...]]
+        ``(id, aluno_id, nome, descricao, exercicios, exercicios_json)``
+        where ``exercicios`` is a list of dictionaries.
+    """
+    try:
+        with get_connection() as conn:
+            return _carregar_planos(conn, "p.aluno_id = ?", (aluno_id,))
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao listar planos: %s", exc)
         raise
 
 
+def obter_plano(plano_id: int) -> Optional[tuple[Any, ...]]:
+    """Return one plan in the layout of :func:`listar_planos_completos`."""
+    try:
+        with get_connection() as conn:
+            planos = _carregar_planos(conn, "p.id = ?", (plano_id,))
+            return planos[0] if planos else None
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao obter plano: %s", exc)
+        raise
+
+
+def listar_planos(aluno_id: int) -> list[tuple[Any, ...]]:
+    """Return all training plans for a student.
+
+    Kept for compatibility: the exercise list is returned as JSON text.
+    """
+    return [(p[0], p[2], p[3], p[5]) for p in listar_planos_completos(aluno_id)]
+
+
 def adicionar_plano(
     aluno_id: int, nome: str, descricao: str, exercicios_json: str
 ) -> int:
-    """Add a new training plan."""
+    """Add a new training plan.
+
+    A JSON array in ``exercicios_json`` is stored as rows of ``exercicios``;
+    any other text is kept verbatim in ``planos.exercicios``.
+    """
+    exercicios = parse_exercicios(exercicios_json)
+    legado = exercicios_json if exercicios is None else None
     try:
-        with sqlite3.connect(DB_NAME) as conn:
+        with get_connection() as conn:
             cur = conn.execute(
                 "INSERT INTO planos (aluno_id, nome, descricao, exercicios)"
                 " VALUES (?, ?, ?, ?)",
-                (aluno_id, nome, descricao, exercicios_json),
+                (aluno_id, nome, descricao, legado),
             )
-            return cur.lastrowid
+            plano_id = cast(int, cur.lastrowid)
+            if exercicios:
+                _gravar_exercicios(conn, plano_id, exercicios)
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao adicionar plano: %s", exc)
         raise
+    events.publish(events.PLANO, events.CREATED, plano_id, aluno_id)
+    return plano_id
 
 
 def atualizar_plano(
     plano_id: int, nome: str, descricao: str, exercicios_json: str
-) -> None:
-    """Update an existing training plan."""
+) -> Optional[int]:
+    """Update an existing training plan and replace its exercises.
+
+    Returns
+    -------
+    int | None
+        Id of the student owning the plan, or ``None`` if it does not exist.
+    """
+    exercicios = parse_exercicios(exercicios_json)
+    legado = exercicios_json if exercicios is None else None
     try:
-        with sqlite3.connect(DB_NAME) as conn:
-            conn.execute(
-                "UPDATE planos SET nome=?, descricao=?, exercicios=? WHERE id=?",
-                (nome, descricao, exercicios_json, plano_id),
-            )
+        with get_connection() as conn:
+            row = conn.execute(
+                "UPDATE planos SET nome=?, descricao=?, exercicios=? WHERE id=?"
+                " RETURNING aluno_id",
+                (nome, descricao, legado, plano_id),
+            ).fetchone()
+            if row is None:
+                return None
+            _gravar_exercicios(conn, plano_id, exercicios or [])
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao atualizar plano: %s", exc)
         raise
+    events.publish(events.PLANO, events.UPDATED, plano_id, row[0])
+    return int(row[0])
+
 
+def remover_plano(plano_id: int) -> Optional[int]:
+    """Delete a training plan.
 
-def remover_plano(plano_id: int) -> None:
-    """Delete a training plan."""
+    Returns
+    -------
+    int | None
+        Id of the student that owned the plan, or ``None`` if not found.
+    """
     try:
-        with sqlite3.connect(DB_NAME) as conn:
-            conn.execute("DELETE FROM planos WHERE id=?", (plano_id,))
+        with get_connection() as conn:
+            row = conn.execute(
+                "DELETE FROM planos WHERE id=? RETURNING aluno_id", (plano_id,)
+            ).fetchone()
     except sqlite3.Error as exc:  # pragma: no cover - database errors
         logger.error("Erro ao remover plano: %s", exc)
         raise
+    if row is None:
+        return None
+    events.publish(events.PLANO, events.DELETED, plano_id, row[0])
+    return int(row[0])
+
+
+def _fts_query(termo: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    palavras = re.findall(r"\w+", termo)
+    return " ".join(f'"{p}"*' for p in palavras)
+
+
+def buscar(termo: str, limit: int = 20) -> list[tuple[Any, ...]]:
+    """Search students and plans by name, e-mail, description or exercise.
+
+    Each table is ranked inside FTS5 with ``ORDER BY rank LIMIT``, which
+    keeps only the best ``limit`` matches while scoring, so every match is
+    considered without sorting all of them.
+
+    Returns
+    -------
+    list[tuple[Any, ...]]
+        ``(tipo, id, titulo, aluno_id, score)`` ordered by relevance, where
+        ``tipo`` is ``"aluno"`` or ``"plano"`` and lower scores rank first.
+    """
+    consulta = _fts_query(termo)
+    if not consulta:
+        return []
+    try:
+        with get_connection() as conn:
+            cur = conn.execute(
+                """
+                SELECT * FROM (
+                    SELECT 'aluno', rowid, nome, rowid, rank
+                    FROM alunos_busca
+                    WHERE alunos_busca MATCH :q
+                    ORDER BY rank LIMIT :limit
+                )
+                UNION ALL
+                SELECT 'plano', planos.id, planos.nome, planos.aluno_id, r.rank
+                FROM (
+                    SELECT rowid, rank
+                    FROM planos_busca
+                    WHERE planos_busca MATCH :q
+                    ORDER BY rank LIMIT :limit
+                ) AS r
+                JOIN planos ON planos.id = r.rowid
+                ORDER BY 5
+                LIMIT :limit
+                """,
+                {"q": consulta, "limit": limit},
+            )
+            return cur.fetchall()
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao buscar: %s", exc)
+        raise
+
+
+# ----- Estatísticas -----
+
+
+# Counters of ``estatisticas`` computed from the source tables.
+_ESTATISTICAS_REAIS = """
+    SELECT 'alunos', '', COUNT(*) FROM alunos
+    UNION ALL SELECT 'planos', '', COUNT(*) FROM planos
+    UNION ALL SELECT 'plano', coalesce(plano, ''), COUNT(*) FROM alunos
+        GROUP BY 2
+    UNION ALL SELECT 'pagamento', coalesce(pagamento, ''), COUNT(*) FROM alunos
+        GROUP BY 2
+"""
+
+
+def _contador(chave: str) -> int:
+    try:
+        with get_connection() as conn:
+            row = conn.execute(
+                "SELECT total FROM estatisticas WHERE chave = ? AND valor = ''",
+                (chave,),
+            ).fetchone()
+            return int(row[0]) if row else 0
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao contar %s: %s", chave, exc)
+        raise
 
 
 def contar_alunos() -> int:
-    """Return the total number of students."""
+    """Return the total number of students from the ``estatisticas`` table."""
+    return _contador("alunos")
+
+
+def contar_planos() -> int:
+    """Return the total number of training plans from ``estatisticas``."""
+    return _contador("planos")
+
+
+def ler_estatisticas() -> dict[str, Any]:
+    """Return the counters kept by triggers in ``estatisticas``.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``alunos`` and ``planos`` totals plus ``por_plano`` and
+        ``por_pagamento``, mapping each value of ``alunos.plano`` and
+        ``alunos.pagamento`` (``""`` when not informed) to its students.
+    """
+    dados: dict[str, Any] = {
+        "alunos": 0,
+        "planos": 0,
+        "por_plano": {},
+        "por_pagamento": {},
+    }
+    try:
+        with get_connection() as conn:
+            # Listing the keys lets the primary key answer the query.
+            rows = conn.execute(
+                "SELECT chave, valor, total FROM estatisticas "
+                "WHERE chave IN ('alunos', 'planos', 'plano', 'pagamento')"
+            ).fetchall()
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao ler estatisticas: %s", exc)
+        raise
+    for chave, valor, total in rows:
+        if chave in ("plano", "pagamento"):
+            dados[f"por_{chave}"][valor] = total
+        else:
+            dados[chave] = total
+    return dados
+
+
+def verificar_estatisticas(corrigir: bool = False) -> list[tuple[Any, ...]]:
+    """Compare ``estatisticas`` with counts taken from the source tables.
+
+    The check runs in a write transaction, so no write lands in between.
+    With ``corrigir`` the table is rebuilt from the real counts when they
+    differ.
+
+    Returns
+    -------
+    list[tuple[Any, ...]]
+        ``(chave, valor, armazenado, real)`` for every counter that differs;
+        empty when the table is consistent.
+    """
     try:
-        with sqlite3.connect(DB_NAME) as conn:
-            cur = conn.execute("SELECT COUNT(*) FROM alunos")
-            (total,) = cur.fetchone()
-            return int(total)
+        with get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            reais = {(c, v): t for c, v, t in conn.execute(_ESTATISTICAS_REAIS)}
+            armazenados = {
+                (c, v): t
+                for c, v, t in conn.execute(
+                    "SELECT chave, valor, total FROM estatisticas"
+                )
+            }
+            diferencas = [
+                (c, v, armazenados.get((c, v), 0), reais.get((c, v), 0))
+                for c, v in sorted(reais.keys() | armazenados.keys())
+                if armazenados.get((c, v)) != reais.get((c, v))
+            ]
+            if diferencas and corrigir:
+                conn.execute("DELETE FROM estatisticas")
+                conn.executemany(
+                    "INSERT INTO estatisticas VALUES (?, ?, ?)",
+                    [(c, v, t) for (c, v), t in reais.items()],
+                )
+            return diferencas
     except sqlite3.Error as exc:  # pragma: no cover - database errors
-        logger.error("Erro ao contar alunos: %s", exc)
+        logger.error("Erro ao verificar estatisticas: %s", exc)
         raise
 
 
-def listar_planos_recentes(limit: int = 5) -> list[tuple]:
+def listar_planos_recentes(limit: int = 5) -> list[tuple[Any, ...]]:
     """Return the most recently created plans with student names."""
     try:
-        with sqlite3.connect(DB_NAME) as conn:
+        with get_connection() as conn:
             cur = conn.execute(
                 """
             SELECT planos.id, planos.nome, alunos.nome
@@ -265,12 +1100,263 @@ def listar_planos_recentes(limit: int = 5) -> list[tuple]:
         raise
 
 
-def backup_database(dest: Path | str) -> None:
-    """Copy the database file to ``dest``."""
+def iterar_alunos(
+    tamanho_lote: int = 1000, com_planos: bool = False
+) -> Iterator[tuple[Any, ...]]:
+    """Stream every student ordered by id.
+
+    Rows are read with ``fetchmany`` so memory use does not depend on the
+    size of the table. A dedicated read-only connection, not a pooled one,
+    stays open until the iterator is exhausted or closed, so streaming to a
+    slow client does not starve other requests. Each item has the layout
+    of :func:`obter_aluno`.
+    With ``com_planos`` a tenth element lists the student's plans as
+    ``(id, nome, descricao, exercicios, exercicios_texto)`` tuples, where
+    ``exercicios_texto`` is legacy text that is not a JSON array.
+    """
+    try:
+        with closing(_abrir_leitura()) as conn:
+            if not com_planos:
+                cur = conn.execute(
+                    "SELECT id, nome, email, data_inicio, plano, pagamento, "
+                    "progresso, dieta, treino FROM alunos ORDER BY id"
+                )
+                while rows := cur.fetchmany(tamanho_lote):
+                    yield from rows
+                return
+            # Nested loops over the primary key and the (aluno_id, id) and
+            # (plano_id, ordem) indexes already produce this order, so no
+            # temporary sort is needed and rows stream as they are read.
+            cur = conn.execute("""
+                SELECT a.id, a.nome, a.email, a.data_inicio, a.plano,
+                       a.pagamento, a.progresso, a.dieta, a.treino,
+                       p.id, p.nome, p.descricao, p.exercicios, e.id,
+                       e.nome, e.series, e.reps, e.peso, e.descanso, e.obs,
+                       e.extras
+                FROM alunos AS a
+                LEFT JOIN planos AS p ON p.aluno_id = a.id
+                LEFT JOIN exercicios AS e ON e.plano_id = p.id
+                ORDER BY a.id, p.id, e.ordem
+                """)
+            aluno: tuple[Any, ...] | None = None
+            plano: tuple[Any, ...] | None = None
+            while rows := cur.fetchmany(tamanho_lote):
+                for row in rows:
+                    if aluno is None or aluno[0] != row[0]:
+                        if aluno is not None:
+                            yield aluno
+                        aluno = row[:9] + ([],)
+                        plano = None
+                    if row[9] is None:
+                        continue
+                    if plano is None or plano[0] != row[9]:
+                        plano = (row[9], row[10], row[11], [], row[12])
+                        aluno[9].append(plano)
+                    if row[13] is not None:
+                        plano[3].append(_exercicio_da_linha(row[14:]))
+            if aluno is not None:
+                yield aluno
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao exportar alunos: %s", exc)
+        raise
+
+
+# ----- Jobs -----
+
+_JOB_COLUNAS = (
+    "id, tipo, params, status, tentativas, max_tentativas, feitos, total, "
+    "resultado, erro, criado_em, atualizado_em"
+)
+
+
+def criar_job(tipo: str, params: str, max_tentativas: int = 3) -> int:
+    """Queue a job with JSON ``params`` and return its id."""
+    try:
+        with get_connection() as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (tipo, params, max_tentativas) VALUES (?, ?, ?)",
+                (tipo, params, max_tentativas),
+            )
+            return cast(int, cur.lastrowid)
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao criar job: %s", exc)
+        raise
+
+
+def obter_job(job_id: int) -> Optional[tuple[Any, ...]]:
+    """Return one job row or ``None``."""
+    try:
+        with get_connection() as conn:
+            cur = conn.execute(f"SELECT {_JOB_COLUNAS} FROM jobs WHERE id=?", (job_id,))
+            row: tuple[Any, ...] | None = cur.fetchone()
+            return row
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao obter job: %s", exc)
+        raise
+
+
+def reservar_job(
+    agora: float, limites: dict[str, int] | None = None
+) -> Optional[tuple[Any, ...]]:
+    """Atomically mark the oldest runnable job as running and return it.
+
+    Jobs whose retry time is after ``agora`` are skipped, as are jobs of a
+    ``tipo`` that already has ``limites[tipo]`` jobs running. The limit is
+    checked inside the same write, so concurrent callers cannot exceed it.
+    """
+    limites = limites or {}
+    filtro = ""
+    if limites:
+        valores = ", ".join("(?, ?)" for _ in limites)
+        filtro = f"""
+                    AND NOT EXISTS (
+                        SELECT 1 FROM (VALUES {valores}) AS l
+                        WHERE l.column1 = j.tipo AND l.column2 <= (
+                            SELECT COUNT(*) FROM jobs r
+                            WHERE r.status = 'running' AND r.tipo = j.tipo
+                        )
+                    )"""
+    try:
+        with get_connection() as conn:
+            cur = conn.execute(
+                f"""
+                UPDATE jobs SET status = 'running',
+                    tentativas = tentativas + 1,
+                    atualizado_em = datetime('now')
+                WHERE id = (
+                    SELECT id FROM jobs j
+                    WHERE status = 'pending' AND disponivel_em <= ? {filtro}
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING {_JOB_COLUNAS}
+                """,
+                (agora, *(v for par in limites.items() for v in par)),
+            )
+            row: tuple[Any, ...] | None = cur.fetchone()
+            return row
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao reservar job: %s", exc)
+        raise
+
+
+def atualizar_progresso_job(job_id: int, feitos: int, total: int) -> None:
+    """Record progress of a running job."""
+    try:
+        with get_connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET feitos=?, total=?, atualizado_em=datetime('now') "
+                "WHERE id=?",
+                (feitos, total, job_id),
+            )
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao atualizar job: %s", exc)
+        raise
+
+
+def finalizar_job(
+    job_id: int,
+    status: str,
+    resultado: str | None = None,
+    erro: str | None = None,
+    disponivel_em: float = 0,
+) -> None:
+    """Set the final (or retry) state of a job.
 
+    ``status='pending'`` with ``disponivel_em`` schedules a retry.
+    """
+    try:
+        with get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET status=?, resultado=?, erro=?, disponivel_em=?,
+                    atualizado_em=datetime('now')
+                WHERE id=?
+                """,
+                (status, resultado, erro, disponivel_em, job_id),
+            )
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao finalizar job: %s", exc)
+        raise
+
+
+def atualizar_params_job(job_id: int, params: str) -> None:
+    """Replace the JSON ``params`` of a job, e.g. to record created rows."""
+    try:
+        with get_connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET params=?, atualizado_em=datetime('now') WHERE id=?",
+                (params, job_id),
+            )
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao atualizar job: %s", exc)
+        raise
+
+
+def reiniciar_jobs_interrompidos() -> int:
+    """Requeue jobs left ``running`` by a previous process.
+
+    Jobs interrupted on their last attempt are marked ``failed`` instead,
+    so a job limited to one attempt never runs twice.
+    """
+    try:
+        with get_connection() as conn:
+            cur = conn.execute("""
+                UPDATE jobs SET
+                    status = CASE WHEN tentativas >= max_tentativas
+                        THEN 'failed' ELSE 'pending' END,
+                    erro = CASE WHEN tentativas >= max_tentativas
+                        THEN 'Interrompido' ELSE erro END,
+                    atualizado_em = datetime('now')
+                WHERE status='running'
+                """)
+            return cur.rowcount
+    except sqlite3.Error as exc:  # pragma: no cover - database errors
+        logger.error("Erro ao reiniciar jobs: %s", exc)
+        raise
+
+
+def backup_database(
+    dest: Path | str,
+    paginas: int | None = None,
+    progresso: Callable[[int, int], None] | None = None,
+) -> None:
+    """Copy the live database to ``dest`` with the SQLite backup API.
+
+    Pages are copied ``paginas`` (default ``BACKUP_PAGES``) at a time and
+    ``progresso(copiadas, total)`` is called after each step. A read
+    transaction is held on the source for the whole copy, so the result is
+    a consistent snapshot even while other connections keep writing (WAL
+    readers do not block them).
+    The file is written next to ``dest`` and moved into place at the end.
+    """
     path = Path(dest)
+    tmp = path.with_name(path.name + ".tmp")
+
+    def _step(status: int, remaining: int, total: int) -> None:
+        if progresso is not None:
+            progresso(total - remaining, total)
+
     try:
-        shutil.copy(DB_NAME, path)
-    except (OSError, shutil.Error) as exc:  # pragma: no cover - I/O
+        src = sqlite3.connect(DB_NAME, timeout=DB_POOL_TIMEOUT, isolation_level=None)
+        try:
+            src.execute("BEGIN")
+            src.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()
+            target = sqlite3.connect(tmp)
+            try:
+                src.backup(target, pages=paginas or BACKUP_PAGES, progress=_step)
+                # Keep the copy self-contained instead of inheriting WAL mode.
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+            src.execute("COMMIT")
+        finally:
+            src.close()
+        os.replace(tmp, path)
+    except (OSError, sqlite3.Error) as exc:
+        tmp.unlink(missing_ok=True)
         logger.error("Erro ao criar backup: %s", exc)
         raise
+    except BaseException:
+        # E.g. ``progresso`` raising to cancel the copy.
+        tmp.unlink(missing_ok=True)
+        raise
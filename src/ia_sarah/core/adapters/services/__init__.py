@@ -1,2 +1,5 @@
+from ia_sarah.core.adapters.services.batch import *  # noqa: F401,F403
 from ia_sarah.core.adapters.services.exporters import *  # noqa: F401,F403
+from ia_sarah.core.adapters.services.importers import *  # noqa: F401,F403
 from ia_sarah.core.adapters.services.pdf_utils import *  # noqa: F401,F403
+from ia_sarah.core.adapters.services.student_export import *  # noqa: F401,F403
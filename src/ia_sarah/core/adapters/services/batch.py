@@ -0,0 +1,178 @@
+"""Parallel export of many training plans into a directory or ZIP file."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Worker processes used by ``exportar_lote``; defaults to the CPU count.
+EXPORT_WORKERS: int = int(os.getenv("EXPORT_WORKERS", "0")) or os.cpu_count() or 1
+# Plans rendered per task sent to a worker, amortizing process overhead.
+EXPORT_CHUNK: int = int(os.getenv("EXPORT_CHUNK", "16"))
+# Formats whose files are already compressed and are stored as-is in ZIPs.
+_COMPRIMIDOS = {"pdf", "xlsx"}
+# ``(titulo, exercicios, caminho)`` of one plan sent to a worker process.
+_Item = tuple[str, list[dict[str, Any]], str]
+
+
+@dataclass
+class TarefaExportacao:
+    """One plan to be rendered by ``exportar_lote``."""
+
+    titulo: str
+    exercicios: list[dict[str, Any]]
+    nome_arquivo: str
+
+
+@dataclass
+class RelatorioLote:
+    """Outcome of a batch export."""
+
+    destino: Path
+    gerados: list[str] = field(default_factory=list)
+    erros: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _renderizar_bloco(fmt: str, itens: list[_Item]) -> list[str | None]:
+    """Render a chunk of plans; runs in a worker process.
+
+    Returns one entry per item: ``None`` on success or the error message.
+    """
+    from ia_sarah.core.adapters.services.exporters import get_exporter
+
+    exporter = get_exporter(fmt)
+    erros: list[str | None] = []
+    for titulo, exercicios, caminho in itens:
+        try:
+            exporter.export(titulo, exercicios, Path(caminho))
+        except Exception as exc:  # noqa: BLE001 - reported per plan
+            erros.append(str(exc) or type(exc).__name__)
+        else:
+            erros.append(None)
+    return erros
+
+
+def _blocos(
+    tarefas: Iterable[TarefaExportacao], fmt: str, tamanho: int
+) -> Iterator[list[tuple[str, TarefaExportacao]]]:
+    bloco: list[tuple[str, TarefaExportacao]] = []
+    for item in _nomes_unicos(tarefas, fmt):
+        bloco.append(item)
+        if len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def _nomes_unicos(
+    tarefas: Iterable[TarefaExportacao], fmt: str
+) -> Iterator[tuple[str, TarefaExportacao]]:
+    usados: set[str] = set()
+    for tarefa in tarefas:
+        base = tarefa.nome_arquivo or "treino"
+        nome = f"{base}.{fmt}"
+        n = 1
+        while nome in usados:
+            n += 1
+            nome = f"{base}_{n}.{fmt}"
+        usados.add(nome)
+        yield nome, tarefa
+
+
+def exportar_lote(
+    tarefas: Iterable[TarefaExportacao],
+    destino: Path | str,
+    fmt: str = "pdf",
+    processos: int | None = None,
+    progresso: Callable[[int, int], None] | None = None,
+    total: int | None = None,
+) -> RelatorioLote:
+    """Render ``tarefas`` in parallel into ``destino``.
+
+    A ``destino`` ending in ``.zip`` produces a single archive; any other
+    path is used as an output directory. Plans are sent to the worker
+    processes in chunks of ``EXPORT_CHUNK`` and only a few chunks per
+    worker are in flight, so ``tarefas`` may be a lazy iterator of any
+    size. ``progresso(feitos, total)`` is called as chunks finish; ``total``
+    is ``0`` when unknown. Failures are collected in the report instead of
+    aborting the batch.
+    """
+    destino = Path(destino)
+    processos = processos or EXPORT_WORKERS
+    relatorio = RelatorioLote(destino)
+    compactar = destino.suffix.lower() == ".zip"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    if not compactar:
+        destino.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        saida = Path(tmp) if compactar else destino
+        parcial = destino.with_name(destino.name + ".tmp")
+        arquivo = zipfile.ZipFile(parcial, "w") if compactar else None
+        compressao = zipfile.ZIP_STORED if fmt in _COMPRIMIDOS else zipfile.ZIP_DEFLATED
+        feitos = 0
+
+        def concluir(nomes: list[str], erros: list[str | None]) -> None:
+            nonlocal feitos
+            for nome, erro in zip(nomes, erros):
+                if erro is not None:
+                    logger.error("Erro ao exportar %s: %s", nome, erro)
+                    relatorio.erros.append((nome, erro))
+                    continue
+                if arquivo is not None:
+                    arquivo.write(saida / nome, nome, compressao)
+                    os.unlink(saida / nome)
+                relatorio.gerados.append(nome)
+            feitos += len(nomes)
+            if progresso is not None:
+                progresso(feitos, total or 0)
+
+        def itens(bloco: list[tuple[str, TarefaExportacao]]) -> list[_Item]:
+            return [(t.titulo, t.exercicios, str(saida / n)) for n, t in bloco]
+
+        try:
+            blocos = _blocos(tarefas, fmt, EXPORT_CHUNK)
+            if processos == 1:
+                for bloco in blocos:
+                    nomes = [n for n, _ in bloco]
+                    concluir(nomes, _renderizar_bloco(fmt, itens(bloco)))
+            else:
+                # Spawned workers do not inherit threads, locks or SQLite
+                # handles from the (possibly multi-threaded) parent.
+                contexto = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(processos, mp_context=contexto) as pool:
+                    pendentes: dict[Future[list[str | None]], list[str]] = {}
+                    for bloco in blocos:
+                        if len(pendentes) >= 2 * processos:
+                            prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                            for fut in prontos:
+                                concluir(pendentes.pop(fut), fut.result())
+                        fut = pool.submit(_renderizar_bloco, fmt, itens(bloco))
+                        pendentes[fut] = [n for n, _ in bloco]
+                    for fut in as_completed(pendentes):
+                        concluir(pendentes[fut], fut.result())
+        except BaseException:
+            if arquivo is not None:
+                arquivo.close()
+                parcial.unlink(missing_ok=True)
+            raise
+        if arquivo is not None:
+            arquivo.close()
+            os.replace(parcial, destino)
+    return relatorio
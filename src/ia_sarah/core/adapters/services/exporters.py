@@ -1,34 +1,151 @@
-"""Plugins for exporting training data in various formats."""
+"""Plugins for exporting training data in various formats.
+
+Importing this module is cheap: ``fpdf`` and ``openpyxl`` are imported when
+a document is first written, and exporter plugins are discovered and loaded
+on the first lookup by format name.
+"""
 
 from __future__ import annotations
 
 import csv
+import importlib
+import io
+import itertools
 import logging
+import os
+import re
+import shutil
+import tempfile
 from abc import ABC, abstractmethod
+from functools import partial
 from pathlib import Path
-from typing import Iterable
-
-import openpyxl
-from fpdf import FPDF
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Sequence, Union
 
-from ia_sarah.core.plugin_loader import load_entrypoints
+from ia_sarah.core.plugin_loader import discover_entrypoints, load_plugin
 
 logger = logging.getLogger(__name__)
 
+# Rows inspected to build the column header when no schema is given.
+HEADER_LOOKAHEAD: int = 1000
+
+
+def tabular_header(
+    exercises: Iterable[dict[str, Any]],
+    schema: Sequence[str] | None = None,
+    lookahead: int = HEADER_LOOKAHEAD,
+) -> tuple[list[str], Iterator[dict[str, Any]]]:
+    """Return the column names and an iterator over every row.
+
+    Without ``schema`` the header is the union of keys, in first-seen order,
+    of the first ``lookahead`` rows; those rows are buffered and replayed so
+    ``exercises`` may be a one-shot generator.
+    """
+    rows = iter(exercises)
+    if schema is not None:
+        return list(schema), rows
+    buffered = list(itertools.islice(rows, lookahead))
+    header = list(dict.fromkeys(k for row in buffered for k in row))
+    return header, itertools.chain(buffered, rows)
+
+
+def _warn_extra_keys(
+    rows: Iterable[dict[str, Any]], header: list[str], fmt: str
+) -> Iterator[dict[str, Any]]:
+    """Yield ``rows`` logging once if a row has keys outside ``header``."""
+    known = set(header)
+    warned = False
+    for row in rows:
+        if not warned and not known.issuperset(row):
+            logger.warning(
+                "Colunas fora do cabeçalho ignoradas na exportação %s: %s",
+                fmt,
+                sorted(set(row) - known),
+            )
+            warned = True
+        yield row
+
 
 class Exporter(ABC):
     """Base interface for data exporters."""
 
+    media_type: str = "application/octet-stream"
+    # Bump when the output for the same input changes. Exporters leaving it
+    # as ``None`` are never served from the export cache.
+    version: str | None = None
+
     @abstractmethod
-    def export(self, title: str, exercises: Iterable[dict], path: Path) -> None:
+    def export(
+        self, title: str, exercises: Iterable[dict[str, Any]], path: Path
+    ) -> None:
         """Export the data."""
         raise NotImplementedError
 
+    def write(
+        self, title: str, exercises: Iterable[dict[str, Any]], stream: BinaryIO
+    ) -> None:
+        """Write the export into a binary file-like object.
+
+        Exporters that only implement :meth:`export` go through a temporary
+        file; the built-in ones override this to write directly.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "export"
+            self.export(title, exercises, path)
+            with path.open("rb") as fh:
+                shutil.copyfileobj(fh, stream)
+
+    def to_bytes(self, title: str, exercises: Iterable[dict[str, Any]]) -> bytes:
+        """Return the export as bytes."""
+        buffer = io.BytesIO()
+        self.write(title, exercises, buffer)
+        return buffer.getvalue()
+
+
+class StreamExporter(Exporter):
+    """Exporter implemented by :meth:`write`; files are opened for it.
+
+    :meth:`export` writes to a temporary file next to ``path`` and only
+    replaces ``path`` once :meth:`write` succeeds.
+    """
+
+    label: str = ""
+
+    @abstractmethod
+    def write(
+        self, title: str, exercises: Iterable[dict[str, Any]], stream: BinaryIO
+    ) -> None:
+        raise NotImplementedError
+
+    def export(
+        self, title: str, exercises: Iterable[dict[str, Any]], path: Path
+    ) -> None:
+        path = Path(path)
+        try:
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    self.write(title, exercises, fh)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        except OSError as exc:
+            logger.error("Erro ao exportar %s: %s", self.label, exc)
+            raise
+
 
-class PDFExporter(Exporter):
+class PDFExporter(StreamExporter):
     """Export data to a PDF file."""
 
-    def export(self, title: str, exercises: Iterable[dict], path: Path) -> None:
+    label = "PDF"
+    version = "1"
+    media_type = "application/pdf"
+
+    def write(
+        self, title: str, exercises: Iterable[dict[str, Any]], stream: BinaryIO
+    ) -> None:
+        from fpdf import FPDF
+
         pdf = FPDF()
         pdf.add_page()
         pdf.set_title(title)
@@ -46,69 +163,142 @@ class PDFExporter(Exporter):
             if ex.get("obs"):
                 line += f" ({ex['obs']})"
             pdf.multi_cell(0, 10, txt=line)
-        try:
-            pdf.output(str(path))
-        except OSError as exc:
-            logger.error("Erro ao exportar PDF: %s", exc)
-            raise
+        # FPDF 1.x returns the document as a latin-1 string.
+        stream.write(pdf.output(dest="S").encode("latin-1"))
 
 
-class CSVExporter(Exporter):
-    """Export data to a CSV file."""
+class CSVExporter(StreamExporter):
+    """Export data to a CSV file, one row at a time.
 
-    def export(self, title: str, exercises: Iterable[dict], path: Path) -> None:
-        try:
-            with path.open("w", newline="", encoding="utf-8") as csvfile:
-                writer = (
-                    csv.DictWriter(csvfile, fieldnames=list(exercises[0].keys()))
-                    if exercises
-                    else csv.DictWriter(csvfile, fieldnames=[])
-                )
-                writer.writeheader()
-                for ex in exercises:
-                    writer.writerow(ex)
-        except OSError as exc:
-            logger.error("Erro ao exportar CSV: %s", exc)
-            raise
+    The header comes from ``schema`` or from the first ``lookahead`` rows.
+    """
 
+    label = "CSV"
+    version = "1"
+    media_type = "text/csv"
 
-class ExcelExporter(Exporter):
-    """Export data to an Excel file using ``openpyxl``."""
+    def __init__(
+        self,
+        schema: Sequence[str] | None = None,
+        lookahead: int = HEADER_LOOKAHEAD,
+    ) -> None:
+        self.schema = schema
+        self.lookahead = lookahead
 
-    def export(self, title: str, exercises: Iterable[dict], path: Path) -> None:
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = title
-        if exercises:
-            ws.append(list(exercises[0].keys()))
-            for ex in exercises:
-                ws.append([ex.get(k, "") for k in exercises[0].keys()])
+    def write(
+        self, title: str, exercises: Iterable[dict[str, Any]], stream: BinaryIO
+    ) -> None:
+        header, rows = tabular_header(exercises, self.schema, self.lookahead)
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
         try:
-            wb.save(path)
-        except OSError as exc:
-            logger.error("Erro ao exportar Excel: %s", exc)
-            raise
+            writer = csv.DictWriter(
+                text, fieldnames=header, restval="", extrasaction="ignore"
+            )
+            writer.writeheader()
+            writer.writerows(_warn_extra_keys(rows, header, "CSV"))
+            text.flush()
+        finally:
+            # Leave ``stream`` open for the caller.
+            text.detach()
+
+
+def _sheet_title(title: str) -> str:
+    """Return ``title`` as a valid worksheet name (max. 31 characters)."""
+    cleaned = re.sub(r"[\\/*?:\[\]]", "_", title).strip("'")[:31]
+    return cleaned or "Treino"
+
+
+class ExcelExporter(StreamExporter):
+    """Export data to an Excel file using ``openpyxl`` in write-only mode.
+
+    Rows are streamed to disk as they are produced, so memory use does not
+    grow with the number of exercises.
+    """
+
+    label = "Excel"
+    version = "1"
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def __init__(
+        self,
+        schema: Sequence[str] | None = None,
+        lookahead: int = HEADER_LOOKAHEAD,
+    ) -> None:
+        self.schema = schema
+        self.lookahead = lookahead
 
+    def write(
+        self, title: str, exercises: Iterable[dict[str, Any]], stream: BinaryIO
+    ) -> None:
+        import openpyxl
 
-_REGISTRY: dict[str, type[Exporter]] = {}
+        header, rows = tabular_header(exercises, self.schema, self.lookahead)
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(_sheet_title(title))
+        if header:
+            ws.append(header)
+            for ex in _warn_extra_keys(rows, header, "Excel"):
+                ws.append([ex.get(k, "") for k in header])
+        wb.save(stream)
 
 
-def register_exporter(fmt: str, cls: type[Exporter]) -> None:
-    """Register a new exporter class."""
+EXPORTER_GROUP = "ia_sarah.exporters"
+
+# An exporter class or its ``"module:Class"`` import path.
+ExporterRef = Union[type[Exporter], str]
+
+_BUILTIN: dict[str, ExporterRef] = {
+    "pdf": PDFExporter,
+    "csv": CSVExporter,
+    "xlsx": ExcelExporter,
+}
+_REGISTRY: dict[str, ExporterRef] = {}
+
+
+def register_exporter(fmt: str, cls: type[Exporter] | str) -> None:
+    """Register an exporter class, or its ``"module:Class"`` import path.
+
+    A path is imported only when the format is first used, so plugins can
+    register without loading heavy dependencies.
+    """
     _REGISTRY[fmt] = cls
 
 
-def get_exporter(fmt: str) -> Exporter:
-    """Instantiate an exporter by format name."""
-    if fmt not in _REGISTRY:
-        raise KeyError(f"Exporter {fmt} not registered")
-    return _REGISTRY[fmt]()
+def _resolve(ref: ExporterRef) -> type[Exporter]:
+    if isinstance(ref, type):
+        return ref
+    module, _, attr = ref.partition(":")
+    cls: type[Exporter] = getattr(importlib.import_module(module), attr)
+    return cls
 
 
-# Register default exporters on import
-register_exporter("pdf", PDFExporter)
-register_exporter("csv", CSVExporter)
-register_exporter("xlsx", ExcelExporter)
+def _candidates(fmt: str) -> Iterator[Callable[[], type[Exporter]]]:
+    """Yield loaders of the registrations for ``fmt`` by precedence.
 
-# Load external exporter plugins
-load_entrypoints("ia_sarah.exporters", register_exporter)
+    Explicit registrations win over installed plugins, which win over the
+    built-in exporters.
+    """
+    if fmt in _REGISTRY:
+        yield partial(_resolve, _REGISTRY[fmt])
+    if fmt in discover_entrypoints(EXPORTER_GROUP):
+        yield partial(load_plugin, EXPORTER_GROUP, fmt)
+    if fmt in _BUILTIN:
+        yield partial(_resolve, _BUILTIN[fmt])
+
+
+def available_exporters() -> list[str]:
+    """Return every registered format name without loading any exporter."""
+    plugins = discover_entrypoints(EXPORTER_GROUP)
+    return list(dict.fromkeys([*_BUILTIN, *plugins, *_REGISTRY]))
+
+
+def get_exporter(fmt: str) -> Exporter:
+    """Instantiate an exporter by format name."""
+    for load in _candidates(fmt):
+        try:
+            cls = load()
+        except Exception as exc:  # noqa: BLE001 - fall back to the next one
+            logger.error("Erro ao carregar exportador %s: %s", fmt, exc)
+            continue
+        return cls()
+    raise KeyError(f"Exporter {fmt} not registered")
@@ -0,0 +1,134 @@
+"""Readers and validation for bulk student imports."""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+# Column order expected by ``db.adicionar_alunos_lote``.
+CAMPOS_ALUNO: tuple[str, ...] = (
+    "nome",
+    "email",
+    "data_inicio",
+    "plano",
+    "pagamento",
+    "progresso",
+    "dieta",
+    "treino",
+)
+
+# A parsed row or the error found while reading it.
+Registro = Union[dict[str, Any], ValueError]
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import."""
+
+    inseridos: int = 0
+    erros: list[tuple[int, str]] = field(default_factory=list)
+
+
+def normalizar_aluno(registro: dict[str, Any]) -> tuple[Any, ...]:
+    """Validate a raw row and return it in ``CAMPOS_ALUNO`` order.
+
+    Raises
+    ------
+    ValueError
+        When ``nome`` is missing, ``email`` is invalid or ``data_inicio`` is
+        not an ISO date.
+    """
+    if not isinstance(registro, dict):
+        raise ValueError("registro deve ser um objeto")
+    valores: dict[str, str | None] = {}
+    for campo in CAMPOS_ALUNO:
+        valor = registro.get(campo)
+        if isinstance(valor, (datetime, date)):
+            valor = valor.strftime("%Y-%m-%d")
+        texto = str(valor).strip() if valor is not None else ""
+        valores[campo] = texto or None
+    if not valores["nome"]:
+        raise ValueError("nome obrigatório")
+    if not valores["email"] or "@" not in valores["email"]:
+        raise ValueError("email inválido")
+    if valores["data_inicio"]:
+        try:
+            date.fromisoformat(valores["data_inicio"])
+        except ValueError as exc:
+            raise ValueError("data_inicio deve estar no formato AAAA-MM-DD") from exc
+    else:
+        valores["data_inicio"] = datetime.now().strftime("%Y-%m-%d")
+    return tuple(valores[c] for c in CAMPOS_ALUNO)
+
+
+def ler_csv(path: Path) -> Iterator[tuple[int, Registro]]:
+    """Yield ``(linha, registro)`` pairs from a CSV file with header.
+
+    Comma, semicolon and tab delimiters are detected automatically.
+    """
+    with path.open(newline="", encoding="utf-8-sig") as fh:
+        amostra = fh.read(4096)
+        fh.seek(0)
+        try:
+            dialect: Any = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(fh, dialect=dialect)
+        for registro in reader:
+            yield reader.line_num, registro
+
+
+def ler_jsonl(path: Path) -> Iterator[tuple[int, Registro]]:
+    """Yield ``(linha, registro)`` pairs from a JSON Lines file."""
+    with path.open(encoding="utf-8") as fh:
+        for linha, texto in enumerate(fh, start=1):
+            if not texto.strip():
+                continue
+            try:
+                registro: Registro = json.loads(texto)
+            except json.JSONDecodeError as exc:
+                registro = ValueError(f"JSON inválido: {exc.msg}")
+            yield linha, registro
+
+
+def ler_xlsx(path: Path) -> Iterator[tuple[int, Registro]]:
+    """Yield ``(linha, registro)`` pairs from the first sheet of a workbook."""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        chaves = [str(c).strip() if c is not None else "" for c in header]
+        for linha, valores in enumerate(rows, start=2):
+            if all(v is None for v in valores):
+                continue
+            yield linha, dict(zip(chaves, valores))
+    finally:
+        wb.close()
+
+
+_READERS = {
+    ".csv": ler_csv,
+    ".jsonl": ler_jsonl,
+    ".ndjson": ler_jsonl,
+    ".xlsx": ler_xlsx,
+}
+
+
+def ler_registros(path: Path | str) -> Iterator[tuple[int, Registro]]:
+    """Stream rows from ``path`` choosing the reader by file extension."""
+    path = Path(path)
+    reader = _READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Formato de importação não suportado: {path.suffix}")
+    return reader(path)
@@ -5,9 +5,7 @@ from __future__ import annotations
 import logging
 import unicodedata
 from pathlib import Path
-from typing import Iterable
-
-from fpdf import FPDF
+from typing import Any, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +19,8 @@ def sanitize_filename(nome: str) -> str:
 
 def gerar_pdf(titulo: str, conteudo: str, caminho: Path | str) -> None:
     """Generate a simple PDF with free content."""
+    from fpdf import FPDF  # imported on first use to keep startup fast
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_title(titulo)
@@ -35,9 +35,11 @@ def gerar_pdf(titulo: str, conteudo: str, caminho: Path | str) -> None:
 
 
 def gerar_treino_pdf(
-    titulo: str, exercicios: Iterable[dict], caminho: Path | str
+    titulo: str, exercicios: Iterable[dict[str, Any]], caminho: Path | str
 ) -> None:
     """Generate a structured PDF with an exercise list."""
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_title(titulo)
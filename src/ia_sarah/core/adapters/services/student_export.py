@@ -0,0 +1,96 @@
+"""Serialization of the whole student base for streaming exports."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator
+
+# Columns written by the CSV export, in order.
+CAMPOS_EXPORTACAO: tuple[str, ...] = (
+    "id",
+    "nome",
+    "email",
+    "data_inicio",
+    "plano",
+    "pagamento",
+    "progresso",
+    "dieta",
+    "treino",
+)
+
+FORMATOS_EXPORTACAO: tuple[str, ...] = ("ndjson", "csv")
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def aluno_para_dict(row: tuple[Any, ...]) -> dict[str, Any]:
+    """Convert a row from ``db.iterar_alunos`` into a JSON-ready dict."""
+    registro: dict[str, Any] = dict(zip(CAMPOS_EXPORTACAO, row))
+    if len(row) > len(CAMPOS_EXPORTACAO):
+        planos = []
+        for plano_id, nome, descricao, exercicios, texto in row[-1]:
+            plano: dict[str, Any] = {
+                "id": plano_id,
+                "nome": nome,
+                "descricao": descricao,
+                "exercicios": exercicios,
+            }
+            if texto is not None:
+                plano["exercicios_texto"] = texto
+            planos.append(plano)
+        registro["planos"] = planos
+    return registro
+
+
+def linhas_ndjson(rows: Iterable[tuple[Any, ...]], bloco: int = 1000) -> Iterator[str]:
+    """Yield JSON Lines text, ``bloco`` students per chunk."""
+    buffer: list[str] = []
+    for row in rows:
+        buffer.append(json.dumps(aluno_para_dict(row), ensure_ascii=False))
+        if len(buffer) >= bloco:
+            yield "\n".join(buffer) + "\n"
+            buffer.clear()
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def linhas_csv(rows: Iterable[tuple[Any, ...]], bloco: int = 1000) -> Iterator[str]:
+    """Yield CSV text with header, ``bloco`` students per chunk.
+
+    Plans are not part of the CSV layout; only student columns are written.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CAMPOS_EXPORTACAO)
+    pendentes = 0
+    for row in rows:
+        writer.writerow(row[: len(CAMPOS_EXPORTACAO)])
+        pendentes += 1
+        if pendentes >= bloco:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pendentes = 0
+    yield buffer.getvalue()
+
+
+def serializar_alunos(
+    rows: Iterable[tuple[Any, ...]], formato: str, bloco: int = 1000
+) -> Iterator[str]:
+    """Return the text chunks of ``rows`` in ``formato``.
+
+    Raises
+    ------
+    ValueError
+        When ``formato`` is not one of ``FORMATOS_EXPORTACAO``.
+    """
+    if formato == "ndjson":
+        return linhas_ndjson(rows, bloco)
+    if formato == "csv":
+        return linhas_csv(rows, bloco)
+    raise ValueError(f"Formato de exportação não suportado: {formato}")
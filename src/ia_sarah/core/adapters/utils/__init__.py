@@ -1 +1,2 @@
+from ia_sarah.core.adapters.utils.cache import *  # noqa: F401,F403
 from ia_sarah.core.adapters.utils.config_manager import *  # noqa: F401,F403
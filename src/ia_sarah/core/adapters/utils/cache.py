@@ -0,0 +1,245 @@
+"""Small LRU caches: in-process with expiration, and on-disk by size."""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, TypeVar, cast
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    Parameters
+    ----------
+    name:
+        Label reported to ``listener`` on every lookup.
+    maxsize:
+        Maximum number of entries; the least recently used is evicted.
+    ttl:
+        Seconds an entry stays valid.
+    listener:
+        Optional ``callback(name, hit)`` invoked on each lookup, used to
+        feed telemetry counters.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 30.0,
+        listener: Callable[[str, bool], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._listener = listener
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on invalidation so a load racing with a write is not stored.
+        self._generation = 0
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self._listener is not None:
+            self._listener(self.name, hit)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], T]) -> T:
+        """Return the cached value for ``key`` or store ``loader()``."""
+        if not self.enabled:
+            return loader()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self._record(True)
+                return cast(T, entry[1])
+            self._record(False)
+            generation = self._generation
+        value = loader()
+        with self._lock:
+            if generation != self._generation:
+                return value
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop ``key`` from the cache if present."""
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """Thread-safe on-disk LRU cache of byte strings bounded by total size.
+
+    Entries are files named after their key, so ``key`` must be a safe file
+    name such as a hex digest. Recency is tracked through the file mtime,
+    which keeps the LRU order across restarts and between processes sharing
+    ``directory``.
+
+    Parameters
+    ----------
+    name:
+        Label reported to ``listener`` on every lookup.
+    directory:
+        Where entries are stored; created on first write.
+    max_bytes:
+        Total size kept on disk; least recently used entries are evicted.
+    listener:
+        Optional ``callback(name, hit)`` invoked on each lookup.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: Path | str,
+        max_bytes: int = 256 << 20,
+        listener: Callable[[str, bool], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = max_bytes > 0
+        self.hits = 0
+        self.misses = 0
+        self._listener = listener
+        # key -> size, least recently used first; loaded lazily from disk.
+        self._index: OrderedDict[str, int] | None = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self._listener is not None:
+            self._listener(self.name, hit)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entradas = []
+            if self.directory.is_dir():
+                for path in self.directory.glob("??/*"):
+                    if path.name.startswith("."):
+                        continue  # unfinished write
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    entradas.append((st.st_mtime, path.name, st.st_size))
+            entradas.sort()
+            self._index = OrderedDict((k, size) for _, k, size in entradas)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def _forget(self, key: str) -> None:
+        size = self._load_index().pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    def get(self, key: str) -> bytes | None:
+        """Return the bytes stored under ``key`` or ``None``."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            data = None
+        with self._lock:
+            index = self._load_index()
+            if data is None:
+                # Evicted by another process or never stored.
+                self._forget(key)
+            else:
+                if key not in index:
+                    index[key] = len(data)
+                    self._total += len(data)
+                index.move_to_end(key)
+            self._record(data is not None)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key``, evicting old entries if needed."""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Erro ao gravar cache %s: %s", self.name, exc)
+            return
+        with self._lock:
+            self._forget(key)
+            index = self._load_index()
+            index[key] = len(data)
+            self._total += len(data)
+            while self._total > self.max_bytes and index:
+                antigo, size = index.popitem(last=False)
+                self._total -= size
+                self._path(antigo).unlink(missing_ok=True)
+
+    def get_or_create(self, key: str, loader: Callable[[], bytes]) -> bytes:
+        """Return the bytes cached for ``key`` or store ``loader()``."""
+        data = self.get(key)
+        if data is None:
+            data = loader()
+            self.put(key, data)
+        return data
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            for key in self._load_index():
+                self._path(key).unlink(missing_ok=True)
+            self._index = None
+            self._total = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the stored entries."""
+        with self._lock:
+            self._load_index()
+            return self._total
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_index())
@@ -1,12 +1,26 @@
-"""Utilities for persisting simple application configuration."""
+"""Utilities for persisting simple application configuration.
+
+The parsed file is cached in memory and re-read only when its modification
+time, size or inode change. Writes go to a temporary file that atomically
+replaces ``config.json``, under a lock file shared with other processes.
+"""
 
 from __future__ import annotations
 
 import json
 import logging
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
 
 logger = logging.getLogger(__name__)
 
@@ -24,48 +38,111 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 }
 
 
+# Last file read: (path, (mtime_ns, size, inode), merged config).
+_cache: tuple[Path, tuple[int, int, int], Dict[str, Any]] | None = None
+_lock = threading.RLock()
+
+
+def _assinatura(path: Path) -> tuple[int, int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+@contextmanager
+def _bloqueio(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on ``path`` + ``.lock`` across processes."""
+    with _lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(path.name + ".lock"), "a+b") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            else:  # pragma: no cover - Windows
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+                else:  # pragma: no cover - Windows
+                    fh.seek(0)
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _ler(path: Path) -> Dict[str, Any] | None:
+    """Return the cached config for ``path``, reading it only if changed."""
+    global _cache
+    try:
+        assinatura = _assinatura(path)
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _cache is not None and _cache[:2] == (path, assinatura):
+            return _cache[2]
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as exc:  # pragma: no cover - I/O
+            logger.error("Erro ao ler configuração: %s", exc)
+            return DEFAULT_CONFIG
+        config = {**DEFAULT_CONFIG, **data}
+        _cache = (path, assinatura, config)
+        return config
+
+
+def _gravar(path: Path, config: Dict[str, Any]) -> None:
+    """Atomically replace ``path`` with ``config``; caller holds the lock."""
+    global _cache
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(config, fh, ensure_ascii=False)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    except OSError as exc:  # pragma: no cover - I/O
+        logger.error("Erro ao salvar configuração: %s", exc)
+        raise
+    _cache = (path, _assinatura(path), {**DEFAULT_CONFIG, **config})
+
+
 def load_config() -> Dict[str, Any]:
-    """Load configuration from disk.
+    """Load configuration, re-reading the file only when it changed.
 
     Returns
     -------
     dict
-        Configuration values or an empty dictionary when the file is missing
-        or invalid.
+        A copy of the configuration values, or of the defaults when the
+        file is missing or invalid.
     """
 
-    if not CONFIG_FILE.exists():
+    config = _ler(CONFIG_FILE)
+    if config is None:
         save_config(DEFAULT_CONFIG)
         return DEFAULT_CONFIG.copy()
-
-    try:
-        data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError) as exc:  # pragma: no cover - I/O
-        logger.error("Erro ao ler configuração: %s", exc)
-        return DEFAULT_CONFIG.copy()
-
-    return {**DEFAULT_CONFIG, **data}
+    return dict(config)
 
 
 def save_config(config: Dict[str, Any]) -> None:
     """Persist configuration to disk."""
 
-    try:
-        CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        CONFIG_FILE.write_text(
-            json.dumps(config, ensure_ascii=False), encoding="utf-8"
-        )
-    except OSError as exc:  # pragma: no cover - I/O
-        logger.error("Erro ao salvar configuração: %s", exc)
-        raise
+    with _bloqueio(CONFIG_FILE):
+        _gravar(CONFIG_FILE, config)
 
 
 def delete_config() -> None:
     """Remove configuration file if it exists."""
 
+    global _cache
     try:
-        if CONFIG_FILE.exists():
-            CONFIG_FILE.unlink()
+        with _lock:
+            if CONFIG_FILE.exists():
+                CONFIG_FILE.unlink()
+            _cache = None
     except OSError as exc:  # pragma: no cover - I/O
         logger.error("Erro ao excluir configuração: %s", exc)
         raise
@@ -75,15 +152,20 @@ def load_theme() -> str:
     """Return the saved theme name or a default."""
 
     config = load_config()
-    return config.get("theme", "superhero")
+    return str(config.get("theme", "superhero"))
 
 
 def update_config(updates: Dict[str, Any]) -> None:
-    """Merge and persist configuration updates."""
+    """Merge and persist configuration updates.
 
-    config = load_config()
-    config.update(updates)
-    save_config(config)
+    The file lock is held from read to write, so concurrent updates from
+    other processes are not lost.
+    """
+
+    with _bloqueio(CONFIG_FILE):
+        config = dict(_ler(CONFIG_FILE) or DEFAULT_CONFIG)
+        config.update(updates)
+        _gravar(CONFIG_FILE, config)
 
 
 def save_theme(theme: str) -> None:
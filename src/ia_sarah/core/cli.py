@@ -1,39 +1,189 @@
-"""Interface de linha de comando para gerenciamento de alunos."""
+"""Interface de linha de comando para gerenciamento de alunos.
+
+Read-only commands (``listar``, ``contar``, ``buscar``) and ``estatisticas``
+use only the repository layer; the controllers, with the export, import and
+telemetry stacks, are imported by the commands that need them.
+"""
 
 from __future__ import annotations
 
+import sqlite3
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+
 import typer
 
-from ia_sarah.core.use_cases import controllers
+from ia_sarah.core.adapters.repositories import db
 
 app = typer.Typer(help="Gerenciar alunos sem a interface grafica")
 
 
+def _controllers() -> ModuleType:
+    """Import the application layer on first use."""
+    from ia_sarah.core.use_cases import controllers
+
+    return controllers
+
+
 @app.command()
 def listar() -> None:
     """Listar alunos cadastrados."""
-    alunos = controllers.listar_alunos()
-    for a in alunos:
-        typer.echo(f"{a.id}\t{a.nome}\t{a.email}")
+    for aluno_id, nome, email, _ in db.listar_alunos():
+        typer.echo(f"{aluno_id}\t{nome}\t{email}")
+
+
+@app.command()
+def contar() -> None:
+    """Mostrar o total de alunos e de planos de treino."""
+    typer.echo(f"{db.contar_alunos()} alunos, {db.contar_planos()} planos")
+
+
+@app.command()
+def estatisticas(
+    corrigir: bool = typer.Option(
+        False, "--corrigir", help="Reconstruir a tabela se houver diferenças"
+    ),
+) -> None:
+    """Conferir os contadores do painel com os dados e, se pedido, corrigi-los."""
+    diferencas = db.verificar_estatisticas(corrigir)
+    for chave, valor, armazenado, real in diferencas:
+        nome = f"{chave}[{valor}]" if valor else chave
+        typer.echo(f"{nome}: armazenado {armazenado}, real {real}")
+    if not diferencas:
+        typer.echo("Estatísticas consistentes")
+    elif corrigir:
+        typer.echo(f"{len(diferencas)} contadores corrigidos")
+    else:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def buscar(termo: str, limite: int = typer.Option(20, min=1)) -> None:
+    """Buscar alunos e planos por nome, descrição ou exercício."""
+    for tipo, item_id, titulo, *_ in db.buscar(termo, limite):
+        typer.echo(f"{tipo}\t{item_id}\t{titulo}")
 
 
 @app.command()
 def adicionar(nome: str, email: str) -> None:
     """Adicionar um novo aluno."""
-    aluno_id = controllers.adicionar_aluno(nome, email)
+    aluno_id = _controllers().adicionar_aluno(nome, email)
     typer.echo(f"Aluno criado com id {aluno_id}")
 
 
+@app.command()
+def importar(arquivo: Path, lote: int = typer.Option(1000, min=1)) -> None:
+    """Importar alunos de um arquivo CSV, XLSX ou JSON Lines."""
+    try:
+        report = _controllers().importar_alunos_arquivo(arquivo, lote)
+    except (OSError, ValueError) as exc:
+        typer.echo(f"Erro ao importar: {exc}", err=True)
+        raise typer.Exit(code=1)
+    for linha, erro in report.erros:
+        typer.echo(f"Linha {linha}: {erro}", err=True)
+    typer.echo(f"{report.inseridos} alunos importados, {len(report.erros)} erros")
+
+
+@app.command()
+def exportar(
+    arquivo: Optional[Path] = typer.Argument(None, help="Destino; padrão stdout"),
+    formato: str = typer.Option("ndjson", help="ndjson ou csv"),
+    lote: int = typer.Option(1000, min=1),
+) -> None:
+    """Exportar todos os alunos em NDJSON (com planos) ou CSV."""
+    try:
+        chunks = _controllers().exportar_alunos(formato, lote)
+    except ValueError as exc:
+        typer.echo(f"Erro ao exportar: {exc}", err=True)
+        raise typer.Exit(code=1)
+    if arquivo is None:
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+        return
+    with arquivo.open("w", encoding="utf-8", newline="") as fh:
+        for chunk in chunks:
+            fh.write(chunk)
+    typer.echo(f"Alunos exportados para {arquivo}")
+
+
+@app.command("exportar-treinos")
+def exportar_treinos(
+    destino: Path = typer.Argument(..., help="Diretório ou arquivo .zip"),
+    aluno: Optional[list[int]] = typer.Option(
+        None, "--aluno", help="Id do aluno; repetir para vários (padrão: todos)"
+    ),
+    formato: str = typer.Option("pdf", help="Formato de exportação"),
+    processos: int = typer.Option(0, min=0, help="Processos; 0 usa todos os CPUs"),
+) -> None:
+    """Exportar em lote os planos de treino de vários alunos."""
+
+    def progresso(feitos: int, total: int) -> None:
+        typer.echo(f"\rExportando {feitos}/{total}", err=True, nl=False)
+
+    try:
+        report = _controllers().exportar_treinos_lote(
+            destino, aluno or None, formato, processos or None, progresso
+        )
+    except (OSError, KeyError) as exc:
+        typer.echo(f"Erro ao exportar: {exc}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo("", err=True)
+    for nome, erro in report.erros:
+        typer.echo(f"{nome}: {erro}", err=True)
+    typer.echo(
+        f"{len(report.gerados)} planos exportados para {report.destino}, "
+        f"{len(report.erros)} erros"
+    )
+
+
+@app.command()
+def backup(
+    destino: Path,
+    comprimir: bool = typer.Option(False, help="Gravar o backup com gzip"),
+    manter: int = typer.Option(
+        0, min=0, help="Com destino diretório, manter só os N backups mais novos"
+    ),
+) -> None:
+    """Gerar backup consistente do banco sem interromper o uso."""
+    try:
+        if destino.is_dir():
+            path = _controllers().backup_rotativo(destino, manter, comprimir)
+        else:
+            path = _controllers().backup_dados(destino, comprimir or None)
+    except (OSError, sqlite3.Error) as exc:
+        typer.echo(f"Erro ao gerar backup: {exc}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Backup gravado em {path}")
+
+
+@app.command()
+def restaurar(
+    arquivo: Path,
+    sim: bool = typer.Option(False, "--sim", help="Não pedir confirmação"),
+) -> None:
+    """Restaurar o banco a partir de um backup após verificar a integridade."""
+    if not sim:
+        typer.confirm("Os dados atuais serão substituídos. Continuar?", abort=True)
+    try:
+        _controllers().restaurar_dados(arquivo)
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        typer.echo(f"Erro ao restaurar: {exc}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo("Backup restaurado")
+
+
 @app.command()
 def remover(aluno_id: int) -> None:
     """Remover um aluno pelo id."""
-    controllers.remover_aluno(aluno_id)
+    _controllers().remover_aluno(aluno_id)
     typer.echo("Aluno removido")
 
 
 def main() -> None:
     """Ponto de entrada do CLI."""
-    controllers.init_app()
+    db.init_db()
     app()
 
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Optional
 
 
 @dataclass
@@ -23,3 +23,33 @@ class TrainingPlan:
     nome: str
     descricao: str
     exercicios_json: str
+    exercicios: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class SearchResult:
+    """Student or training plan matched by a full-text search."""
+
+    tipo: str
+    id: int
+    titulo: str
+    aluno_id: int
+    score: float
+
+
+@dataclass
+class Job:
+    """Background task tracked in the ``jobs`` table."""
+
+    id: int
+    tipo: str
+    params: dict[str, Any]
+    status: str
+    tentativas: int
+    max_tentativas: int
+    feitos: int
+    total: int
+    resultado: Optional[str]
+    erro: Optional[str]
+    criado_em: str
+    atualizado_em: str
@@ -0,0 +1,138 @@
+"""In-process change feed for students and training plans.
+
+Repository writes publish a :class:`ChangeEvent` once their transaction is
+committed. Subscribers (the API's ``/events`` stream, the Qt pages) are
+called synchronously on the writing thread, so callbacks must be quick and
+hand the event over to their own thread or event loop.
+
+Recent events are kept in a ring buffer (``EVENTS_HISTORY``) so a client
+that reconnects can ask for what it missed with :meth:`EventBus.since`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of past events kept for clients catching up after a reconnect.
+EVENTS_HISTORY: int = int(os.getenv("EVENTS_HISTORY", "1000"))
+
+ALUNO = "aluno"
+PLANO = "plano"
+# Whole database replaced (backup restored): clients must reload everything.
+DADOS = "dados"
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+RESET = "reset"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One committed change.
+
+    ``id`` is ``None`` when many rows changed at once (e.g. a batch import);
+    subscribers should then reload instead of applying the event.
+    ``aluno_id`` is the owning student of a plan.
+    """
+
+    seq: int
+    entity: str
+    action: str
+    id: Optional[int] = None
+    aluno_id: Optional[int] = None
+    ts: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+Subscriber = Callable[[ChangeEvent], None]
+
+
+class EventBus:
+    """Thread-safe publish/subscribe hub with a bounded history."""
+
+    def __init__(self, history: int = EVENTS_HISTORY) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: list[Subscriber] = []
+        self._history: deque[ChangeEvent] = deque(maxlen=max(history, 1))
+        self._seq = 0
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Call ``callback`` for every event; return a function that stops it."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def publish(
+        self,
+        entity: str,
+        action: str,
+        id: Optional[int] = None,
+        aluno_id: Optional[int] = None,
+    ) -> ChangeEvent:
+        """Record an event and deliver it to every subscriber."""
+        with self._lock:
+            self._seq += 1
+            event = ChangeEvent(self._seq, entity, action, id, aluno_id, time.time())
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Erro ao notificar %r: %s", callback, exc)
+        return event
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def since(self, seq: int) -> list[ChangeEvent] | None:
+        """Return the events after ``seq``.
+
+        ``None`` means some of them already left the history, so the
+        caller cannot catch up incrementally and should reload.
+        """
+        with self._lock:
+            if seq == self._seq:
+                return []
+            if seq > self._seq:
+                # Sequence from an earlier run of the process.
+                return None
+            if not self._history or self._history[0].seq > seq + 1:
+                return None
+            return [e for e in self._history if e.seq > seq]
+
+
+bus = EventBus()
+
+
+def subscribe(callback: Subscriber) -> Callable[[], None]:
+    """Subscribe ``callback`` to the application bus."""
+    return bus.subscribe(callback)
+
+
+def publish(
+    entity: str,
+    action: str,
+    id: Optional[int] = None,
+    aluno_id: Optional[int] = None,
+) -> ChangeEvent:
+    """Publish a change on the application bus."""
+    return bus.publish(entity, action, id, aluno_id)
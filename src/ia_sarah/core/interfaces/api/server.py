@@ -1,31 +1,150 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Any, Dict
-
-from ia_sarah.core.use_cases import controllers
+import asyncio
+import base64
+import binascii
+import functools
+import json
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, TypeVar, cast
+
+import anyio
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, field_validator
+
+from ia_sarah.core import events
+from ia_sarah.core.adapters.repositories import db
+from ia_sarah.core.adapters.services.student_export import MEDIA_TYPES
+from ia_sarah.core.entities.models import Job
+from ia_sarah.core.use_cases import controllers, jobs
+
+T = TypeVar("T")
 
 app = FastAPI(title="I.A-Sarah API")
 
+# Origins allowed to call the API from a browser; ``null`` is the origin of
+# ``web/index.html`` opened from disk.
+API_CORS_ORIGINS: list[str] = os.getenv("API_CORS_ORIGINS", "null").split(",")
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=API_CORS_ORIGINS,
+    allow_methods=["GET"],
+    # Lets browser clients read the pagination cursor of ``/students``.
+    expose_headers=["X-Next-Cursor"],
+)
+
+# Seconds between keep-alive comments on an idle ``/events`` stream.
+EVENTS_KEEPALIVE: float = float(os.getenv("EVENTS_KEEPALIVE", "15"))
+# Events buffered for a slow ``/events`` client before it is sent ``reset``.
+EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "1000"))
+
+# Maximum number of blocking controller calls running at the same time.
+API_DB_CONCURRENCY: int = int(os.getenv("API_DB_CONCURRENCY", str(db.DB_POOL_SIZE)))
+_db_limiter: anyio.CapacityLimiter | None = None
+
+
+async def _run_db(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking controller call in a worker thread.
+
+    Keeps SQLite and file I/O off the event loop; at most
+    ``API_DB_CONCURRENCY`` calls run concurrently and the rest wait.
+    """
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(API_DB_CONCURRENCY)
+    return await anyio.to_thread.run_sync(
+        functools.partial(func, *args), limiter=_db_limiter
+    )
+
 
 class StudentIn(BaseModel):
     nome: str
     email: str
 
 
+class StudentPatch(BaseModel):
+    nome: str | None = None
+    email: str | None = None
+    data_inicio: str | None = None
+    plano: str | None = None
+    pagamento: str | None = None
+    progresso: str | None = None
+    dieta: str | None = None
+    treino: str | None = None
+
+    @field_validator("nome")
+    @classmethod
+    def _nome_not_null(cls, value: str | None) -> str:
+        # Omitting ``nome`` keeps it; an explicit null would break NOT NULL.
+        if value is None:
+            raise ValueError("nome cannot be null")
+        return value
+
+
+class ExportBatchIn(BaseModel):
+    aluno_ids: List[int] | None = None
+    formato: str = "pdf"
+
+
+class JobIn(BaseModel):
+    tipo: str
+    params: Dict[str, Any] = {}
+    max_tentativas: int = jobs.JOB_MAX_ATTEMPTS
+
+
 class ThemeIn(BaseModel):
     theme: str
 
 
 @app.on_event("startup")
 async def startup() -> None:
-    controllers.init_app()
+    await _run_db(controllers.init_app)
+    controllers.iniciar_backup_agendado()
+    await _run_db(jobs.iniciar)
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await _run_db(controllers.parar_backup_agendado)
+    await _run_db(jobs.parar)
+
+
+def _encode_cursor(nome: str, aluno_id: int) -> str:
+    raw = json.dumps([nome, aluno_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        nome, aluno_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(nome), int(aluno_id)
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
 
 
 @app.get("/students")
-async def list_students():
-    alunos = controllers.listar_alunos()
+async def list_students(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after: str | None = None,
+    nome: str | None = None,
+    email: str | None = None,
+) -> List[Dict[str, Any]]:
+    """List students page by page.
+
+    When more rows exist, the ``X-Next-Cursor`` header carries the value to
+    pass as ``after`` to fetch the next page.
+    """
+    key = _decode_cursor(after) if after else None
+    alunos = await _run_db(controllers.listar_alunos_pagina, limit, key, nome, email)
+    if len(alunos) == limit:
+        last = alunos[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(
+            last.nome, cast(int, last.id)
+        )
     return [
         {
             "id": a.id,
@@ -38,8 +157,8 @@ async def list_students():
 
 
 @app.get("/students/{aluno_id}")
-async def get_student(aluno_id: int):
-    aluno = controllers.obter_aluno(aluno_id)
+async def get_student(aluno_id: int) -> Dict[str, Any]:
+    aluno = await _run_db(controllers.obter_aluno, aluno_id)
     if not aluno:
         raise HTTPException(status_code=404, detail="Aluno not found")
     return {
@@ -51,70 +170,303 @@ async def get_student(aluno_id: int):
 
 
 @app.post("/students", status_code=201)
-async def create_student(student: StudentIn):
-    aluno_id = controllers.adicionar_aluno(student.nome, student.email)
+async def create_student(student: StudentIn) -> Dict[str, int]:
+    aluno_id = await _run_db(controllers.adicionar_aluno, student.nome, student.email)
     return {"id": aluno_id}
 
 
+@app.post("/students/bulk")
+async def create_students_bulk(alunos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Import many students at once.
+
+    Invalid rows are reported by position (starting at 1) and skipped;
+    the remaining rows are still inserted.
+    """
+    report = await _run_db(controllers.importar_alunos, enumerate(alunos, start=1))
+    return {
+        "inseridos": report.inseridos,
+        "erros": [{"linha": linha, "erro": erro} for linha, erro in report.erros],
+    }
+
+
 @app.put("/students/{aluno_id}", status_code=204)
-async def update_student(aluno_id: int, student: StudentIn):
+async def update_student(aluno_id: int, student: StudentIn) -> None:
     """Update an existing student."""
-    if controllers.obter_aluno(aluno_id) is None:
+    aluno = await _run_db(
+        controllers.atualizar_aluno_campos,
+        aluno_id,
+        {"nome": student.nome, "email": student.email},
+    )
+    if aluno is None:
+        raise HTTPException(status_code=404, detail="Aluno not found")
+
+
+@app.patch("/students/{aluno_id}")
+async def patch_student(aluno_id: int, student: StudentPatch) -> Dict[str, Any]:
+    """Update only the fields present in the request body."""
+    campos = student.model_dump(exclude_unset=True)
+    if campos:
+        aluno = await _run_db(controllers.atualizar_aluno_campos, aluno_id, campos)
+    else:
+        aluno = await _run_db(controllers.obter_aluno, aluno_id)
+    if aluno is None:
         raise HTTPException(status_code=404, detail="Aluno not found")
-    controllers.atualizar_aluno(aluno_id, "nome", student.nome)
-    controllers.atualizar_aluno(aluno_id, "email", student.email)
+    return {
+        "id": aluno.id,
+        "nome": aluno.nome,
+        "email": aluno.email,
+        "data_inicio": aluno.data_inicio,
+    }
 
 
 @app.delete("/students/{aluno_id}", status_code=204)
-async def delete_student(aluno_id: int):
-    if controllers.obter_aluno(aluno_id) is None:
+async def delete_student(aluno_id: int) -> None:
+    if not await _run_db(controllers.remover_aluno, aluno_id):
         raise HTTPException(status_code=404, detail="Aluno not found")
-    controllers.remover_aluno(aluno_id)
 
 
 @app.get("/theme")
-async def get_theme():
+async def get_theme() -> Dict[str, str]:
     """Return saved theme."""
-    return {"theme": controllers.load_theme()}
+    return {"theme": await _run_db(controllers.load_theme)}
 
 
 @app.post("/theme", status_code=204)
-async def set_theme(data: ThemeIn):
+async def set_theme(data: ThemeIn) -> None:
     """Persist theme selection."""
-    controllers.save_theme(data.theme)
+    await _run_db(controllers.save_theme, data.theme)
 
 
 @app.get("/config")
 async def get_config() -> Dict[str, Any]:
     """Return application configuration."""
-    return controllers.load_config()
+    return await _run_db(controllers.load_config)
 
 
 @app.post("/config", status_code=204)
-async def update_config(config: Dict[str, Any]):
+async def update_config(config: Dict[str, Any]) -> None:
     """Update and persist configuration values."""
-    controllers.update_config(config)
+    await _run_db(controllers.update_config, config)
+
+
+@app.get("/export/students")
+async def export_students(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+) -> StreamingResponse:
+    """Stream every student as NDJSON (with nested plans) or CSV.
+
+    Rows are read from the database in batches while the response is being
+    sent, so memory use stays flat regardless of the number of students.
+    """
+    chunks = controllers.exportar_alunos(format)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="alunos.{format}"'},
+    )
+
+
+def _job_dict(job: Job) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "tipo": job.tipo,
+        "status": job.status,
+        "tentativas": job.tentativas,
+        "feitos": job.feitos,
+        "total": job.total,
+        "erro": job.erro,
+        "criado_em": job.criado_em,
+        "atualizado_em": job.atualizado_em,
+    }
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(dados: JobIn) -> Dict[str, Any]:
+    """Queue a background job; poll ``GET /jobs/{id}`` for its progress."""
+    try:
+        job_id = await _run_db(
+            jobs.enviar, dados.tipo, dados.params, dados.max_tentativas
+        )
+    except KeyError as exc:
+        raise HTTPException(status_code=400, detail="Unknown job type") from exc
+    return {"id": job_id, "status": "pending"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: int) -> Dict[str, Any]:
+    """Return status, attempts and progress of a job."""
+    job = await _run_db(jobs.obter, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_dict(job)
+
+
+@app.get("/jobs/{job_id}/result")
+async def download_job_result(job_id: int) -> FileResponse:
+    """Download the file produced by a finished job."""
+    job = await _run_db(jobs.obter, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail="Job not finished")
+    if not job.resultado or not Path(job.resultado).is_file():
+        raise HTTPException(status_code=404, detail="Job has no result file")
+    path = Path(job.resultado)
+    return FileResponse(path, filename=path.name)
+
+
+@app.post("/exports/batch", status_code=202)
+async def create_batch_export(dados: ExportBatchIn) -> Dict[str, Any]:
+    """Queue the export of many training plans into a ZIP archive.
+
+    Returns a job id; follow it at ``/jobs/{id}`` and download the archive
+    from ``/jobs/{id}/result``.
+    """
+    if dados.formato not in await _run_db(controllers.listar_exportadores):
+        raise HTTPException(status_code=400, detail="Unknown export format")
+    job_id = await _run_db(
+        jobs.enviar,
+        "exportar_lote",
+        {"aluno_ids": dados.aluno_ids, "formato": dados.formato},
+    )
+    return {"id": job_id, "status": "pending"}
+
+
+@app.get("/plans/{plano_id}/export")
+async def export_plan(plano_id: int, format: str = "pdf") -> Response:
+    """Render a training plan in memory and send it as a download."""
+    if format not in await _run_db(controllers.listar_exportadores):
+        raise HTTPException(status_code=400, detail="Unknown export format")
+    plano = await _run_db(controllers.obter_plano, plano_id)
+    if plano is None:
+        raise HTTPException(status_code=404, detail="Plano not found")
+    conteudo, media_type = await _run_db(
+        controllers.exportar_treino_bytes, format, plano.nome, plano.exercicios
+    )
+    nome = controllers.sanitize_filename(plano.nome) or "treino"
+    return Response(
+        conteudo,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nome}.{format}"'},
+    )
+
+
+@app.get("/search")
+async def search(q: str, limit: int = Query(20, ge=1, le=100)) -> List[Dict[str, Any]]:
+    """Full-text search over students and training plans."""
+    resultados = await _run_db(controllers.buscar, q, limit)
+    return [
+        {
+            "tipo": r.tipo,
+            "id": r.id,
+            "titulo": r.titulo,
+            "aluno_id": r.aluno_id,
+            "score": r.score,
+        }
+        for r in resultados
+    ]
+
+
+def _sse(event: events.ChangeEvent) -> str:
+    data = json.dumps(event.to_dict())
+    return f"id: {event.seq}\nevent: change\ndata: {data}\n\n"
+
+
+_SSE_RESET = "event: reset\ndata: {}\n\n"
+
+
+@app.get("/events")
+async def stream_events(
+    last_event_id: str | None = Header(None),
+) -> StreamingResponse:
+    """Stream student and plan changes as Server-Sent Events.
+
+    Each ``change`` event carries a :class:`~ia_sarah.core.events.ChangeEvent`
+    as JSON with its sequence number as the SSE id, so a reconnecting
+    ``EventSource`` resumes from ``Last-Event-ID``. A ``reset`` event asks
+    the client to reload everything: the missed events are no longer in the
+    history, or the client fell more than ``EVENTS_QUEUE_SIZE`` behind.
+    """
+    loop = asyncio.get_running_loop()
+    fila: asyncio.Queue[events.ChangeEvent | None] = asyncio.Queue(EVENTS_QUEUE_SIZE)
+
+    def enfileirar(event: events.ChangeEvent) -> None:
+        try:
+            fila.put_nowait(event)
+        except asyncio.QueueFull:
+            while not fila.empty():
+                fila.get_nowait()
+            fila.put_nowait(None)
+
+    def receber(event: events.ChangeEvent) -> None:
+        # Called on the thread that wrote to the database.
+        loop.call_soon_threadsafe(enfileirar, event)
+
+    async def gerar() -> AsyncIterator[str]:
+        # Subscribe only once the response streams, so a client gone before
+        # that leaves no subscriber behind. Subscribe before reading the
+        # history so nothing falls in between; events seen twice are skipped
+        # by sequence number.
+        cancelar = events.subscribe(receber)
+        try:
+            ultimo = events.bus.last_seq
+            pendentes: list[events.ChangeEvent] | None = []
+            if last_event_id is not None:
+                try:
+                    pendentes = events.bus.since(int(last_event_id))
+                except ValueError:
+                    pendentes = None
+                if pendentes is not None:
+                    ultimo = int(last_event_id)
+            yield "retry: 3000\n\n"
+            if pendentes is None:
+                yield _SSE_RESET
+            else:
+                for pendente in pendentes:
+                    ultimo = pendente.seq
+                    yield _sse(pendente)
+            while True:
+                try:
+                    event = await asyncio.wait_for(fila.get(), EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    yield _SSE_RESET
+                elif event.seq > ultimo:
+                    ultimo = event.seq
+                    yield _sse(event)
+        finally:
+            cancelar()
+
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/stats")
-async def get_stats(limit: int = 5):
+async def get_stats(limit: int = 5) -> Dict[str, Any]:
     """Return basic application statistics."""
-    return controllers.obter_estatisticas(limit)
+    return await _run_db(controllers.obter_estatisticas, limit)
 
 
 def main(open_browser: bool = True) -> None:
     """Inicializa o servidor e, opcionalmente, abre a interface web."""
-    import uvicorn
     import threading
     import time
     import webbrowser
     from pathlib import Path
 
+    import uvicorn
+
     if open_browser:
         root_dir = Path(__file__).resolve().parents[4]
         index_file = root_dir / "web" / "index.html"
 
         if index_file.is_file():
+
             def _open() -> None:
                 time.sleep(1)
                 webbrowser.open_new_tab(index_file.as_uri())
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QObject, Qt, Signal
+
+from ia_sarah.core import events
+
+
+class ChangeNotifier(QObject):
+    """Deliver :mod:`ia_sarah.core.events` changes as a Qt signal.
+
+    Writes may happen on worker threads; each event is queued to the thread
+    owning the notifier (the GUI thread) before :attr:`changed` is emitted,
+    so connected slots can touch widgets directly.
+    """
+
+    changed = Signal(object)
+    _received = Signal(object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._received.connect(self.changed.emit, Qt.ConnectionType.QueuedConnection)
+        self._unsubscribe = events.subscribe(self._received.emit)
+        # Stop receiving events once the C++ object is gone.
+        self.destroyed.connect(self._unsubscribe)
+
+    def close(self) -> None:
+        """Stop listening to the event bus."""
+        self._unsubscribe()
@@ -1,27 +1,36 @@
 from __future__ import annotations
 
-import json
-
-from PySide6.QtCore import QEasingCurve, QPropertyAnimation, Qt, QPoint
-from PySide6.QtGui import QGuiApplication, QPixmap
+from typing import Any, Callable
+
+from PySide6.QtCore import (
+    QEasingCurve,
+    QPoint,
+    QPropertyAnimation,
+    Qt,
+    QThreadPool,
+    QTimer,
+)
+from PySide6.QtGui import QGuiApplication, QHideEvent, QPixmap
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QApplication,
+    QCheckBox,
+    QComboBox,
     QDialog,
     QDialogButtonBox,
-    QMessageBox,
-    QLabel,
-    QListWidget,
     QFileDialog,
     QFormLayout,
     QHBoxLayout,
     QInputDialog,
+    QLabel,
     QLineEdit,
-    QComboBox,
-    QCheckBox,
+    QListWidget,
     QMainWindow,
+    QMessageBox,
     QPushButton,
     QSplashScreen,
     QStackedWidget,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QToolBar,
@@ -29,11 +38,18 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from ia_sarah.core.use_cases import controllers
-from ia_sarah.core.entities.models import TrainingPlan
-
+from ia_sarah.core import events
+from ia_sarah.core.entities.models import Student, TrainingPlan
+from ia_sarah.core.interfaces.views.events_qt import ChangeNotifier
+from ia_sarah.core.interfaces.views.models_qt import StudentTableModel
 from ia_sarah.core.interfaces.views.theme import Palette, stylesheet
-from ia_sarah.core.interfaces.views.widgets_qt import AnimatedButton, CardFrame
+from ia_sarah.core.interfaces.views.widgets_qt import (
+    AnimatedButton,
+    CardFrame,
+    LoadingBar,
+)
+from ia_sarah.core.interfaces.views.workers_qt import Worker
+from ia_sarah.core.use_cases import controllers
 
 
 def show_feedback(parent: QWidget, message: str, error: bool = False) -> None:
@@ -138,12 +154,24 @@ class PlanDialog(QDialog):
         )
 
 
+def _dados_dashboard() -> tuple[int, list[tuple[Any, ...]]]:
+    return controllers.contar_alunos(), controllers.listar_planos_recentes(5)
+
+
 class DashboardPage(QWidget):
-    """Simple dashboard with statistics."""
+    """Simple dashboard with statistics.
 
-    def __init__(self) -> None:
+    With a :class:`ChangeNotifier` the statistics refresh by themselves
+    ``REFRESH_DELAY_MS`` after the last student or plan change.
+    """
+
+    REFRESH_DELAY_MS = 300
+
+    def __init__(self, notifier: ChangeNotifier | None = None) -> None:
         super().__init__()
         layout = QVBoxLayout(self)
+        self.loading = LoadingBar()
+        layout.addWidget(self.loading)
 
         card_stats = CardFrame()
         stats_layout = QVBoxLayout(card_stats)
@@ -166,26 +194,58 @@ class DashboardPage(QWidget):
         layout.addLayout(btn_row)
 
         self.refresh_btn.clicked.connect(self.load_data)
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self.REFRESH_DELAY_MS)
+        self._refresh_timer.timeout.connect(self.load_data)
+        if notifier is not None:
+            notifier.changed.connect(self._on_change)
 
         self.load_data()
 
+    def _on_change(self, event: events.ChangeEvent) -> None:
+        self._refresh_timer.start()
+
     def load_data(self) -> None:
-        total = controllers.contar_alunos()
+        self._refresh_timer.stop()
+        self.loading.run(
+            _dados_dashboard,
+            on_done=self._show_data,
+            on_error=lambda err: show_feedback(self, f"Erro ao carregar: {err}", True),
+        )
+
+    def _show_data(self, dados: tuple[int, list[tuple[Any, ...]]]) -> None:
+        total, recentes = dados
         self.total_label.setText(f"Total de alunos: {total}")
         self.plans_list.clear()
-        for _id, nome, aluno in controllers.listar_planos_recentes(5):
+        for _id, nome, aluno in recentes:
             self.plans_list.addItem(f"{nome} - {aluno}")
 
 
 class AlunosPage(QWidget):
-    """Page with CRUD operations for students."""
+    """Page with CRUD operations for students.
 
-    def __init__(self) -> None:
+    The table is a view over :class:`StudentTableModel`, which loads pages
+    in the background while scrolling and is updated in place after each
+    change, including changes announced by ``notifier``.
+    """
+
+    def __init__(self, notifier: ChangeNotifier | None = None) -> None:
         super().__init__()
+        self.notifier = notifier
         layout = QVBoxLayout(self)
 
-        self.table = QTableWidget(0, 3)
-        self.table.setHorizontalHeaderLabels(["ID", "Nome", "Email"])
+        self.loading = LoadingBar()
+        layout.addWidget(self.loading)
+        self.model = StudentTableModel(self, runner=self._run_query)
+        # Background lookups of changed students, by student id.
+        self._lookups: dict[int, Worker] = {}
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setStretchLastSection(True)
         layout.addWidget(self.table)
 
         btn_layout = QHBoxLayout()
@@ -203,27 +263,93 @@ class AlunosPage(QWidget):
         self.edit_btn.clicked.connect(self.editar)
         self.del_btn.clicked.connect(self.excluir)
         self.plan_btn.clicked.connect(self.abrir_planos)
-        self.table.itemDoubleClicked.connect(lambda *_: self.editar())
+        self.table.doubleClicked.connect(lambda *_: self.editar())
+        if notifier is not None:
+            notifier.changed.connect(self._on_change)
 
         self.load_data()
 
     def load_data(self) -> None:
-        self.table.setRowCount(0)
-        for row, aluno in enumerate(controllers.listar_alunos()):
-            self.table.insertRow(row)
-            values = (aluno.id, aluno.nome, aluno.email)
-            for col, value in enumerate(values):
-                item = QTableWidgetItem(str(value))
-                self.table.setItem(row, col, item)
+        self._cancel_lookups()
+        self.model.reload()
+
+    def _on_change(self, event: events.ChangeEvent) -> None:
+        """Apply a student change to the loaded rows.
+
+        Changes this page made itself are already shown, so each case is a
+        no-op when the model is up to date. Created and updated students are
+        fetched by a background :class:`Worker`; a newer event for the same
+        student, or a reload, discards the result of an older lookup.
+        """
+        aluno_id = event.id
+        if event.entity == events.DADOS or (
+            event.entity == events.ALUNO and aluno_id is None
+        ):
+            self.load_data()
+            return
+        if event.entity != events.ALUNO or aluno_id is None:
+            return
+        anterior = self._lookups.pop(aluno_id, None)
+        if anterior is not None:
+            anterior.cancel()
+        row = self.model.row_of(aluno_id)
+        if event.action == events.DELETED:
+            self.model.remove_row(row)
+            return
+        if not (
+            (event.action == events.CREATED and row < 0)
+            or (event.action == events.UPDATED and row >= 0)
+        ):
+            return
+        worker = Worker(controllers.obter_aluno, aluno_id)
 
-    def _selected_id(self) -> int | None:
-        row = self.table.currentRow()
+        def finished(aluno: Student | None) -> None:
+            if self._lookups.get(aluno_id) is worker:
+                del self._lookups[aluno_id]
+                if aluno is not None:
+                    self._apply_student(aluno_id, aluno)
+
+        def failed(_message: str) -> None:
+            if self._lookups.get(aluno_id) is worker:
+                del self._lookups[aluno_id]
+
+        worker.signals.finished.connect(finished)
+        worker.signals.error.connect(failed)
+        self._lookups[aluno_id] = worker
+        worker.start()
+
+    def _apply_student(self, aluno_id: int, aluno: Student) -> None:
+        row = self.model.row_of(aluno_id)
         if row < 0:
-            return None
-        item = self.table.item(row, 0)
-        if item:
-            return int(item.text())
-        return None
+            self.model.insert_student(aluno)
+        elif aluno != self.model.student_at(row):
+            self.model.update_student(row, aluno)
+
+    def _cancel_lookups(self) -> None:
+        for worker in self._lookups.values():
+            worker.cancel()
+        self._lookups.clear()
+
+    def _run_query(
+        self,
+        fn: Callable[[], Any],
+        on_done: Callable[[Any], None],
+        on_fail: Callable[[], None],
+    ) -> None:
+        def falhou(err: str) -> None:
+            on_fail()
+            show_feedback(self, f"Erro ao carregar alunos: {err}", True)
+
+        self.loading.run(fn, on_done=on_done, on_error=falhou, on_cancel=on_fail)
+
+    def _selected_id(self) -> int | None:
+        aluno = self.model.student_at(self.table.currentIndex().row())
+        return aluno.id if aluno else None
+
+    def _select(self, row: int) -> None:
+        if row >= 0:
+            self.table.selectRow(row)
+            self.table.scrollTo(self.model.index(row, 0))
 
     def adicionar(self) -> None:
         dlg = FullStudentDialog(parent=self)
@@ -235,17 +361,21 @@ class AlunosPage(QWidget):
                 show_feedback(self, "Dados inválidos", True)
                 return
             try:
-                controllers.adicionar_aluno_completo(
+                aluno_id = controllers.adicionar_aluno_completo(
                     nome,
                     email,
                     plano=data.get("plano"),
                     pagamento=data.get("pagamento"),
                 )
+                aluno = controllers.obter_aluno(aluno_id)
             except Exception as exc:  # pragma: no cover - runtime errors
                 show_feedback(self, f"Erro ao adicionar aluno: {exc}", True)
             else:
+                # Update the model first: the modal feedback runs the event
+                # loop, which delivers the change event for this student.
+                if aluno is not None:
+                    self._select(self.model.insert_student(aluno))
                 show_feedback(self, "Aluno adicionado com sucesso!")
-                self.load_data()
 
     def editar(self) -> None:
         aluno_id = self._selected_id()
@@ -258,13 +388,18 @@ class AlunosPage(QWidget):
         if dlg.exec() == QDialog.Accepted:
             nome, email = dlg.get_data()
             try:
-                controllers.atualizar_aluno(aluno_id, "nome", nome)
-                controllers.atualizar_aluno(aluno_id, "email", email)
+                atualizado = controllers.atualizar_aluno_campos(
+                    aluno_id, {"nome": nome, "email": email}
+                )
             except Exception as exc:  # pragma: no cover - runtime errors
                 show_feedback(self, f"Erro ao atualizar aluno: {exc}", True)
             else:
+                row = self.model.row_of(aluno_id)
+                if atualizado is None:
+                    self.model.remove_row(row)
+                else:
+                    self._select(self.model.update_student(row, atualizado))
                 show_feedback(self, "Aluno atualizado com sucesso!")
-                self.load_data()
 
     def excluir(self) -> None:
         aluno_id = self._selected_id()
@@ -275,8 +410,8 @@ class AlunosPage(QWidget):
         except Exception as exc:  # pragma: no cover - runtime errors
             show_feedback(self, f"Erro ao remover aluno: {exc}", True)
         else:
+            self.model.remove_row(self.model.row_of(aluno_id))
             show_feedback(self, "Aluno removido com sucesso!")
-            self.load_data()
 
     def abrir_planos(self) -> None:
         aluno_id = self._selected_id()
@@ -285,7 +420,7 @@ class AlunosPage(QWidget):
         dlg = QDialog(self)
         dlg.setWindowTitle("Planos do Aluno")
         layout = QVBoxLayout(dlg)
-        page = PlanosPage(aluno_id)
+        page = PlanosPage(aluno_id, self.notifier)
         layout.addWidget(page)
         close_btn = QDialogButtonBox(QDialogButtonBox.Close)
         close_btn.rejected.connect(dlg.reject)
@@ -294,13 +429,27 @@ class AlunosPage(QWidget):
 
 
 class PlanosPage(QWidget):
-    """List and edit training plans for a student."""
+    """List and edit training plans for a student.
+
+    Plans fetched by :meth:`load_data` are kept by id, so editing or
+    exporting the selected plan does not query the whole list again. After
+    a change the list is reloaded once, ``REFRESH_DELAY_MS`` after the last
+    change of this student's plans made here or announced by ``notifier``.
+    """
 
-    def __init__(self, aluno_id: int) -> None:
+    REFRESH_DELAY_MS = 100
+
+    def __init__(self, aluno_id: int, notifier: ChangeNotifier | None = None) -> None:
         super().__init__()
         self.aluno_id = aluno_id
+        self.planos: dict[int, TrainingPlan] = {}
         layout = QVBoxLayout(self)
 
+        self.loading = LoadingBar()
+        layout.addWidget(self.loading)
+        # Separate bar so refreshing the list does not cancel an export.
+        self.export_loading = LoadingBar("Exportando...")
+        layout.addWidget(self.export_loading)
         self.table = QTableWidget(0, 3)
         self.table.setHorizontalHeaderLabels(["ID", "Nome", "Descri\u00e7\u00e3o"])
         layout.addWidget(self.table)
@@ -321,12 +470,38 @@ class PlanosPage(QWidget):
         self.del_btn.clicked.connect(self.excluir)
         self.export_btn.clicked.connect(self.exportar)
         self.table.itemDoubleClicked.connect(lambda *_: self.editar())
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self.REFRESH_DELAY_MS)
+        self._refresh_timer.timeout.connect(self.load_data)
+        if notifier is not None:
+            notifier.changed.connect(self._on_change)
 
         self.load_data()
 
+    def _on_change(self, event: events.ChangeEvent) -> None:
+        if (
+            event.entity == events.DADOS
+            or (event.entity == events.PLANO and event.aluno_id == self.aluno_id)
+            or (event.entity == events.ALUNO and event.id == self.aluno_id)
+        ):
+            self._refresh_timer.start()
+
     def load_data(self) -> None:
+        self._refresh_timer.stop()
+        self.loading.run(
+            controllers.listar_planos,
+            self.aluno_id,
+            on_done=self._show_planos,
+            on_error=lambda err: show_feedback(
+                self, f"Erro ao carregar planos: {err}", True
+            ),
+        )
+
+    def _show_planos(self, planos: list[TrainingPlan]) -> None:
+        self.planos = {p.id: p for p in planos if p.id is not None}
         self.table.setRowCount(0)
-        for row, plano in enumerate(controllers.listar_planos(self.aluno_id)):
+        for row, plano in enumerate(planos):
             self.table.insertRow(row)
             values = (plano.id, plano.nome, plano.descricao)
             for col, value in enumerate(values):
@@ -343,10 +518,13 @@ class PlanosPage(QWidget):
         return None
 
     def _get_plano(self, plano_id: int) -> TrainingPlan | None:
-        for p in controllers.listar_planos(self.aluno_id):
-            if p.id == plano_id:
-                return p
-        return None
+        plano = self.planos.get(plano_id)
+        if plano is None:
+            plano = controllers.obter_plano(plano_id)
+            if plano is None or plano.aluno_id != self.aluno_id:
+                return None
+            self.planos[plano_id] = plano
+        return plano
 
     def adicionar(self) -> None:
         dlg = PlanDialog(parent=self)
@@ -359,7 +537,7 @@ class PlanosPage(QWidget):
                     show_feedback(self, f"Erro ao adicionar plano: {exc}", True)
                 else:
                     show_feedback(self, "Plano adicionado com sucesso!")
-                    self.load_data()
+                    self._refresh_timer.start()
 
     def editar(self) -> None:
         plano_id = self._selected_id()
@@ -382,7 +560,8 @@ class PlanosPage(QWidget):
                 show_feedback(self, f"Erro ao atualizar plano: {exc}", True)
             else:
                 show_feedback(self, "Plano atualizado com sucesso!")
-                self.load_data()
+                self.planos.pop(plano_id, None)
+                self._refresh_timer.start()
 
     def excluir(self) -> None:
         plano_id = self._selected_id()
@@ -394,7 +573,8 @@ class PlanosPage(QWidget):
             show_feedback(self, f"Erro ao remover plano: {exc}", True)
         else:
             show_feedback(self, "Plano removido com sucesso!")
-            self.load_data()
+            self.planos.pop(plano_id, None)
+            self._refresh_timer.start()
 
     def exportar(self) -> None:
         plano_id = self._selected_id()
@@ -403,12 +583,6 @@ class PlanosPage(QWidget):
         plano = self._get_plano(plano_id)
         if plano is None:
             return
-        try:
-            exercicios = json.loads(plano.exercicios_json or "[]")
-            if not isinstance(exercicios, list):
-                exercicios = []
-        except Exception:
-            exercicios = []
         formatos = ["pdf", "csv", "xlsx"]
         fmt, ok = QInputDialog.getItem(
             self, "Formato", "Escolha o formato:", formatos, 0, False
@@ -424,16 +598,28 @@ class PlanosPage(QWidget):
         )
         if not path:
             return
-        try:
-            controllers.exportar_treino(fmt, plano.nome, exercicios, path)
-        except Exception as exc:  # pragma: no cover - runtime errors
-            show_feedback(self, f"Erro ao exportar: {exc}", True)
-        else:
-            show_feedback(self, "Exporta\u00e7\u00e3o conclu\u00edda!")
+        self.export_loading.run(
+            controllers.exportar_treino,
+            fmt,
+            plano.nome,
+            plano.exercicios,
+            path,
+            on_done=lambda _: show_feedback(
+                self, "Exporta\u00e7\u00e3o conclu\u00edda!"
+            ),
+            on_error=lambda err: show_feedback(self, f"Erro ao exportar: {err}", True),
+        )
 
 
 class ConfigPage(QWidget):
-    """Configuration options for the app."""
+    """Configuration options for the app.
+
+    Changes are collected and written together once the controls have been
+    idle for ``SAVE_DELAY_MS``, so rapid toggling does not rewrite the file
+    on every click.
+    """
+
+    SAVE_DELAY_MS = 500
 
     def __init__(self) -> None:
         super().__init__()
@@ -448,7 +634,16 @@ class ConfigPage(QWidget):
         form.addRow(self.notify_box)
         self.backup_btn = QPushButton("Backup")
         form.addRow(self.backup_btn)
+        self.restore_btn = QPushButton("Restaurar backup")
+        form.addRow(self.restore_btn)
+        self.loading = LoadingBar()
+        form.addRow(self.loading)
         layout.addWidget(card)
+        self._pending: dict[str, Any] = {}
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(self.SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self.flush)
 
         conf = controllers.load_config()
         self.theme_combo.setCurrentText(controllers.load_theme())
@@ -457,28 +652,87 @@ class ConfigPage(QWidget):
         self.theme_combo.currentTextChanged.connect(self._save_theme)
         self.notify_box.stateChanged.connect(self._save_notify)
         self.backup_btn.clicked.connect(self._backup)
+        self.restore_btn.clicked.connect(self._restore)
+
+    def _queue_save(self, updates: dict[str, Any]) -> None:
+        self._pending.update(updates)
+        self._save_timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes immediately."""
+        self._save_timer.stop()
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            controllers.update_config(pending)
+
+    def hideEvent(self, event: QHideEvent) -> None:  # noqa: N802 - Qt override
+        self.flush()
+        super().hideEvent(event)
 
     def _save_theme(self, theme: str) -> None:
-        controllers.save_theme(theme)
+        self._queue_save({"theme": theme})
 
     def _save_notify(self) -> None:
-        controllers.update_config({"notifications": self.notify_box.isChecked()})
+        self._queue_save({"notifications": self.notify_box.isChecked()})
 
     def _backup(self) -> None:
         path, _ = QFileDialog.getSaveFileName(
             self,
             "Backup",
-            "backup.sqlite",
-            "*.sqlite",
+            "backup.sqlite.gz",
+            "*.sqlite.gz *.sqlite",
         )
         if not path:
             return
-        try:
-            controllers.backup_dados(path)
-        except Exception as exc:  # pragma: no cover - runtime errors
-            show_feedback(self, f"Erro ao gerar backup: {exc}", True)
-        else:
-            show_feedback(self, "Backup conclu\u00eddo")
+        self._run_in_background(
+            controllers.backup_dados, path, "Backup conclu\u00eddo", True
+        )
+
+    def _restore(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Restaurar",
+            "",
+            "*.sqlite.gz *.sqlite",
+        )
+        if not path:
+            return
+        resposta = QMessageBox.question(
+            self,
+            "Restaurar",
+            "Os dados atuais ser\u00e3o substitu\u00eddos. Continuar?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if resposta != QMessageBox.StandardButton.Yes:
+            return
+        # A restore replaces the live database and cannot stop halfway.
+        self._run_in_background(
+            controllers.restaurar_dados, path, "Backup restaurado", False
+        )
+
+    def _run_in_background(
+        self, fn: Callable[..., Any], path: str, message: str, cancellable: bool
+    ) -> None:
+        """Run a backup task off the UI thread, reporting page progress."""
+        self._set_buttons(False)
+        self.loading.run(
+            fn,
+            path,
+            text="Copiando banco...",
+            with_progress=True,
+            cancellable=cancellable,
+            on_done=lambda _: self._on_done(message, False),
+            on_error=lambda err: self._on_done(f"Erro no backup: {err}", True),
+            on_cancel=lambda: self._set_buttons(True),
+        )
+
+    def _set_buttons(self, enabled: bool) -> None:
+        self.backup_btn.setEnabled(enabled)
+        self.restore_btn.setEnabled(enabled)
+
+    def _on_done(self, message: str, error: bool) -> None:
+        self._set_buttons(True)
+        show_feedback(self, message, error)
 
 
 class MainWindow(QMainWindow):
@@ -532,16 +786,18 @@ class MainWindow(QMainWindow):
         fade_out.start()
 
     def _init_pages(self) -> None:
-        dashboard = DashboardPage()
+        self.notifier = ChangeNotifier(self)
+        dashboard = DashboardPage(self.notifier)
         dashboard.to_students_btn.clicked.connect(lambda: self.show_page("alunos"))
         self.pages["dashboard"] = dashboard
         self.stack.addWidget(dashboard)
 
-        alunos = AlunosPage()
+        alunos = AlunosPage(self.notifier)
         self.pages["alunos"] = alunos
         self.stack.addWidget(alunos)
 
         config = ConfigPage()
+        self.config_page = config
         self.pages["config"] = config
         self.stack.addWidget(config)
 
@@ -568,9 +824,7 @@ class MainWindow(QMainWindow):
             fade_out.setStartValue(1.0)
             fade_out.setEndValue(0.0)
             fade_out.setEasingCurve(QEasingCurve.InOutQuad)
-            fade_out.finished.connect(
-                lambda a=fade_out: self._animations.remove(a)
-            )
+            fade_out.finished.connect(lambda a=fade_out: self._animations.remove(a))
             self._animations.append(fade_out)
             fade_out.start()
         self.stack.setCurrentWidget(widget)
@@ -626,9 +880,13 @@ def criar_interface() -> None:
         app = QApplication([])
         app.setStyleSheet(stylesheet())
         _show_splash(app)
+        controllers.iniciar_backup_agendado()
         window = MainWindow()
         window.show()
         app.exec()
+        window.config_page.flush()
+        QThreadPool.globalInstance().waitForDone()
+        controllers.parar_backup_agendado()
     except Exception as exc:  # pragma: no cover - runtime errors
         app = QApplication.instance() or QApplication([])
         QMessageBox.critical(None, "Erro", f"Falha ao iniciar interface:\n{exc}")
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Callable, cast
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QPersistentModelIndex,
+    Qt,
+)
+
+from ia_sarah.core.entities.models import Student
+from ia_sarah.core.use_cases import controllers
+
+Runner = Callable[[Callable[[], Any], Callable[[Any], None], Callable[[], None]], None]
+Index = QModelIndex | QPersistentModelIndex
+
+
+def _chave(aluno: Student) -> tuple[str, int]:
+    # Rows come from the database, so ``id`` is always set.
+    return aluno.nome, cast(int, aluno.id)
+
+
+class StudentTableModel(QAbstractTableModel):
+    """Students ordered by name, fetched page by page as the view scrolls.
+
+    Rows come from :func:`controllers.listar_alunos_pagina` with keyset
+    pagination, so only the pages the user scrolled to are in memory.
+    Additions, edits and removals are applied to the loaded rows instead of
+    reloading the table.
+
+    ``runner(fn, on_done, on_fail)`` runs page queries off the GUI thread
+    and calls ``on_done(result)`` or ``on_fail()`` back on it; without one
+    pages are fetched synchronously.
+    """
+
+    HEADERS = ("ID", "Nome", "Email")
+
+    def __init__(
+        self,
+        parent: QObject | None = None,
+        page_size: int = 200,
+        runner: Runner | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.page_size = page_size
+        self.runner = runner
+        self._rows: list[Student] = []
+        # ``(nome, id)`` of each row, the sort key used by the query.
+        self._keys: list[tuple[str, int]] = []
+        self._exhausted = False
+        self._fetching = False
+        # Bumped by ``reload`` so pages requested before it are dropped.
+        self._generation = 0
+
+    # ----- Qt model interface -----
+
+    def rowCount(self, parent: Index = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: Index = QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        aluno = self._rows[index.row()]
+        return str((aluno.id, aluno.nome, aluno.email or "")[index.column()])
+
+    def headerData(  # noqa: N802
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent: Index = QModelIndex()) -> bool:  # noqa: N802
+        return not (parent.isValid() or self._exhausted or self._fetching)
+
+    def fetchMore(self, parent: Index = QModelIndex()) -> None:  # noqa: N802
+        if not self.canFetchMore(parent):
+            return
+        after = self._keys[-1] if self._keys else None
+        size = self.page_size
+        generation = self._generation
+
+        def query() -> list[Student]:
+            return controllers.listar_alunos_pagina(size, after)
+
+        def done(page: list[Student]) -> None:
+            if generation == self._generation:
+                self._fetching = False
+                self._append(page)
+
+        def fail() -> None:
+            if generation == self._generation:
+                self._fetching = False
+
+        if self.runner is None:
+            done(query())
+        else:
+            self._fetching = True
+            self.runner(query, done, fail)
+
+    def _append(self, page: list[Student]) -> None:
+        self._exhausted = len(page) < self.page_size
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self._keys.extend(_chave(a) for a in page)
+        self.endInsertRows()
+
+    # ----- Incremental updates -----
+
+    def reload(self) -> None:
+        """Drop loaded rows and fetch the first page again."""
+        self.beginResetModel()
+        self._rows.clear()
+        self._keys.clear()
+        self._exhausted = False
+        self._fetching = False
+        self._generation += 1
+        self.endResetModel()
+        self.fetchMore()
+
+    def student_at(self, row: int) -> Student | None:
+        """Return the student shown in ``row``."""
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    def row_of(self, aluno_id: int) -> int:
+        """Return the row showing ``aluno_id`` or ``-1``."""
+        for row, aluno in enumerate(self._rows):
+            if aluno.id == aluno_id:
+                return row
+        return -1
+
+    def insert_student(self, aluno: Student) -> int:
+        """Insert ``aluno`` at its sorted position; return the row or ``-1``.
+
+        Students sorting after the last loaded page are left for
+        :meth:`fetchMore` to bring in. A student already loaded is not
+        inserted again; its current row is returned.
+        """
+        key = _chave(aluno)
+        row = self.row_of(key[1])
+        if row >= 0:
+            return row
+        row = bisect_left(self._keys, key)
+        if row == len(self._rows) and not self._exhausted:
+            return -1
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, aluno)
+        self._keys.insert(row, key)
+        self.endInsertRows()
+        return row
+
+    def remove_row(self, row: int) -> None:
+        """Remove ``row`` after its student was deleted."""
+        if not 0 <= row < len(self._rows):
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        del self._keys[row]
+        self.endRemoveRows()
+
+    def update_student(self, row: int, aluno: Student) -> int:
+        """Replace ``row`` with the edited ``aluno``; return its new row."""
+        if not 0 <= row < len(self._rows):
+            return -1
+        key = _chave(aluno)
+        if row + 1 < len(self._keys):
+            fits_above = key < self._keys[row + 1]
+        else:
+            # Unloaded students sort after the last row's current key.
+            fits_above = self._exhausted or key <= self._keys[row]
+        if (row == 0 or self._keys[row - 1] < key) and fits_above:
+            self._rows[row] = aluno
+            self._keys[row] = key
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, self.columnCount() - 1)
+            )
+            return row
+        # The name changed its sort position.
+        self.remove_row(row)
+        return self.insert_student(aluno)
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+from typing import Any, Callable
+
 from PySide6.QtCore import QEasingCurve, QPropertyAnimation
 from PySide6.QtWidgets import (
-    QPushButton,
     QFrame,
     QGraphicsDropShadowEffect,
+    QHBoxLayout,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QWidget,
 )
 
 from ia_sarah.core.interfaces.views.theme import Palette
+from ia_sarah.core.interfaces.views.workers_qt import Worker
 
 
 class AnimatedButton(QPushButton):
@@ -42,11 +49,7 @@ class AnimatedButton(QPushButton):
 
     def _animate_hover(self, entering: bool) -> None:
         start = self.geometry()
-        end = (
-            start.adjusted(-2, -2, 2, 2)
-            if entering
-            else (self._base_geom or start)
-        )
+        end = start.adjusted(-2, -2, 2, 2) if entering else (self._base_geom or start)
         self._hover_anim = QPropertyAnimation(self, b"geometry")
         self._hover_anim.setDuration(150)
         self._hover_anim.setStartValue(start)
@@ -80,3 +83,99 @@ class CardFrame(QFrame):
         shadow.setOffset(0, 2)
         shadow.setColor(Palette.dark_gray)
         self.setGraphicsEffect(shadow)
+
+
+class LoadingBar(QWidget):
+    """Busy indicator with a cancel button for background work.
+
+    :meth:`run` starts a :class:`Worker` and shows the bar until it ends.
+    Starting a new task cancels the previous one, so a page refreshed twice
+    only applies the latest result. ``on_cancel`` is called when the task is
+    cancelled, by the user or by a newer task.
+    """
+
+    def __init__(
+        self, text: str = "Carregando...", parent: QWidget | None = None
+    ) -> None:
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel(text)
+        self.bar = QProgressBar()
+        self.bar.setTextVisible(False)
+        self.cancel_btn = QPushButton("Cancelar")
+        layout.addWidget(self.label)
+        layout.addWidget(self.bar, 1)
+        layout.addWidget(self.cancel_btn)
+        self.default_text = text
+        self.cancel_btn.clicked.connect(self.cancel)
+        self.worker: Worker | None = None
+        self._on_cancel: Callable[[], None] | None = None
+        self.hide()
+
+    @property
+    def busy(self) -> bool:
+        return self.worker is not None
+
+    def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_done: Callable[[Any], None],
+        on_error: Callable[[str], None] | None = None,
+        on_cancel: Callable[[], None] | None = None,
+        text: str | None = None,
+        with_progress: bool = False,
+        cancellable: bool = True,
+        **kwargs: Any,
+    ) -> Worker:
+        """Run ``fn`` in the background and pass its result to ``on_done``.
+
+        ``cancellable=False`` hides the cancel button, for tasks that must
+        not be interrupted halfway.
+        """
+        self.cancel()
+        self.label.setText(text or self.default_text)
+        self.cancel_btn.setVisible(cancellable)
+        worker = Worker(fn, *args, with_progress=with_progress, **kwargs)
+
+        def progress(done: int, total: int) -> None:
+            if worker is self.worker:
+                self.bar.setRange(0, total)
+                self.bar.setValue(done)
+
+        def finished(result: Any) -> None:
+            if self._finish(worker):
+                on_done(result)
+
+        def error(message: str) -> None:
+            if self._finish(worker) and on_error is not None:
+                on_error(message)
+
+        worker.signals.progress.connect(progress)
+        worker.signals.finished.connect(finished)
+        worker.signals.error.connect(error)
+        self.worker = worker
+        self._on_cancel = on_cancel
+        self.bar.setRange(0, 0)
+        self.show()
+        worker.start()
+        return worker
+
+    def cancel(self) -> None:
+        """Cancel the running task, if any, and hide the bar."""
+        worker, on_cancel = self.worker, self._on_cancel
+        self._finish(worker)
+        if worker is not None:
+            worker.cancel()
+            if on_cancel is not None:
+                on_cancel()
+
+    def _finish(self, worker: Worker | None) -> bool:
+        """Hide the bar if ``worker`` is current; return whether it was."""
+        if worker is None or worker is not self.worker:
+            return False
+        self.worker = None
+        self._on_cancel = None
+        self.hide()
+        return True
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class WorkerCancelled(Exception):
+    """Raised from the ``progresso`` callback of a cancelled worker."""
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by :class:`Worker` back on the GUI thread."""
+
+    progress = Signal(int, int)
+    finished = Signal(object)
+    error = Signal(str)
+    cancelled = Signal()
+
+
+class Worker(QRunnable):
+    """Run ``fn(*args, **kwargs)`` on the global thread pool.
+
+    When ``with_progress`` is true, ``fn`` receives a ``progresso`` keyword
+    argument that forwards ``(done, total)`` to :attr:`WorkerSignals.progress`.
+
+    :meth:`cancel` is cooperative: a worker that has not started yet is
+    skipped, the next ``progresso`` call raises :class:`WorkerCancelled`,
+    and the result of a call that completes anyway is discarded. Exactly one
+    of ``finished``, ``error`` or ``cancelled`` is emitted.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        with_progress: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancel = threading.Event()
+        if with_progress:
+            self.kwargs["progresso"] = self._progress
+
+    def _progress(self, done: int, total: int) -> None:
+        if self._cancel.is_set():
+            raise WorkerCancelled
+        self.signals.progress.emit(done, total)
+
+    def cancel(self) -> None:
+        """Ask the worker to stop; see the class docstring."""
+        self._cancel.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self) -> None:  # noqa: D401 - Qt signature
+        if self._cancel.is_set():
+            self.signals.cancelled.emit()
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except WorkerCancelled:
+            self.signals.cancelled.emit()
+        except Exception as exc:  # pragma: no cover - runtime errors
+            if self._cancel.is_set():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.error.emit(str(exc))
+        else:
+            if self._cancel.is_set():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(result)
+
+    def start(self) -> None:
+        """Queue the worker on the application-wide thread pool."""
+        QThreadPool.globalInstance().start(self)
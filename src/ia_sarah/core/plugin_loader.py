@@ -1,23 +1,56 @@
-"""Simple plugin loader using package entry points."""
+"""Simple plugin loader using package entry points.
+
+Discovery results are cached in memory and on disk (``PLUGIN_CACHE_FILE``).
+The disk cache is keyed by a fingerprint of the installed distributions, so
+scanning entry points is skipped until a package is installed, upgraded or
+removed. Plugin objects are imported on first use and the time spent
+importing each one is recorded (see :func:`plugin_timings`).
+"""
 
 from __future__ import annotations
 
+import hashlib
 import importlib
 import importlib.metadata
+import json
 import logging
 import os
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Dict, Type
+from typing import Any, Callable, Dict, Type
 
 logger = logging.getLogger(__name__)
 
-_CACHE: Dict[str, Dict[str, Type]] = {}
+# File holding discovered entry points between runs; empty disables it.
+PLUGIN_CACHE_FILE: str = os.getenv(
+    "PLUGIN_CACHE_FILE",
+    str(Path(__file__).resolve().parents[3] / "data" / "plugins.json"),
+)
+# Threads used by ``load_entrypoints`` to import independent plugins.
+PLUGIN_LOAD_THREADS: int = int(os.getenv("PLUGIN_LOAD_THREADS", "1"))
+
+# Discovered entry points per group; plugins are only imported on ``load()``.
+_CACHE: Dict[str, Dict[str, Any]] = {}
+# Loaded plugin objects and their import time in seconds, by (group, name).
+_LOADED: Dict[tuple[str, str], Any] = {}
+_TIMINGS: Dict[tuple[str, str], float] = {}
+_lock = threading.Lock()
+_local_imported = False
+# ``{"fingerprint": ..., "groups": {group: {name: value}}}`` read from disk.
+_disk: Dict[str, Any] | None = None
 
 
 def _import_local_plugins() -> None:
-    """Import modules inside ``ia_sarah.plugins`` package."""
+    """Import modules inside ``ia_sarah.plugins`` package, once."""
 
+    global _local_imported
+    if _local_imported:
+        return
+    _local_imported = True
     plugins_dir = Path(__file__).resolve().parents[1] / "plugins"
     for file in plugins_dir.glob("*.py"):
         if file.stem == "__init__":
@@ -28,40 +61,176 @@ def _import_local_plugins() -> None:
         try:
             importlib.import_module(module_name)
         except Exception as exc:  # noqa: BLE001
-            logger.error(
-                "Erro ao importar plugin local %s: %s", module_name, exc
-            )
+            logger.error("Erro ao importar plugin local %s: %s", module_name, exc)
+
+
+def _mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _fingerprint() -> str:
+    """Hash the distribution metadata visible on ``sys.path``.
+
+    Installing, upgrading or removing a package adds, renames or rewrites a
+    ``*.dist-info`` directory, which changes the hash. The mtime of each
+    ``entry_points.txt`` is included too, since editing it in place (as an
+    editable install does) leaves the directory mtime unchanged.
+    """
+    digest = hashlib.sha256(sys.version.encode())
+    for entry in sys.path:
+        try:
+            with os.scandir(entry or ".") as it:
+                infos = sorted(
+                    (
+                        e.name,
+                        e.stat().st_mtime_ns,
+                        _mtime(os.path.join(e.path, "entry_points.txt")),
+                    )
+                    for e in it
+                    if e.name.endswith((".dist-info", ".egg-info"))
+                )
+        except OSError:
+            continue
+        digest.update(repr((entry, infos)).encode())
+    return digest.hexdigest()
+
+
+def _read_disk_cache() -> Dict[str, Any]:
+    global _disk
+    if _disk is None:
+        _disk = {"fingerprint": _fingerprint(), "groups": {}}
+        if PLUGIN_CACHE_FILE:
+            try:
+                data = json.loads(Path(PLUGIN_CACHE_FILE).read_text("utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            if data.get("fingerprint") == _disk["fingerprint"]:
+                _disk["groups"] = data.get("groups", {})
+    return _disk
+
+
+def _write_disk_cache(disk: Dict[str, Any]) -> None:
+    if not PLUGIN_CACHE_FILE:
+        return
+    path = Path(PLUGIN_CACHE_FILE)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(disk, fh)
+        os.replace(tmp, path)
+    except OSError as exc:  # pragma: no cover - I/O
+        logger.warning("Erro ao gravar cache de plugins: %s", exc)
+
+
+def _scan(group: str) -> Dict[str, Any]:
+    """Return all entry points of ``group``, from the disk cache if valid."""
+    disk = _read_disk_cache()
+    values = disk["groups"].get(group)
+    if values is not None:
+        return {
+            name: importlib.metadata.EntryPoint(name, value, group)
+            for name, value in values.items()
+        }
+    entry_points = importlib.metadata.entry_points(group=group)
+    found = {ep.name: ep for ep in entry_points}
+    values = {name: getattr(ep, "value", None) for name, ep in found.items()}
+    if all(isinstance(v, str) for v in values.values()):
+        disk["groups"][group] = values
+        _write_disk_cache(disk)
+    return found
 
 
 def list_plugins(group: str) -> list[str]:
     """Return the names of available plugins for ``group``."""
-    load_entrypoints(group, lambda *_: None)
-    return list(_CACHE.get(group, {}).keys())
+    return list(discover_entrypoints(group))
 
 
-def load_entrypoints(
-    group: str, callback: Callable[[str, Type], None]
-) -> None:
-    """Load plugins from ``group`` and pass each to ``callback``.
+def discover_entrypoints(group: str) -> Dict[str, Any]:
+    """Return the enabled entry points of ``group`` by name, without loading.
 
-    Uses an in-memory cache to avoid reloading on subsequent calls.
+    Local plugins are imported once so they can register themselves. The
+    result is cached until :func:`reload_entrypoints` is called; use
+    :func:`load_plugin` to import a plugin.
     """
     _import_local_plugins()
     if group not in _CACHE:
-        registry: Dict[str, Type] = {}
         disabled = set(os.getenv("DISABLED_PLUGINS", "").split(","))
-        entry_points = importlib.metadata.entry_points(group=group)
-        for ep in entry_points:  # type: ignore[attr-defined]
-            if ep.name in disabled:
-                logger.info("Plugin %s desabilitado", ep.name)
+        found: Dict[str, Any] = {}
+        for name, ep in _scan(group).items():
+            if name in disabled:
+                logger.info("Plugin %s desabilitado", name)
                 continue
-            try:
-                obj = ep.load()
-                registry[ep.name] = obj
-            except Exception as exc:  # noqa: BLE001
-                logger.error("Failed to load plugin %s: %s", ep.name, exc)
-        _CACHE[group] = registry
-    for name, obj in _CACHE[group].items():
+            found[name] = ep
+        _CACHE[group] = found
+    return _CACHE[group]
+
+
+def load_plugin(group: str, name: str) -> Any:
+    """Import the plugin ``name`` of ``group`` and return its object.
+
+    Raises
+    ------
+    KeyError
+        When no such plugin is installed or it is disabled.
+    """
+    key = (group, name)
+    if key in _LOADED:
+        return _LOADED[key]
+    ep = discover_entrypoints(group)[name]
+    start = time.perf_counter()
+    obj = ep.load()
+    elapsed = time.perf_counter() - start
+    with _lock:
+        _LOADED[key] = obj
+        _TIMINGS[key] = elapsed
+    logger.debug("Plugin %s:%s carregado em %.1f ms", group, name, elapsed * 1000)
+    return obj
+
+
+def plugin_timings() -> Dict[str, float]:
+    """Return the import time in seconds of each loaded plugin.
+
+    Keys are ``"group:name"``; plugins not loaded yet are absent.
+    """
+    with _lock:
+        return {f"{g}:{n}": t for (g, n), t in _TIMINGS.items()}
+
+
+def load_entrypoints(
+    group: str,
+    callback: Callable[[str, Type[Any]], None],
+    threads: int | None = None,
+) -> None:
+    """Load plugins from ``group`` and pass each to ``callback``.
+
+    With ``threads`` > 1 (default ``PLUGIN_LOAD_THREADS``) independent
+    plugins are imported concurrently; ``callback`` is still called from the
+    calling thread in discovery order.
+    """
+    names = list(discover_entrypoints(group))
+    threads = PLUGIN_LOAD_THREADS if threads is None else threads
+
+    def _load(name: str) -> Any:
+        try:
+            return load_plugin(group, name)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to load plugin %s: %s", name, exc)
+            return exc
+
+    if threads > 1 and len(names) > 1:
+        with ThreadPoolExecutor(min(threads, len(names))) as pool:
+            objs = list(pool.map(_load, names))
+    else:
+        objs = [_load(name) for name in names]
+    for name, obj in zip(names, objs):
+        if isinstance(obj, Exception):
+            continue
         try:
             callback(name, obj)
         except Exception as exc:  # noqa: BLE001
@@ -69,7 +238,15 @@ def load_entrypoints(
 
 
 def reload_entrypoints(group: str) -> None:
-    """Reload plugins for ``group`` ignoring any cached values."""
+    """Rediscover plugins for ``group`` ignoring any cached values."""
 
+    global _local_imported
     _CACHE.pop(group, None)
-    load_entrypoints(group, lambda *_: None)
+    with _lock:
+        for key in [k for k in _LOADED if k[0] == group]:
+            del _LOADED[key]
+            _TIMINGS.pop(key, None)
+    if _disk is not None:
+        _disk["groups"].pop(group, None)
+    _local_imported = False
+    discover_entrypoints(group)
@@ -10,26 +10,37 @@ from threading import Thread
 from ia_sarah.core.adapters.utils import config_manager as cm
 
 try:
-    import sentry_sdk  # type: ignore
+    import sentry_sdk
 except ImportError:  # pragma: no cover - optional dependency
     sentry_sdk = None
 
 try:
     from prometheus_client import Counter, generate_latest
 except ImportError:  # pragma: no cover - optional dependency
-    Counter = None
-    generate_latest = None
+    Counter = None  # type: ignore[misc, assignment]
+    generate_latest = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
+REQUESTS_COUNTER: Counter | None = None
+CACHE_COUNTER: Counter | None = None
 if Counter is not None:
     REQUESTS_COUNTER = Counter("app_requests_total", "Total HTTP requests")
-else:  # pragma: no cover - optional dependency not installed
-    REQUESTS_COUNTER = None
+    CACHE_COUNTER = Counter(
+        "app_cache_requests_total",
+        "Cache lookups by cache name and result",
+        ["cache", "result"],
+    )
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Count a cache lookup as a hit or a miss."""
+    if CACHE_COUNTER is not None:
+        CACHE_COUNTER.labels(cache=cache, result="hit" if hit else "miss").inc()
 
 
 class MetricsHandler(BaseHTTPRequestHandler):
-    def do_GET(self):  # noqa: D401
+    def do_GET(self) -> None:  # noqa: D401
         """Serve metrics."""
         if REQUESTS_COUNTER is not None and generate_latest is not None:
             REQUESTS_COUNTER.inc()
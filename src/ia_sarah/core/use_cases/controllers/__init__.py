@@ -2,23 +2,96 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
 import logging
+import os
+import sqlite3
 from pathlib import Path
-from typing import Iterable, Any
-import json
-
-from ia_sarah.core.adapters.repositories import db
-from ia_sarah.core.entities.models import Student, TrainingPlan
-from ia_sarah.core.adapters.services import pdf_utils
-from ia_sarah.core.adapters.services.exporters import get_exporter, _REGISTRY
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Sequence
+
+from ia_sarah.core import telemetry
+from ia_sarah.core.adapters.repositories import backup, db
+from ia_sarah.core.adapters.services import batch, importers, pdf_utils, student_export
+from ia_sarah.core.adapters.services.batch import RelatorioLote, TarefaExportacao
+from ia_sarah.core.adapters.services.exporters import (
+    Exporter,
+    available_exporters,
+    get_exporter,
+)
+from ia_sarah.core.adapters.services.importers import ImportReport, Registro
+from ia_sarah.core.adapters.utils.cache import DiskCache, TTLCache
+from ia_sarah.core.adapters.utils.config_manager import load_config as _load_config
 from ia_sarah.core.adapters.utils.config_manager import load_theme as _load_theme
 from ia_sarah.core.adapters.utils.config_manager import save_theme as _save_theme
-from ia_sarah.core.adapters.utils.config_manager import load_config as _load_config
 from ia_sarah.core.adapters.utils.config_manager import update_config as _update_config
+from ia_sarah.core.entities.models import SearchResult, Student, TrainingPlan
 
 logger = logging.getLogger(__name__)
 
 
+# ----- Cache -----
+
+CACHE_SIZE: int = int(os.getenv("CACHE_SIZE", "1024"))
+CACHE_TTL: float = float(os.getenv("CACHE_TTL", "30"))
+
+_alunos_cache = TTLCache("alunos", CACHE_SIZE, CACHE_TTL, telemetry.record_cache_access)
+_planos_cache = TTLCache("planos", CACHE_SIZE, CACHE_TTL, telemetry.record_cache_access)
+_CACHES = (_alunos_cache, _planos_cache)
+
+# Rendered training-plan documents, keyed by a hash of their input.
+EXPORT_CACHE_DIR: Path = Path(
+    os.getenv("EXPORT_CACHE_DIR", str(db.DB_DIR / "cache" / "exports"))
+)
+EXPORT_CACHE_BYTES: int = int(os.getenv("EXPORT_CACHE_BYTES", str(256 << 20)))
+
+_exportacoes_cache = DiskCache(
+    "exportacoes", EXPORT_CACHE_DIR, EXPORT_CACHE_BYTES, telemetry.record_cache_access
+)
+
+
+def configurar_cache(enabled: bool) -> None:
+    """Enable or disable caching of student and plan lookups.
+
+    Parameters
+    ----------
+    enabled:
+        ``False`` sends every lookup straight to the database.
+    """
+    for cache in _CACHES:
+        cache.enabled = enabled
+        cache.clear()
+
+
+def limpar_cache() -> None:
+    """Drop every cached student and plan."""
+    for cache in _CACHES:
+        cache.clear()
+
+
+def estatisticas_cache() -> dict[str, dict[str, int]]:
+    """Return hit/miss counters and size of each cache.
+
+    Returns
+    -------
+    dict[str, dict[str, int]]
+        Mapping of cache name to ``hits``, ``misses`` and ``size``.
+    """
+    return {
+        c.name: {"hits": c.hits, "misses": c.misses, "size": len(c)}
+        for c in (*_CACHES, _exportacoes_cache)
+    }
+
+
+def limpar_cache_exportacoes() -> None:
+    """Delete every cached export document from disk."""
+    _exportacoes_cache.clear()
+
+
+configurar_cache(os.getenv("CACHE_ENABLED", "1") != "0")
+
+
 # ----- Config -----
 
 
@@ -44,7 +117,7 @@ def save_theme(theme: str) -> None:
     _save_theme(theme)
 
 
-def load_config() -> dict:
+def load_config() -> dict[str, Any]:
     """Load full configuration dictionary.
 
     Returns
@@ -55,7 +128,7 @@ def load_config() -> dict:
     return _load_config()
 
 
-def update_config(data: dict) -> None:
+def update_config(data: dict[str, Any]) -> None:
     """Merge configuration updates and persist them.
 
     Parameters
@@ -72,6 +145,7 @@ def update_config(data: dict) -> None:
 def init_app() -> None:
     """Initialize application database."""
     db.init_db()
+    limpar_cache()
 
 
 def listar_alunos() -> list[Student]:
@@ -86,6 +160,32 @@ def listar_alunos() -> list[Student]:
     return [Student(id=r[0], nome=r[1], email=r[2], data_inicio=r[3]) for r in records]
 
 
+def listar_alunos_pagina(
+    limit: int = 100,
+    after: tuple[str, int] | None = None,
+    nome: str | None = None,
+    email: str | None = None,
+) -> list[Student]:
+    """List one page of students using keyset pagination.
+
+    Parameters
+    ----------
+    limit:
+        Maximum number of students in the page.
+    after:
+        ``(nome, id)`` of the last student already returned.
+    nome, email:
+        Optional prefixes used as filters.
+
+    Returns
+    -------
+    list[Student]
+        Students ordered by name and id.
+    """
+    records = db.listar_alunos_page(limit, after, nome, email)
+    return [Student(id=r[0], nome=r[1], email=r[2], data_inicio=r[3]) for r in records]
+
+
 def obter_aluno(aluno_id: int) -> Student | None:
     """Retrieve single student record.
 
@@ -99,10 +199,15 @@ def obter_aluno(aluno_id: int) -> Student | None:
     tuple | None
         Complete student information or ``None`` when not found.
     """
-    r = db.obter_aluno(aluno_id)
-    if r is None:
-        return None
-    return Student(id=r[0], nome=r[1], email=r[2], data_inicio=r[3])
+
+    def carregar() -> Student | None:
+        r = db.obter_aluno(aluno_id)
+        if r is None:
+            return None
+        return Student(id=r[0], nome=r[1], email=r[2], data_inicio=r[3])
+
+    # Callers get their own copy so editing it cannot change the cache.
+    return copy.copy(_alunos_cache.get_or_load((db.DB_NAME, aluno_id), carregar))
 
 
 def adicionar_aluno(nome: str, email: str) -> int:
@@ -120,7 +225,9 @@ def adicionar_aluno(nome: str, email: str) -> int:
     int
         Database id of the created record.
     """
-    return db.adicionar_aluno(nome, email)
+    aluno_id = db.adicionar_aluno(nome, email)
+    _alunos_cache.invalidate((db.DB_NAME, aluno_id))
+    return aluno_id
 
 
 def adicionar_aluno_completo(
@@ -135,9 +242,96 @@ def adicionar_aluno_completo(
 ) -> int:
     """Create a student filling all optional fields."""
 
-    return db.adicionar_aluno_completo(
+    aluno_id = db.adicionar_aluno_completo(
         nome, email, data_inicio, plano, pagamento, progresso, dieta, treino
     )
+    _alunos_cache.invalidate((db.DB_NAME, aluno_id))
+    return aluno_id
+
+
+def _inserir_lote(
+    lote: list[tuple[int, tuple[Any, ...]]], report: ImportReport
+) -> None:
+    try:
+        report.inseridos += db.adicionar_alunos_lote([valores for _, valores in lote])
+    except sqlite3.Error:
+        # Isolate the offending rows so the rest of the chunk is kept.
+        for linha, valores in lote:
+            try:
+                report.inseridos += db.adicionar_alunos_lote([valores])
+            except sqlite3.Error as exc:
+                report.erros.append((linha, str(exc)))
+
+
+def importar_alunos(
+    registros: Iterable[tuple[int, Registro]], tamanho_lote: int = 1000
+) -> ImportReport:
+    """Validate and insert students in chunked transactions.
+
+    Parameters
+    ----------
+    registros:
+        ``(linha, registro)`` pairs, as produced by ``importers.ler_registros``
+        or ``enumerate(lista, start=1)``.
+    tamanho_lote:
+        Number of rows inserted per transaction.
+
+    Returns
+    -------
+    ImportReport
+        Inserted count and ``(linha, erro)`` for every rejected row.
+    """
+    report = ImportReport()
+    lote: list[tuple[int, tuple[Any, ...]]] = []
+    for linha, registro in registros:
+        try:
+            if isinstance(registro, ValueError):
+                raise registro
+            lote.append((linha, importers.normalizar_aluno(registro)))
+        except ValueError as exc:
+            report.erros.append((linha, str(exc)))
+            continue
+        if len(lote) >= tamanho_lote:
+            _inserir_lote(lote, report)
+            lote = []
+    if lote:
+        _inserir_lote(lote, report)
+    _alunos_cache.clear()
+    return report
+
+
+def importar_alunos_arquivo(
+    caminho: Path | str, tamanho_lote: int = 1000
+) -> ImportReport:
+    """Import students from a CSV, XLSX or JSON Lines file.
+
+    Parameters
+    ----------
+    caminho:
+        Source file; the format is chosen by its extension.
+    tamanho_lote:
+        Number of rows inserted per transaction.
+    """
+    return importar_alunos(importers.ler_registros(caminho), tamanho_lote)
+
+
+def exportar_alunos(formato: str = "ndjson", tamanho_lote: int = 1000) -> Iterator[str]:
+    """Stream every student as NDJSON (with plans) or CSV text chunks.
+
+    Parameters
+    ----------
+    formato:
+        ``"ndjson"`` or ``"csv"``.
+    tamanho_lote:
+        Rows fetched from the database and written per chunk.
+
+    Raises
+    ------
+    ValueError
+        When ``formato`` is not supported.
+    """
+    rows = db.iterar_alunos(tamanho_lote, com_planos=formato == "ndjson")
+    return student_export.serializar_alunos(rows, formato, tamanho_lote)
 
 
 def atualizar_aluno(aluno_id: int, campo: str, valor: str) -> None:
@@ -153,17 +347,48 @@ def atualizar_aluno(aluno_id: int, campo: str, valor: str) -> None:
         New value.
     """
     db.atualizar_aluno(aluno_id, campo, valor)
+    _alunos_cache.invalidate((db.DB_NAME, aluno_id))
 
 
-def remover_aluno(aluno_id: int) -> None:
+def atualizar_aluno_campos(aluno_id: int, campos: dict[str, Any]) -> Student | None:
+    """Update several fields of a student atomically.
+
+    Parameters
+    ----------
+    aluno_id:
+        Student identifier.
+    campos:
+        Mapping of column name to new value.
+
+    Returns
+    -------
+    Student | None
+        The updated student or ``None`` when it does not exist.
+    """
+    r = db.atualizar_aluno_campos(aluno_id, campos)
+    _alunos_cache.invalidate((db.DB_NAME, aluno_id))
+    if r is None:
+        return None
+    return Student(id=r[0], nome=r[1], email=r[2], data_inicio=r[3])
+
+
+def remover_aluno(aluno_id: int) -> bool:
     """Remove a student record.
 
     Parameters
     ----------
     aluno_id:
         Id of the record to delete.
+
+    Returns
+    -------
+    bool
+        ``True`` when a record was deleted.
     """
-    db.remover_aluno(aluno_id)
+    removido = db.remover_aluno(aluno_id)
+    _alunos_cache.invalidate((db.DB_NAME, aluno_id))
+    _planos_cache.invalidate((db.DB_NAME, aluno_id))
+    return removido
 
 
 # ----- Planos -----
@@ -179,20 +404,40 @@ def listar_planos(aluno_id: int) -> list[TrainingPlan]:
 
     Returns
     -------
-    list[tuple]
-        Plan records.
-    """
-    records = db.listar_planos(aluno_id)
-    return [
-        TrainingPlan(
-            id=r[0],
-            aluno_id=aluno_id,
-            nome=r[1],
-            descricao=r[2],
-            exercicios_json=r[3],
-        )
-        for r in records
-    ]
+    list[TrainingPlan]
+        Plans with ``exercicios`` already decoded.
+    """
+
+    def carregar() -> list[TrainingPlan]:
+        return [
+            TrainingPlan(
+                id=r[0],
+                aluno_id=r[1],
+                nome=r[2],
+                descricao=r[3],
+                exercicios=r[4],
+                exercicios_json=r[5],
+            )
+            for r in db.listar_planos_completos(aluno_id)
+        ]
+
+    return copy.deepcopy(_planos_cache.get_or_load((db.DB_NAME, aluno_id), carregar))
+
+
+def obter_plano(plano_id: int) -> TrainingPlan | None:
+    """Return a single training plan or ``None`` when it does not exist."""
+
+    r = db.obter_plano(plano_id)
+    if r is None:
+        return None
+    return TrainingPlan(
+        id=r[0],
+        aluno_id=r[1],
+        nome=r[2],
+        descricao=r[3],
+        exercicios=r[4],
+        exercicios_json=r[5],
+    )
 
 
 def adicionar_plano(
@@ -216,7 +461,9 @@ def adicionar_plano(
     int
         Generated identifier for the plan.
     """
-    return db.adicionar_plano(aluno_id, nome, descricao, exercicios_json)
+    plano_id = db.adicionar_plano(aluno_id, nome, descricao, exercicios_json)
+    _planos_cache.invalidate((db.DB_NAME, aluno_id))
+    return plano_id
 
 
 def adicionar_aluno_com_plano_pdf(
@@ -252,12 +499,7 @@ def adicionar_aluno_com_plano_pdf(
 
     aluno_id = adicionar_aluno(nome, email)
     plano_id = adicionar_plano(aluno_id, plano, descricao, exercicios_json)
-    try:
-        exercicios = json.loads(exercicios_json or "[]")
-        if not isinstance(exercicios, list):
-            exercicios = []
-    except Exception:
-        exercicios = []
+    exercicios = db.parse_exercicios(exercicios_json) or []
     exportar_treino("pdf", plano, exercicios, pdf_dest)
     return aluno_id, plano_id
 
@@ -278,7 +520,9 @@ def atualizar_plano(
     exercicios_json:
         Updated exercise list in JSON.
     """
-    db.atualizar_plano(plano_id, nome, descricao, exercicios_json)
+    aluno_id = db.atualizar_plano(plano_id, nome, descricao, exercicios_json)
+    if aluno_id is not None:
+        _planos_cache.invalidate((db.DB_NAME, aluno_id))
 
 
 def remover_plano(plano_id: int) -> None:
@@ -289,7 +533,30 @@ def remover_plano(plano_id: int) -> None:
     plano_id:
         Plan identifier to remove.
     """
-    db.remover_plano(plano_id)
+    aluno_id = db.remover_plano(plano_id)
+    if aluno_id is not None:
+        _planos_cache.invalidate((db.DB_NAME, aluno_id))
+
+
+# ----- Busca -----
+
+
+def buscar(termo: str, limit: int = 20) -> list[SearchResult]:
+    """Search students and plans by free text.
+
+    Parameters
+    ----------
+    termo:
+        Words to look for; each one matches as a prefix, ignoring accents.
+    limit:
+        Maximum number of results.
+
+    Returns
+    -------
+    list[SearchResult]
+        Matches ordered by relevance.
+    """
+    return [SearchResult(*r) for r in db.buscar(termo, limit)]
 
 
 # ----- Dashboard stats -----
@@ -306,7 +573,7 @@ def contar_alunos() -> int:
     return db.contar_alunos()
 
 
-def listar_planos_recentes(limit: int = 5) -> list[tuple]:
+def listar_planos_recentes(limit: int = 5) -> list[tuple[Any, ...]]:
     """Return most recent plans with student names.
 
     Parameters
@@ -322,14 +589,84 @@ def listar_planos_recentes(limit: int = 5) -> list[tuple]:
     return db.listar_planos_recentes(limit)
 
 
-def backup_dados(dest: str | Path) -> None:
-    """Create a copy of the database at ``dest``."""
+def backup_dados(
+    dest: str | Path,
+    comprimir: bool | None = None,
+    progresso: Callable[[int, int], None] | None = None,
+) -> Path:
+    """Create an online backup of the database at ``dest``.
+
+    Parameters
+    ----------
+    dest:
+        Target file; a ``.gz`` suffix enables compression by default.
+    comprimir:
+        Force or disable gzip compression.
+    progresso:
+        Optional ``callback(copiadas, total)`` receiving page progress.
+    """
+
+    return backup.criar_backup(dest, comprimir, progresso)
+
+
+def backup_rotativo(
+    diretorio: str | Path = backup.BACKUP_DIR,
+    manter: int = backup.BACKUP_KEEP,
+    comprimir: bool = True,
+) -> Path:
+    """Create a timestamped backup in ``diretorio`` keeping ``manter`` files."""
 
-    db.backup_database(dest)
+    return backup.backup_rotativo(diretorio, manter, comprimir)
+
+
+def restaurar_dados(
+    origem: str | Path, progresso: Callable[[int, int], None] | None = None
+) -> None:
+    """Replace the database with a verified backup.
+
+    Raises
+    ------
+    ValueError
+        When the backup fails the integrity check.
+    """
+
+    backup.restaurar_backup(origem, progresso)
+    limpar_cache()
+
+
+_backup_scheduler: backup.BackupScheduler | None = None
+
+
+def iniciar_backup_agendado(intervalo: float = backup.BACKUP_INTERVAL) -> bool:
+    """Start periodic rotated backups every ``intervalo`` seconds.
+
+    Returns ``False`` without starting anything when ``intervalo`` is not
+    positive (the default unless ``BACKUP_INTERVAL`` is set).
+    """
+
+    global _backup_scheduler
+    if intervalo <= 0:
+        return False
+    if _backup_scheduler is None:
+        _backup_scheduler = backup.BackupScheduler(intervalo)
+    _backup_scheduler.start()
+    return True
+
+
+def parar_backup_agendado() -> None:
+    """Stop the periodic backups started by :func:`iniciar_backup_agendado`."""
+
+    global _backup_scheduler
+    if _backup_scheduler is not None:
+        _backup_scheduler.stop()
+        _backup_scheduler = None
 
 
 def obter_estatisticas(limit: int = 5) -> dict[str, Any]:
-    """Retornar contagem de alunos e planos recentes.
+    """Retornar contagens do painel e planos recentes.
+
+    As contagens vêm da tabela ``estatisticas``, mantida por triggers, e não
+    percorrem ``alunos`` nem ``planos``.
 
     Parameters
     ----------
@@ -339,29 +676,93 @@ def obter_estatisticas(limit: int = 5) -> dict[str, Any]:
     Returns
     -------
     dict[str, Any]
-        Dicionário com ``total_alunos`` e ``planos_recentes``.
+        Dicionário com ``total_alunos``, ``total_planos``,
+        ``alunos_por_plano``, ``alunos_por_pagamento`` e
+        ``planos_recentes``.
     """
 
+    dados = db.ler_estatisticas()
     return {
-        "total_alunos": contar_alunos(),
+        "total_alunos": dados["alunos"],
+        "total_planos": dados["planos"],
+        "alunos_por_plano": dados["por_plano"],
+        "alunos_por_pagamento": dados["por_pagamento"],
         "planos_recentes": listar_planos_recentes(limit),
     }
 
 
+def verificar_estatisticas(corrigir: bool = False) -> list[tuple[Any, ...]]:
+    """Conferir a tabela ``estatisticas`` e, opcionalmente, reconstruí-la.
+
+    Parameters
+    ----------
+    corrigir:
+        Reconstruir a tabela a partir dos dados quando houver diferenças.
+
+    Returns
+    -------
+    list[tuple]
+        ``(chave, valor, armazenado, real)`` de cada contador divergente.
+    """
+
+    return db.verificar_estatisticas(corrigir)
+
+
 def listar_exportadores() -> list[str]:
     """Listar formatos de exportação disponíveis."""
 
-    return list(_REGISTRY.keys())
+    return available_exporters()
 
 
 # ----- Exportação -----
 
 
+def _chave_exportacao(
+    exporter: Exporter, fmt: str, titulo: str, exercicios: Sequence[dict[str, Any]]
+) -> str:
+    cls = type(exporter)
+    nome = f"{cls.__module__}.{cls.__qualname__}"
+    conteudo = json.dumps(
+        [fmt, nome, exporter.version, titulo, exercicios],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def _renderizar_treino(
+    exporter: Exporter, fmt: str, titulo: str, exercicios: Iterable[dict[str, Any]]
+) -> bytes | None:
+    """Return the document from the export cache, rendering it on a miss.
+
+    ``None`` means the export cannot be cached: the exporter has no
+    ``version`` or ``exercicios`` is a one-shot iterator, which is streamed
+    instead of being held in memory to compute its key.
+    """
+    if (
+        not _exportacoes_cache.enabled
+        or exporter.version is None
+        or not isinstance(exercicios, (list, tuple))
+    ):
+        return None
+    chave = _chave_exportacao(exporter, fmt, titulo, exercicios)
+    return _exportacoes_cache.get_or_create(
+        chave, lambda: exporter.to_bytes(titulo, exercicios)
+    )
+
+
 def exportar_treino(
-    fmt: str, titulo: str, exercicios: Iterable[dict], caminho: Path | str
+    fmt: str,
+    titulo: str,
+    exercicios: Iterable[dict[str, Any]],
+    caminho: Path | str | BinaryIO,
 ) -> None:
     """Export a training plan using a registered exporter.
 
+    Documents rendered from a list of exercises are kept in an on-disk
+    cache, so exporting an unchanged plan again copies the stored file.
+
     Parameters
     ----------
     fmt:
@@ -371,10 +772,99 @@ def exportar_treino(
     exercicios:
         Iterable with exercise dictionaries.
     caminho:
-        Destination path for the export file.
+        Destination path for the export file, or a binary file-like object
+        the export is written into.
     """
     exporter = get_exporter(fmt)
-    exporter.export(titulo, exercicios, Path(caminho))
+    dados = _renderizar_treino(exporter, fmt, titulo, exercicios)
+    if dados is not None:
+        if isinstance(caminho, (str, Path)):
+            Path(caminho).write_bytes(dados)
+        else:
+            caminho.write(dados)
+    elif isinstance(caminho, (str, Path)):
+        exporter.export(titulo, exercicios, Path(caminho))
+    else:
+        exporter.write(titulo, exercicios, caminho)
+
+
+def exportar_treino_bytes(
+    fmt: str, titulo: str, exercicios: Iterable[dict[str, Any]]
+) -> tuple[bytes, str]:
+    """Render a training plan in memory, using the export cache.
+
+    Returns
+    -------
+    tuple[bytes, str]
+        The document and its media type.
+    """
+    exporter = get_exporter(fmt)
+    dados = _renderizar_treino(exporter, fmt, titulo, exercicios)
+    if dados is None:
+        dados = exporter.to_bytes(titulo, exercicios)
+    return dados, exporter.media_type
+
+
+def _tarefas_lote(aluno_ids: Iterable[int] | None) -> Iterator[TarefaExportacao]:
+    if aluno_ids is None:
+        alunos = (
+            (a[0], a[1], [(p[1], p[3]) for p in a[9]])
+            for a in db.iterar_alunos(com_planos=True)
+        )
+    else:
+        alunos = (
+            (a[0], a[1], [(p[2], p[4]) for p in db.listar_planos_completos(a[0])])
+            for a in map(db.obter_aluno, aluno_ids)
+            if a is not None
+        )
+    for aluno_id, aluno, planos in alunos:
+        for plano, exercicios in planos:
+            yield TarefaExportacao(
+                titulo=f"{plano} - {aluno}",
+                exercicios=exercicios,
+                nome_arquivo=(
+                    f"{aluno_id}_{sanitize_filename(aluno)}_{sanitize_filename(plano)}"
+                ),
+            )
+
+
+def exportar_treinos_lote(
+    destino: Path | str,
+    aluno_ids: Iterable[int] | None = None,
+    fmt: str = "pdf",
+    processos: int | None = None,
+    progresso: Callable[[int, int], None] | None = None,
+) -> RelatorioLote:
+    """Export the training plans of many students at once.
+
+    Plans are rendered in parallel worker processes.
+
+    Parameters
+    ----------
+    destino:
+        Output directory, or a ``.zip`` file to pack every export.
+    aluno_ids:
+        Students to include; ``None`` exports every student.
+    fmt:
+        Registered export format.
+    processos:
+        Number of worker processes; defaults to ``EXPORT_WORKERS``.
+    progresso:
+        Optional ``callback(feitos, total)`` called after each plan.
+
+    Raises
+    ------
+    KeyError
+        When ``fmt`` is not a registered exporter.
+    """
+    get_exporter(fmt)
+    if aluno_ids is None:
+        tarefas: Iterable[TarefaExportacao] = _tarefas_lote(None)
+        total = db.contar_planos()
+    else:
+        tarefas = list(_tarefas_lote(aluno_ids))
+        total = len(tarefas)
+    return batch.exportar_lote(tarefas, destino, fmt, processos, progresso, total)
 
 
 # ----- PDF Utils -----
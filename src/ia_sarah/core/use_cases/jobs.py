@@ -0,0 +1,356 @@
+"""Background job queue persisted in SQLite.
+
+Jobs are rows of the ``jobs`` table processed by a pool of worker threads.
+Each job type has a handler registered with :func:`registrar_tarefa` and an
+optional concurrency limit; failed jobs are retried with exponential
+backoff up to ``max_tentativas`` times. Handlers that write rows either
+record what they created with :func:`salvar_params`, so a retry skips it,
+or are registered with ``max_tentativas=1``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from ia_sarah.core.adapters.repositories import db
+from ia_sarah.core.entities.models import Job
+from ia_sarah.core.use_cases import controllers
+
+logger = logging.getLogger(__name__)
+
+# Worker threads processing jobs.
+JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+# Attempts before a job is marked as failed.
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Base delay in seconds before a retry; doubled on every attempt.
+JOB_RETRY_DELAY: float = float(os.getenv("JOB_RETRY_DELAY", "5"))
+# Directory where job results are written.
+JOBS_DIR: Path = Path(os.getenv("JOBS_DIR", str(db.DB_DIR / "jobs")))
+
+
+def _parse_limites(texto: str) -> dict[str, int]:
+    """Parse ``"tipo=n,outro=m"`` into a dictionary."""
+    limites: dict[str, int] = {}
+    for parte in filter(None, (p.strip() for p in texto.split(","))):
+        tipo, _, valor = parte.partition("=")
+        limites[tipo.strip()] = int(valor)
+    return limites
+
+
+# Maximum simultaneous jobs per type, e.g. ``JOB_LIMITS=exportar_lote=1``.
+JOB_LIMITS: dict[str, int] = {
+    "exportar_lote": 1,
+    "backup": 1,
+    **_parse_limites(os.getenv("JOB_LIMITS", "")),
+}
+
+Progresso = Callable[[int, int], None]
+# ``handler(params, saida, progresso)`` returns the result file, if any.
+# ``saida`` is a path prefix inside ``JOBS_DIR`` reserved for the job.
+Tarefa = Callable[[dict[str, Any], Path, Progresso], "Path | str | None"]
+
+_TAREFAS: dict[str, Tarefa] = {}
+# Attempt caps of job types that must not run again after a failure.
+_MAX_TENTATIVAS: dict[str, int] = {}
+# Job being executed by the current worker thread.
+_atual = threading.local()
+
+
+def registrar_tarefa(
+    tipo: str, tarefa: Tarefa, max_tentativas: int | None = None
+) -> None:
+    """Register the handler executed for jobs of ``tipo``.
+
+    ``max_tentativas`` caps the attempts of every job of ``tipo``; use ``1``
+    for handlers whose partial work cannot be safely repeated.
+    """
+    _TAREFAS[tipo] = tarefa
+    if max_tentativas is None:
+        _MAX_TENTATIVAS.pop(tipo, None)
+    else:
+        _MAX_TENTATIVAS[tipo] = max_tentativas
+
+
+def salvar_params(params: dict[str, Any]) -> None:
+    """Persist ``params`` of the job running on this thread.
+
+    Handlers call it after committing rows, recording their ids in
+    ``params``; a retry receives the saved values and skips that step.
+    """
+    db.atualizar_params_job(_atual.job_id, json.dumps(params, ensure_ascii=False))
+
+
+def tipos_disponiveis() -> list[str]:
+    """Return the registered job types."""
+    return list(_TAREFAS)
+
+
+def _para_job(row: tuple[Any, ...]) -> Job:
+    return Job(
+        id=row[0],
+        tipo=row[1],
+        params=json.loads(row[2]),
+        status=row[3],
+        tentativas=row[4],
+        max_tentativas=row[5],
+        feitos=row[6],
+        total=row[7],
+        resultado=row[8],
+        erro=row[9],
+        criado_em=row[10],
+        atualizado_em=row[11],
+    )
+
+
+class JobQueue:
+    """Pool of threads executing queued jobs."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        limites: dict[str, int] | None = None,
+        retry_delay: float = JOB_RETRY_DELAY,
+        intervalo: float = 1.0,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.limites = JOB_LIMITS if limites is None else limites
+        self.retry_delay = retry_delay
+        # Upper bound for how long an idle worker sleeps, so delayed
+        # retries are picked up without an explicit notification.
+        self.intervalo = intervalo
+        self._cond = threading.Condition()
+        # Bumped by ``notify`` so a worker that found no job does not sleep
+        # through a notification sent while it was querying the database.
+        self._avisos = 0
+        self._stop = False
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """Requeue interrupted jobs and start the worker threads."""
+        if self._threads:
+            return
+        db.reiniciar_jobs_interrompidos()
+        self._stop = False
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._loop, name=f"job-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop the workers after their current job."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def notify(self, todos: bool = False) -> None:
+        """Wake an idle worker, e.g. after a job was queued."""
+        with self._cond:
+            self._avisos += 1
+            if todos:
+                self._cond.notify_all()
+            else:
+                self._cond.notify()
+
+    def _reservar(self) -> Job | None:
+        # Per-type limits are enforced by the database claim itself, so no
+        # lock is held while querying.
+        row = db.reservar_job(time.time(), self.limites)
+        return _para_job(row) if row else None
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+                avisos = self._avisos
+            try:
+                job = self._reservar()
+            except sqlite3.Error as exc:
+                logger.error("Erro ao buscar jobs: %s", exc)
+                job = None
+            if job is None:
+                with self._cond:
+                    if not self._stop and avisos == self._avisos:
+                        self._cond.wait(self.intervalo)
+                continue
+            try:
+                self._executar(job)
+            finally:
+                # A job of a type at its limit may be runnable now.
+                self.notify(todos=True)
+
+    def _executar(self, job: Job) -> None:
+        ultimo = 0.0
+
+        def progresso(feitos: int, total: int) -> None:
+            nonlocal ultimo
+            agora = time.monotonic()
+            # Throttle writes; always record completion.
+            if agora - ultimo >= 0.5 or (total and feitos >= total):
+                ultimo = agora
+                db.atualizar_progresso_job(job.id, feitos, total)
+
+        tarefa = _TAREFAS.get(job.tipo)
+        _atual.job_id = job.id
+        try:
+            if tarefa is None:
+                raise KeyError(f"Tipo de job desconhecido: {job.tipo}")
+            JOBS_DIR.mkdir(parents=True, exist_ok=True)
+            resultado = tarefa(job.params, JOBS_DIR / str(job.id), progresso)
+        except Exception as exc:  # noqa: BLE001 - stored in the job row
+            logger.error("Job %s (%s) falhou: %s", job.id, job.tipo, exc)
+            if tarefa is not None and job.tentativas < job.max_tentativas:
+                espera = self.retry_delay * 2 ** (job.tentativas - 1)
+                db.finalizar_job(
+                    job.id,
+                    "pending",
+                    erro=str(exc),
+                    disponivel_em=time.time() + espera,
+                )
+            else:
+                db.finalizar_job(job.id, "failed", erro=str(exc))
+            return
+        db.finalizar_job(
+            job.id, "done", resultado=str(resultado) if resultado else None
+        )
+
+
+_fila: JobQueue | None = None
+
+
+def iniciar(workers: int = JOB_WORKERS) -> JobQueue:
+    """Start the process-wide job queue (idempotent)."""
+    global _fila
+    if _fila is None:
+        _fila = JobQueue(workers)
+    _fila.start()
+    return _fila
+
+
+def parar() -> None:
+    """Stop the process-wide job queue."""
+    global _fila
+    if _fila is not None:
+        _fila.stop()
+        _fila = None
+
+
+def enviar(
+    tipo: str, params: dict[str, Any], max_tentativas: int = JOB_MAX_ATTEMPTS
+) -> int:
+    """Queue a job and return its id.
+
+    ``max_tentativas`` is lowered to the cap registered for ``tipo``.
+
+    Raises
+    ------
+    KeyError
+        When no handler is registered for ``tipo``.
+    """
+    if tipo not in _TAREFAS:
+        raise KeyError(f"Tipo de job desconhecido: {tipo}")
+    max_tentativas = min(max_tentativas, _MAX_TENTATIVAS.get(tipo, max_tentativas))
+    texto = json.dumps(params, ensure_ascii=False)
+    job_id = db.criar_job(tipo, texto, max_tentativas)
+    if _fila is not None:
+        _fila.notify()
+    return job_id
+
+
+def obter(job_id: int) -> Job | None:
+    """Return the current state of a job."""
+    row = db.obter_job(job_id)
+    return _para_job(row) if row else None
+
+
+# ----- Tarefas padrão -----
+
+
+def _exportar_treino(params: dict[str, Any], saida: Path, progresso: Progresso) -> Path:
+    caminho = saida.with_suffix(f".{params['fmt']}")
+    controllers.exportar_treino(
+        params["fmt"], params["titulo"], params.get("exercicios", []), caminho
+    )
+    return caminho
+
+
+def _exportar_lote(params: dict[str, Any], saida: Path, progresso: Progresso) -> Path:
+    report = controllers.exportar_treinos_lote(
+        saida.with_suffix(".zip"),
+        params.get("aluno_ids"),
+        params.get("formato", "pdf"),
+        progresso=progresso,
+    )
+    if report.erros and not report.gerados:
+        raise RuntimeError(f"Nenhum plano exportado: {report.erros[0][1]}")
+    return report.destino
+
+
+def _backup(params: dict[str, Any], saida: Path, progresso: Progresso) -> Path:
+    sufixo = ".sqlite.gz" if params.get("comprimir", True) else ".sqlite"
+    return controllers.backup_dados(saida.with_suffix(sufixo), progresso=progresso)
+
+
+def _importar_alunos(params: dict[str, Any], saida: Path, progresso: Progresso) -> Path:
+    registros = params["registros"]
+    report = controllers.importar_alunos(
+        enumerate(registros, start=1), params.get("tamanho_lote", 1000)
+    )
+    progresso(len(registros), len(registros))
+    caminho = saida.with_suffix(".json")
+    caminho.write_text(
+        json.dumps(
+            {
+                "inseridos": report.inseridos,
+                "erros": [{"linha": n, "erro": e} for n, e in report.erros],
+            },
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    return caminho
+
+
+def _aluno_com_plano_pdf(
+    params: dict[str, Any], saida: Path, progresso: Progresso
+) -> Path:
+    # The student and plan are created once; a retry only renders the PDF.
+    if "aluno_id" not in params:
+        params["aluno_id"] = controllers.adicionar_aluno(
+            params["nome"], params["email"]
+        )
+        salvar_params(params)
+    if "plano_id" not in params:
+        params["plano_id"] = controllers.adicionar_plano(
+            params["aluno_id"],
+            params["plano"],
+            params.get("descricao", ""),
+            params.get("exercicios_json", "[]"),
+        )
+        salvar_params(params)
+    plano = controllers.obter_plano(params["plano_id"])
+    if plano is None:
+        raise RuntimeError(f"Plano {params['plano_id']} não existe mais")
+    caminho = saida.with_suffix(".pdf")
+    controllers.exportar_treino("pdf", plano.nome, plano.exercicios, caminho)
+    return caminho
+
+
+registrar_tarefa("exportar_treino", _exportar_treino)
+registrar_tarefa("exportar_lote", _exportar_lote)
+registrar_tarefa("backup", _backup)
+# Rows are committed batch by batch, so a retry would insert them again.
+registrar_tarefa("importar_alunos", _importar_alunos, max_tentativas=1)
+registrar_tarefa("aluno_com_plano_pdf", _aluno_com_plano_pdf)
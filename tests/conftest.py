@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+# No plugin discovery cache in the repository's data/; tests that exercise
+# it point ``PLUGIN_CACHE_FILE`` at their tmp_path.
+os.environ["PLUGIN_CACHE_FILE"] = ""
+
+from ia_sarah.core import telemetry  # noqa: E402
+from ia_sarah.core.adapters.utils.cache import DiskCache  # noqa: E402
+from ia_sarah.core.use_cases import controllers  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _cache_exportacoes(tmp_path, monkeypatch):
+    """Keep rendered exports of each test out of the repository's data/."""
+    diretorio = tmp_path / "cache" / "exports"
+    monkeypatch.setattr(controllers, "EXPORT_CACHE_DIR", diretorio)
+    monkeypatch.setattr(
+        controllers,
+        "_exportacoes_cache",
+        DiskCache(
+            "exportacoes",
+            diretorio,
+            controllers.EXPORT_CACHE_BYTES,
+            telemetry.record_cache_access,
+        ),
+    )
@@ -1,14 +1,18 @@
+import asyncio
+import json
 import sys
+import threading
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 import pytest
-from httpx import AsyncClient, ASGITransport
+from httpx import ASGITransport, AsyncClient
 
+import ia_sarah.core.adapters.utils.config_manager as cm
 import ia_sarah.core.interfaces.api.server as server
 import ia_sarah.core.use_cases.controllers as controllers
-import ia_sarah.core.adapters.utils.config_manager as cm
+import ia_sarah.core.use_cases.jobs as jobs
 
 
 @pytest.mark.asyncio
@@ -43,10 +47,234 @@ async def test_api_crud(tmp_path):
         resp = await client.get(f"/students/{aluno_id}")
         assert resp.json()["nome"] == "Ana Maria"
 
+        # patch
+        resp = await client.patch(
+            f"/students/{aluno_id}", json={"email": "ana@novo.com"}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["nome"] == "Ana Maria"
+        assert resp.json()["email"] == "ana@novo.com"
+        resp = await client.patch(f"/students/{aluno_id}", json={"nome": None})
+        assert resp.status_code == 422
+        resp = await client.patch(
+            f"/students/{aluno_id}", json={"nome": "Ana", "email": None}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["nome"] == "Ana"
+        assert resp.json()["email"] is None
+
         # delete
         resp = await client.delete(f"/students/{aluno_id}")
         assert resp.status_code == 204
 
+        # missing student
+        resp = await client.put(
+            f"/students/{aluno_id}", json={"nome": "X", "email": "x@test.com"}
+        )
+        assert resp.status_code == 404
+        resp = await client.patch(f"/students/{aluno_id}", json={"nome": "X"})
+        assert resp.status_code == 404
+        resp = await client.delete(f"/students/{aluno_id}")
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_students_pagination(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    for nome in ["Caio", "Ana", "Bia", "Davi", "Ana Clara"]:
+        controllers.adicionar_aluno(nome, f"{nome.lower()}@test.com")
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        nomes = []
+        params = {"limit": 2}
+        while True:
+            resp = await client.get("/students", params=params)
+            assert resp.status_code == 200
+            nomes += [a["nome"] for a in resp.json()]
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 2, "after": cursor}
+        assert nomes == ["Ana", "Ana Clara", "Bia", "Caio", "Davi"]
+
+        resp = await client.get("/students", params={"nome": "Ana"})
+        assert [a["nome"] for a in resp.json()] == ["Ana", "Ana Clara"]
+        for prefixo in ["\U0010ffff", "Ana\U0010ffff", "\ud7ff"]:
+            resp = await client.get("/students", params={"nome": prefixo})
+            assert resp.status_code == 200
+            assert resp.json() == []
+
+        resp = await client.get(
+            "/students", params={"limit": 2}, headers={"Origin": "null"}
+        )
+        expostos = resp.headers["Access-Control-Expose-Headers"]
+        assert "X-Next-Cursor" in expostos
+
+        resp = await client.get("/students", params={"after": "invalid"})
+        assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_students_bulk(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        alunos = [
+            {"nome": "Ana", "email": "ana@test.com"},
+            {"nome": "", "email": "x@test.com"},
+            {"nome": "Bia", "email": "bia@test.com", "plano": "Anual"},
+        ]
+        resp = await client.post("/students/bulk", json=alunos)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["inseridos"] == 2
+        assert [e["linha"] for e in data["erros"]] == [2]
+
+
+@pytest.mark.asyncio
+async def test_export_students(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    ana = controllers.adicionar_aluno("Ana", "ana@test.com")
+    controllers.adicionar_aluno("Bia", "bia@test.com")
+    controllers.adicionar_plano(ana, "Treino A", "desc", '[{"nome": "Supino"}]')
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/export/students")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        linhas = [json.loads(linha) for linha in resp.text.splitlines()]
+        assert [a["nome"] for a in linhas] == ["Ana", "Bia"]
+        assert linhas[0]["planos"][0]["exercicios"] == [{"nome": "Supino"}]
+
+        resp = await client.get("/export/students", params={"format": "csv"})
+        assert resp.status_code == 200
+        linhas = resp.text.splitlines()
+        assert linhas[0].startswith("id,nome,email")
+        assert len(linhas) == 3
+
+        resp = await client.get("/export/students", params={"format": "xml"})
+        assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_jobs_api(tmp_path, monkeypatch):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    monkeypatch.setattr(jobs, "JOBS_DIR", tmp_path / "jobs")
+    ana = controllers.adicionar_aluno("Ana", "ana@test.com")
+    controllers.adicionar_plano(ana, "Treino A", "desc", '[{"nome": "Supino"}]')
+    jobs.iniciar(workers=1)
+    transport = ASGITransport(app=server.app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post("/exports/batch", json={"formato": "txt"})
+            assert resp.status_code == 400
+            resp = await client.post("/jobs", json={"tipo": "desconhecido"})
+            assert resp.status_code == 400
+
+            resp = await client.post("/exports/batch", json={"aluno_ids": [ana]})
+            assert resp.status_code == 202
+            job_id = resp.json()["id"]
+            for _ in range(100):
+                job = (await client.get(f"/jobs/{job_id}")).json()
+                if job["status"] in ("done", "failed"):
+                    break
+                await asyncio.sleep(0.05)
+            assert job["status"] == "done"
+            assert job["feitos"] == job["total"] == 1
+
+            resp = await client.get(f"/jobs/{job_id}/result")
+            assert resp.status_code == 200
+            assert resp.content[:2] == b"PK"
+
+            resp = await client.get("/jobs/9999")
+            assert resp.status_code == 404
+    finally:
+        jobs.parar()
+
+
+@pytest.mark.asyncio
+async def test_export_plan(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    ana = controllers.adicionar_aluno("Ana", "ana@test.com")
+    plano_id = controllers.adicionar_plano(
+        ana, "Treino A", "desc", '[{"nome": "Supino", "reps": 10}]'
+    )
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(f"/plans/{plano_id}/export")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/pdf"
+        assert resp.content.startswith(b"%PDF")
+        assert "treino_a.pdf" in resp.headers["content-disposition"]
+
+        resp = await client.get(f"/plans/{plano_id}/export", params={"format": "csv"})
+        assert resp.text.splitlines() == ["nome,reps", "Supino,10"]
+
+        resp = await client.get(f"/plans/{plano_id}/export", params={"format": "xlsx"})
+        assert resp.content[:2] == b"PK"
+
+        resp = await client.get(f"/plans/{plano_id}/export", params={"format": "txt"})
+        assert resp.status_code == 400
+        resp = await client.get("/plans/9999/export")
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    aluno_id = controllers.adicionar_aluno("Ana", "ana@test.com")
+    controllers.adicionar_plano(aluno_id, "Treino A", "", '[{"nome": "Remada"}]')
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/search", params={"q": "rem"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [(r["tipo"], r["aluno_id"]) for r in data] == [("plano", aluno_id)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_run_in_parallel(tmp_path, monkeypatch):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    aluno_id = controllers.adicionar_aluno("Ana", "ana@test.com")
+    obter = controllers.obter_aluno
+    lock = threading.Lock()
+    cheio = threading.Event()
+    em_curso = pico = 0
+
+    def lento(aluno_id):
+        nonlocal em_curso, pico
+        with lock:
+            em_curso += 1
+            pico = max(pico, em_curso)
+            if em_curso == 4:
+                cheio.set()
+        # Hold the first calls until four run at once (or give up).
+        cheio.wait(5)
+        try:
+            return obter(aluno_id)
+        finally:
+            with lock:
+                em_curso -= 1
+
+    monkeypatch.setattr(controllers, "obter_aluno", lento)
+    monkeypatch.setattr(server, "_db_limiter", None)
+    monkeypatch.setattr(server, "API_DB_CONCURRENCY", 4)
+    transport = ASGITransport(app=server.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resps = await asyncio.gather(
+            *(client.get(f"/students/{aluno_id}") for _ in range(8))
+        )
+    assert all(r.status_code == 200 for r in resps)
+    # Calls overlap up to API_DB_CONCURRENCY and never beyond it.
+    assert pico == 4
+
 
 @pytest.mark.asyncio
 async def test_config_api(tmp_path):
@@ -75,3 +303,55 @@ async def test_config_api(tmp_path):
         assert resp.status_code == 200
         data = resp.json()
         assert "total_alunos" in data
+        assert {"total_planos", "alunos_por_plano", "alunos_por_pagamento"} <= set(data)
+
+
+@pytest.mark.asyncio
+async def test_events_stream(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    antes = controllers.db.adicionar_aluno("Ana", "ana@test.com")
+    resp = await server.stream_events(last_event_id=str(server.events.bus.last_seq - 1))
+    corpo = resp.body_iterator
+    try:
+        assert (await corpo.__anext__()).startswith("retry:")
+        # Missed event replayed from the history.
+        replay = await corpo.__anext__()
+        assert json.loads(replay.split("data: ")[1])["id"] == antes
+
+        transport = ASGITransport(app=server.app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post(
+                "/students", json={"nome": "Bia", "email": "bia@test.com"}
+            )
+        novo = resp.json()["id"]
+        mensagem = await asyncio.wait_for(corpo.__anext__(), 5)
+        assert "event: change" in mensagem
+        dados = json.loads(mensagem.split("data: ")[1])
+        assert dados["entity"] == "aluno"
+        assert dados["action"] == "created"
+        assert dados["id"] == novo
+    finally:
+        await corpo.aclose()
+
+    resp = await server.stream_events(last_event_id="nope")
+    corpo = resp.body_iterator
+    try:
+        await corpo.__anext__()
+        assert (await corpo.__anext__()).startswith("event: reset")
+    finally:
+        await corpo.aclose()
+
+
+@pytest.mark.asyncio
+async def test_events_stream_subscribes_only_while_streaming():
+    inscritos = len(server.events.bus._subscribers)
+    # A client that disconnects before the body starts leaves nothing behind.
+    await server.stream_events(last_event_id=None)
+    assert len(server.events.bus._subscribers) == inscritos
+
+    corpo = (await server.stream_events(last_event_id=None)).body_iterator
+    await corpo.__anext__()
+    assert len(server.events.bus._subscribers) == inscritos + 1
+    await corpo.aclose()
+    assert len(server.events.bus._subscribers) == inscritos
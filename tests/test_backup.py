@@ -0,0 +1,70 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import ia_sarah.core.adapters.repositories.backup as backup
+import ia_sarah.core.adapters.repositories.db as db
+
+
+def _contar(path: Path) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM alunos").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def banco(tmp_path):
+    db.DB_NAME = str(tmp_path / "live.db")
+    db.init_db()
+    db.adicionar_alunos_lote(
+        [(f"Aluno {i}", f"a{i}@test.com") + (None,) * 6 for i in range(2000)]
+    )
+    yield tmp_path
+    db.close_pool()
+
+
+def test_backup_is_consistent_under_writes(banco, monkeypatch):
+    monkeypatch.setattr(db, "BACKUP_PAGES", 1)
+    progresso = []
+
+    def escrever(copiadas, total):
+        progresso.append((copiadas, total))
+        db.adicionar_aluno("Novo", "novo@test.com")
+
+    dest = backup.criar_backup(banco / "copia.sqlite", progresso=escrever)
+    assert progresso[-1][0] == progresso[-1][1]
+    assert len(progresso) > 1
+    assert _contar(dest) == 2000
+    assert backup.verificar_integridade(dest) == []
+    assert not (banco / "copia.sqlite-wal").exists()
+
+
+def test_backup_comprimido_e_restauracao(banco):
+    dest = backup.criar_backup(banco / "copia.sqlite.gz")
+    assert dest.read_bytes()[:2] == b"\x1f\x8b"
+    db.adicionar_aluno("Depois", "depois@test.com")
+    backup.restaurar_backup(dest)
+    assert len(db.listar_alunos()) == 2000
+
+
+def test_restaurar_rejeita_arquivo_invalido(banco):
+    invalido = banco / "invalido.sqlite"
+    invalido.write_bytes(b"not a database" * 100)
+    with pytest.raises(ValueError):
+        backup.restaurar_backup(invalido)
+    assert len(db.listar_alunos()) == 2000
+
+
+def test_backup_rotativo(banco):
+    pasta = banco / "backups"
+    for _ in range(4):
+        backup.backup_rotativo(pasta, manter=2)
+    restantes = backup.listar_backups(pasta)
+    assert len(restantes) == 2
+    assert all(p.name.endswith(".sqlite.gz") for p in restantes)
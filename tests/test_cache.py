@@ -0,0 +1,61 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ia_sarah.core.adapters.utils.cache import DiskCache, TTLCache
+
+
+def test_lru_and_ttl():
+    eventos = []
+    cache = TTLCache("t", maxsize=2, ttl=0.05, listener=lambda n, h: eventos.append(h))
+    assert cache.get_or_load("a", lambda: 1) == 1
+    assert cache.get_or_load("a", lambda: 2) == 1
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("c", lambda: 3)
+    assert cache.get_or_load("a", lambda: 10) == 10  # evicted as LRU
+    time.sleep(0.06)
+    assert cache.get_or_load("a", lambda: 20) == 20  # expired
+    assert (cache.hits, cache.misses) == (1, 5)
+    assert eventos == [False, True, False, False, False, False]
+
+
+def test_invalidate_during_load_is_not_stored():
+    cache = TTLCache("t")
+
+    def carregar():
+        cache.invalidate("k")
+        return "velho"
+
+    assert cache.get_or_load("k", carregar) == "velho"
+    assert cache.get_or_load("k", lambda: "novo") == "novo"
+
+
+def test_disabled():
+    cache = TTLCache("t")
+    cache.enabled = False
+    cache.get_or_load("k", lambda: 1)
+    assert cache.get_or_load("k", lambda: 2) == 2
+    assert len(cache) == 0
+
+
+def test_disk_cache_lru_by_size(tmp_path):
+    eventos = []
+    cache = DiskCache(
+        "d", tmp_path, max_bytes=10, listener=lambda n, h: eventos.append(h)
+    )
+    assert cache.get_or_create("aa1", lambda: b"1234") == b"1234"
+    cache.put("bb2", b"5678")
+    assert cache.get("aa1") == b"1234"  # now most recently used
+    cache.put("cc3", b"90ab")
+    assert cache.get("bb2") is None
+    assert cache.size_bytes == 8
+    cache.put("dd4", b"x" * 11)  # larger than the cache: not stored
+    assert eventos == [False, True, False]
+
+    # A new instance rebuilds the index from the files on disk.
+    outra = DiskCache("d", tmp_path, max_bytes=10)
+    assert len(outra) == 2 and outra.get("cc3") == b"90ab"
+    outra.clear()
+    assert len(outra) == 0 and cache.get("aa1") is None
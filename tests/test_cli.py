@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from typer.testing import CliRunner
+
+import ia_sarah.core.adapters.repositories.db as db
+from ia_sarah.core import cli
+
+# Time budget for ``iasarah-cli listar`` after interpreter start-up.
+LISTAR_BUDGET = 0.150
+
+_STARTUP = """
+import json, sys, time
+inicio = time.perf_counter()
+from ia_sarah.core.adapters.repositories import db
+db.DB_NAME = sys.argv[1]
+from ia_sarah.core import cli
+sys.argv = ["iasarah-cli", "listar"]
+try:
+    cli.main()
+except SystemExit:
+    pass
+pesados = {"ia_sarah.core.use_cases.controllers", "fastapi", "PySide6", "openpyxl",
+           "fpdf"}
+print(json.dumps([time.perf_counter() - inicio, sorted(pesados & set(sys.modules))]))
+"""
+
+
+def test_comandos_de_leitura(tmp_path):
+    db.DB_NAME = str(tmp_path / "cli.db")
+    db.init_db()
+    aluno_id = db.adicionar_aluno("Bruna Lima", "bruna@test.com")
+    db.adicionar_plano(aluno_id, "Força", "", '[{"nome": "Agachamento"}]')
+    runner = CliRunner()
+
+    resultado = runner.invoke(cli.app, ["listar"])
+    assert resultado.exit_code == 0
+    assert resultado.output == f"{aluno_id}\tBruna Lima\tbruna@test.com\n"
+    assert runner.invoke(cli.app, ["contar"]).output == "1 alunos, 1 planos\n"
+    resultado = runner.invoke(cli.app, ["buscar", "agacha"])
+    assert resultado.output.startswith("plano\t")
+
+
+def test_estatisticas_verifica_e_corrige(tmp_path):
+    db.DB_NAME = str(tmp_path / "cli.db")
+    db.init_db()
+    db.adicionar_aluno("Bruna Lima", "bruna@test.com")
+    runner = CliRunner()
+    resultado = runner.invoke(cli.app, ["estatisticas"])
+    assert resultado.exit_code == 0
+    assert resultado.output == "Estatísticas consistentes\n"
+
+    with db.get_connection() as conn:
+        conn.execute("DELETE FROM estatisticas")
+    resultado = runner.invoke(cli.app, ["estatisticas"])
+    assert resultado.exit_code == 1
+    assert "alunos: armazenado 0, real 1" in resultado.output
+    resultado = runner.invoke(cli.app, ["estatisticas", "--corrigir"])
+    assert resultado.exit_code == 0
+    assert resultado.output.endswith("contadores corrigidos\n")
+    assert runner.invoke(cli.app, ["contar"]).output == "1 alunos, 0 planos\n"
+
+
+def test_listar_startup_budget(tmp_path):
+    banco = str(tmp_path / "startup.db")
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).parents[1] / "src")}
+    tempos = []
+    for _ in range(3):
+        saida = subprocess.run(
+            [sys.executable, "-c", _STARTUP, banco],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        ).stdout
+        tempo, pesados = json.loads(saida.splitlines()[-1])
+        assert pesados == []
+        tempos.append(tempo)
+    assert min(tempos) < LISTAR_BUDGET, tempos
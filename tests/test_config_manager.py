@@ -16,3 +16,38 @@ def test_config_crud(tmp_path):
     assert cm.load_theme() == "dark"
     cm.delete_config()
     assert cm.CONFIG_FILE.exists() is False
+
+
+def test_config_cache_and_reload(tmp_path, monkeypatch):
+    cm.CONFIG_FILE = tmp_path / "conf.json"
+    cm.save_config({"theme": "flat"})
+    leituras = []
+    read_text = Path.read_text
+
+    def contar(self, *args, **kwargs):
+        leituras.append(self)
+        return read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", contar)
+    assert cm.load_config()["theme"] == "flat"
+    cm.load_config()["theme"] = "mutated"
+    assert cm.load_theme() == "flat"
+    assert leituras == []
+
+    # Another process replacing the file is picked up.
+    (tmp_path / "other.json").write_text('{"theme": "dark"}', encoding="utf-8")
+    (tmp_path / "other.json").replace(cm.CONFIG_FILE)
+    assert cm.load_theme() == "dark"
+    assert len(leituras) == 1
+
+
+def test_update_config_concurrent(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    cm.CONFIG_FILE = tmp_path / "conf.json"
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: cm.update_config({f"k{i}": i}), range(40)))
+    data = cm.load_config()
+    assert all(data[f"k{i}"] == i for i in range(40))
+    arquivos = sorted(p.name for p in tmp_path.iterdir())
+    assert arquivos == ["conf.json", "conf.json.lock"]
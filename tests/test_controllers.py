@@ -45,3 +45,120 @@ def test_adicionar_com_plano_pdf(tmp_path):
     )
     assert pdf_file.exists() and pdf_file.stat().st_size > 0
     assert aluno_id > 0 and plano_id > 0
+
+
+def test_listar_planos_com_exercicios(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    aluno_id = controllers.adicionar_aluno("Bia", "bia@test.com")
+    controllers.adicionar_plano(aluno_id, "A", "", '[{"nome": "Supino"}]')
+    (plano,) = controllers.listar_planos(aluno_id)
+    assert plano.aluno_id == aluno_id
+    assert plano.exercicios == [{"nome": "Supino"}]
+    assert plano.exercicios_json == '[{"nome": "Supino"}]'
+
+
+def test_cache_de_alunos_e_planos(tmp_path, monkeypatch):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    aluno_id = controllers.adicionar_aluno("Caio", "caio@test.com")
+    controllers.adicionar_plano(aluno_id, "A", "", "[]")
+    assert controllers.obter_aluno(aluno_id).nome == "Caio"
+    assert len(controllers.listar_planos(aluno_id)) == 1
+
+    chamadas = []
+    obter = controllers.db.obter_aluno
+    monkeypatch.setattr(
+        controllers.db, "obter_aluno", lambda i: chamadas.append(i) or obter(i)
+    )
+    assert controllers.obter_aluno(aluno_id).nome == "Caio"
+    assert chamadas == []
+
+    controllers.atualizar_aluno(aluno_id, "nome", "Caio Souza")
+    assert controllers.obter_aluno(aluno_id).nome == "Caio Souza"
+    assert chamadas == [aluno_id]
+
+    (plano,) = controllers.listar_planos(aluno_id)
+    controllers.atualizar_plano(plano.id, "B", "", "[]")
+    assert controllers.listar_planos(aluno_id)[0].nome == "B"
+    controllers.remover_plano(plano.id)
+    assert controllers.listar_planos(aluno_id) == []
+
+    stats = controllers.estatisticas_cache()
+    assert stats["alunos"]["hits"] >= 1 and stats["planos"]["misses"] >= 1
+
+    controllers.configurar_cache(False)
+    try:
+        controllers.obter_aluno(aluno_id)
+        controllers.obter_aluno(aluno_id)
+        assert chamadas == [aluno_id, aluno_id, aluno_id]
+    finally:
+        controllers.configurar_cache(True)
+
+
+def test_cache_devolve_copias(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    aluno_id = controllers.adicionar_aluno("Caio", "caio@test.com")
+    controllers.adicionar_plano(aluno_id, "A", "", '[{"nome": "Supino"}]')
+
+    controllers.obter_aluno(aluno_id).nome = "Outro"
+    assert controllers.obter_aluno(aluno_id).nome == "Caio"
+    (plano,) = controllers.listar_planos(aluno_id)
+    plano.nome = "B"
+    plano.exercicios[0]["nome"] = "Remada"
+    (plano,) = controllers.listar_planos(aluno_id)
+    assert plano.nome == "A"
+    assert plano.exercicios == [{"nome": "Supino"}]
+
+
+def test_exportar_treinos_lote(tmp_path):
+    import zipfile
+
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    ana = controllers.adicionar_aluno("Ana", "ana@test.com")
+    bia = controllers.adicionar_aluno("Bia", "bia@test.com")
+    controllers.adicionar_plano(ana, "Treino A", "", '[{"nome": "Supino"}]')
+    controllers.adicionar_plano(ana, "Treino B", "", '[{"nome": "Remada"}]')
+    controllers.adicionar_plano(bia, "Treino A", "", "[]")
+
+    progresso = []
+    report = controllers.exportar_treinos_lote(
+        tmp_path / "turma.zip",
+        processos=2,
+        progresso=lambda feitos, total: progresso.append((feitos, total)),
+    )
+    assert len(report.gerados) == 3 and not report.erros
+    assert progresso[-1] == (3, 3)
+    with zipfile.ZipFile(tmp_path / "turma.zip") as zf:
+        assert sorted(zf.namelist()) == sorted(report.gerados)
+
+    report = controllers.exportar_treinos_lote(tmp_path / "pasta", [bia], "csv", 1)
+    assert report.gerados == [f"{bia}_bia_treino_a.csv"]
+    assert (tmp_path / "pasta" / report.gerados[0]).exists()
+
+
+def test_exportar_treino_usa_cache(tmp_path, monkeypatch):
+    from ia_sarah.core.adapters.services.exporters import CSVExporter
+    from ia_sarah.core.adapters.utils.cache import DiskCache
+
+    cache = DiskCache("exportacoes", tmp_path / "cache")
+    monkeypatch.setattr(controllers, "_exportacoes_cache", cache)
+    chamadas = []
+    escrever = CSVExporter.write
+    monkeypatch.setattr(
+        CSVExporter,
+        "write",
+        lambda self, *a: chamadas.append(a[0]) or escrever(self, *a),
+    )
+    exercicios = [{"nome": "Supino", "series": 3}]
+    controllers.exportar_treino("csv", "A", exercicios, tmp_path / "a.csv")
+    dados, media = controllers.exportar_treino_bytes("csv", "A", exercicios)
+    assert dados == (tmp_path / "a.csv").read_bytes()
+    assert media == "text/csv"
+    assert chamadas == ["A"] and (cache.hits, cache.misses) == (1, 1)
+
+    controllers.exportar_treino_bytes("csv", "B", exercicios)
+    controllers.exportar_treino("csv", "A", iter(exercicios), tmp_path / "b.csv")
+    assert chamadas == ["A", "B", "A"] and len(cache) == 2
@@ -1,6 +1,10 @@
+import functools
+import json
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 import ia_sarah.core.adapters.repositories.db as db
@@ -22,6 +26,25 @@ def test_add_update_delete_aluno(tmp_path):
     assert len(todos) == 0
 
 
+def test_atualizar_aluno_campos(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    aluno_id = db.adicionar_aluno("Maria", "maria@test.com")
+    aluno = db.atualizar_aluno_campos(
+        aluno_id, {"nome": "Ana", "email": "ana@test.com", "plano": "Anual"}
+    )
+    assert aluno[:3] == (aluno_id, "Ana", "ana@test.com")
+    assert aluno[4] == "Anual"
+    assert db.obter_aluno(aluno_id) == aluno
+    assert db.atualizar_aluno_campos(aluno_id + 1, {"nome": "X"}) is None
+    with pytest.raises(ValueError):
+        db.atualizar_aluno_campos(aluno_id, {"id": 5})
+    with pytest.raises(ValueError):
+        db.atualizar_aluno_campos(aluno_id, {})
+    assert db.remover_aluno(aluno_id) is True
+    assert db.remover_aluno(aluno_id) is False
+
+
 def test_planos_crud(tmp_path):
     db.DB_NAME = str(tmp_path / "test.db")
     db.init_db()
@@ -48,3 +71,354 @@ def test_stats_functions(tmp_path):
     assert db.contar_alunos() == 2
     recentes = db.listar_planos_recentes(1)
     assert recentes and recentes[0][1] == "Plano 2"
+
+
+def test_estatisticas_mantidas_por_triggers(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    a1 = db.adicionar_aluno_completo("Ana", "a@t.com", plano="Mensal", pagamento="pago")
+    a2 = db.adicionar_aluno_completo("Bia", "b@t.com", plano="Mensal")
+    db.adicionar_alunos_lote([("Caio", "c@t.com", None, "Anual") + (None,) * 4])
+    db.adicionar_plano(a1, "P1", "", "[]")
+    db.adicionar_plano(a1, "P2", "", "[]")
+    db.adicionar_plano(a2, "P3", "", "[]")
+    db.atualizar_aluno_campos(a2, {"plano": "Anual", "pagamento": "atrasado"})
+    db.remover_aluno(a1)  # its plans go with it
+
+    assert db.ler_estatisticas() == {
+        "alunos": 2,
+        "planos": 1,
+        "por_plano": {"Anual": 2},
+        "por_pagamento": {"": 1, "atrasado": 1},
+    }
+    assert db.contar_planos() == 1
+    assert db.verificar_estatisticas() == []
+
+    with db.get_connection() as conn:
+        conn.execute("UPDATE estatisticas SET total = 7 WHERE chave = 'alunos'")
+        conn.execute("DELETE FROM estatisticas WHERE chave = 'plano'")
+    diferencas = db.verificar_estatisticas()
+    assert ("alunos", "", 7, 2) in diferencas and ("plano", "Anual", 0, 2) in diferencas
+    assert db.contar_alunos() == 7
+    assert db.verificar_estatisticas(corrigir=True) == diferencas
+    assert db.verificar_estatisticas() == []
+    assert db.contar_alunos() == 2
+
+
+def test_connection_pool_reuse_and_pragmas(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    with db.get_connection() as conn:
+        first = conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    with db.get_connection() as conn:
+        assert conn is first
+    db.close_pool()
+
+
+def test_connection_pool_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(
+            pool.map(lambda i: db.adicionar_aluno(f"A{i}", f"a{i}@t.com"), range(50))
+        )
+    assert len(set(ids)) == 50
+    assert db.contar_alunos() == 50
+    assert len(db.get_pool()._idle.queue) <= db.DB_POOL_SIZE
+    db.close_pool()
+
+
+def test_listar_alunos_page(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    for nome in ["Bruno", "Ana", "Carla", "Ana", "Beatriz"]:
+        db.adicionar_aluno(nome, f"{nome.lower()}@test.com")
+    page = db.listar_alunos_page(2)
+    assert [r[1] for r in page] == ["Ana", "Ana"]
+    page = db.listar_alunos_page(2, after=(page[-1][1], page[-1][0]))
+    assert [r[1] for r in page] == ["Beatriz", "Bruno"]
+    page = db.listar_alunos_page(2, after=(page[-1][1], page[-1][0]))
+    assert [r[1] for r in page] == ["Carla"]
+    assert [r[1] for r in db.listar_alunos_page(10, nome="B")] == ["Beatriz", "Bruno"]
+    assert [r[1] for r in db.listar_alunos_page(10, email="car")] == ["Carla"]
+
+
+# Scans that walk the rowid in order and stop at LIMIT are already optimal.
+ROWID_ORDERED_SCANS = ("ORDER BY planos.id DESC LIMIT",)
+
+
+def _trace_queries(monkeypatch) -> list[str]:
+    statements: list[str] = []
+    open_conn = db.ConnectionPool._open
+
+    def traced(self):
+        conn = open_conn(self)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    def traced_leitura():
+        conn = open_leitura()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    open_leitura = db._abrir_leitura
+    db.close_pool()
+    monkeypatch.setattr(db.ConnectionPool, "_open", traced)
+    monkeypatch.setattr(db, "_abrir_leitura", traced_leitura)
+    return statements
+
+
+def test_queries_use_indexes(tmp_path, monkeypatch):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    statements = _trace_queries(monkeypatch)
+
+    aluno_id = db.adicionar_aluno("Maria", "maria@test.com")
+    db.listar_alunos()
+    db.obter_aluno(aluno_id)
+    db.listar_alunos_page(10, after=("Ana", 1), nome="M")
+    db.listar_alunos_page(10, email="maria")
+    db.atualizar_aluno(aluno_id, "email", "m@test.com")
+    plano_id = db.adicionar_plano(aluno_id, "Treino A", "desc", '[{"nome": "Supino"}]')
+    db.listar_planos(aluno_id)
+    db.atualizar_plano(plano_id, "Treino B", "desc", "[]")
+    db.contar_alunos()
+    db.contar_planos()
+    db.ler_estatisticas()
+    db.listar_planos_recentes(5)
+    db.buscar("trei")
+    db.remover_plano(plano_id)
+    db.remover_aluno(aluno_id)
+    job_id = db.criar_job("backup", "{}")
+    db.reservar_job(0, {"exportar_lote": 1})
+    db.atualizar_progresso_job(job_id, 1, 2)
+    db.finalizar_job(job_id, "done")
+    db.obter_job(job_id)
+    db.reiniciar_jobs_interrompidos()
+
+    queries = [
+        " ".join(s.split())
+        for s in statements
+        if s.lstrip().split()[0].upper() in {"SELECT", "UPDATE", "DELETE"}
+        and "'main'." not in s  # FTS5 shadow-table bookkeeping
+    ]
+    assert queries
+    with db.get_connection() as conn:
+        tables = {
+            r[0]
+            for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+        for sql in queries:
+            plan = [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            scans = [
+                step
+                for step in plan
+                if step.startswith("SCAN ")
+                and step.split()[1] in tables
+                and "USING" not in step
+                and "VIRTUAL TABLE INDEX" not in step
+            ]
+            if any(marker in sql for marker in ROWID_ORDERED_SCANS):
+                continue
+            assert not scans, f"full scan in {sql!r}: {plan}"
+    db.close_pool()
+
+
+def test_buscar(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    joao = db.adicionar_aluno("João Pereira", "jp@test.com")
+    maria = db.adicionar_aluno("Maria", "maria@test.com")
+    exercicios = '[{"nome": "Supino reto"}, {"nome": "Agachamento"}]'
+    plano = db.adicionar_plano(maria, "Hipertrofia", "Foco em pernas", exercicios)
+    db.adicionar_plano(joao, "Livre", "", "texto que nao e json")
+
+    assert [(r[0], r[1]) for r in db.buscar("joao")] == [("aluno", joao)]
+    assert [(r[0], r[1], r[3]) for r in db.buscar("agach")] == [("plano", plano, maria)]
+    assert db.buscar("pern hiper")[0][1] == plano
+    assert db.buscar('"; DROP') == []
+    assert db.buscar("   ") == []
+
+    db.atualizar_aluno(joao, "nome", "Jorge")
+    assert db.buscar("joao") == []
+    assert db.buscar("jorge")[0][1] == joao
+    db.atualizar_plano(plano, "Força", "", "[]")
+    assert db.buscar("agach") == []
+    db.remover_aluno(maria)
+    assert db.buscar("forca") == []
+
+
+def test_buscar_ordena_todas_as_correspondencias(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    melhor = db.adicionar_aluno("Ana", "ana@test.com")
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO alunos (nome, email) VALUES (?, ?)",
+            [(f"Ana Maria Souza Lima {i}", f"a{i}@test.com") for i in range(600)],
+        )
+    # The best match is older than hundreds of weaker ones.
+    assert db.buscar("ana", limit=1)[0][1] == melhor
+
+
+def test_exercicios_normalizados(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    aluno_id = db.adicionar_aluno("Rita", "rita@test.com")
+    exercicios = [
+        {"nome": "Supino", "series": 3, "reps": "10", "peso": "20kg"},
+        {"nome": "Remada", "obs": "lento"},
+    ]
+    plano_id = db.adicionar_plano(aluno_id, "A", "", json.dumps(exercicios))
+    legado_id = db.adicionar_plano(aluno_id, "B", "", "3x supino")
+
+    planos = db.listar_planos_completos(aluno_id)
+    assert planos[0][0] == plano_id
+    assert planos[0][4] == exercicios
+    assert json.loads(planos[0][5]) == planos[0][4]
+    assert planos[1][0] == legado_id
+    assert planos[1][4] == [] and planos[1][5] == "3x supino"
+
+    db.atualizar_plano(plano_id, "A", "", '[{"nome": "Rosca"}]')
+    assert db.listar_planos(aluno_id)[0][3] == '[{"nome": "Rosca"}]'
+    with db.get_connection() as conn:
+        (total,) = conn.execute("SELECT COUNT(*) FROM exercicios").fetchone()
+    assert total == 1
+    db.remover_plano(plano_id)
+    with db.get_connection() as conn:
+        (total,) = conn.execute("SELECT COUNT(*) FROM exercicios").fetchone()
+    assert total == 0
+
+
+def test_exercicios_preservam_tipos_e_chaves(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    aluno_id = db.adicionar_aluno("Rita", "rita@test.com")
+    exercicios = [
+        {
+            "nome": "Supino",
+            "series": 4,
+            "reps": "8-10",
+            "peso": 22.5,
+            "video": "https://exemplo/supino",
+            "tags": ["peito", 1],
+            "unilateral": False,
+            "obs": None,
+        },
+        {"nome": "Prancha", "descanso": "60s"},
+    ]
+    plano_id = db.adicionar_plano(aluno_id, "A", "", json.dumps(exercicios))
+
+    assert db.obter_plano(plano_id)[4] == exercicios
+    assert json.loads(db.listar_planos(aluno_id)[0][3]) == exercicios
+    aluno = next(db.iterar_alunos(com_planos=True))
+    assert aluno[9][0][3] == exercicios
+    with db.get_connection() as conn:
+        row = conn.execute(
+            "SELECT series, peso, extras FROM exercicios WHERE ordem = 1"
+        ).fetchone()
+    assert row == (None, None, None)
+    assert db.buscar("supino")[0][1] == plano_id
+
+
+def test_plano_rejeita_exercicios_que_nao_sao_objetos(tmp_path):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    aluno_id = db.adicionar_aluno("Rita", "rita@test.com")
+    with pytest.raises(ValueError):
+        db.adicionar_plano(aluno_id, "A", "", '[{"nome": "Supino"}, "Remada"]')
+    plano_id = db.adicionar_plano(aluno_id, "B", "", '[{"nome": "Supino"}]')
+    with pytest.raises(ValueError):
+        db.atualizar_plano(plano_id, "B", "", "[1]")
+    assert db.contar_planos() == 1
+    assert db.obter_plano(plano_id)[4] == [{"nome": "Supino"}]
+
+
+def test_migracao_exercicios_json(tmp_path, monkeypatch):
+    db.DB_NAME = str(tmp_path / "test.db")
+    todas = list(db.MIGRATIONS)
+    anteriores = todas[: todas.index(db._migrar_exercicios)]
+    monkeypatch.setattr(db, "MIGRATIONS", anteriores)
+    db.init_db()
+    with db.get_connection() as conn:
+        conn.execute("INSERT INTO alunos (id, nome) VALUES (1, 'Ana')")
+        conn.executemany(
+            "INSERT INTO planos (aluno_id, nome, exercicios) VALUES (1, ?, ?)",
+            [
+                ("A", '[{"nome": "Supino", "series": "3"}, {"nome": "Remada"}]'),
+                ("B", "texto livre"),
+                ("C", None),
+                ("D", '[{"nome": "Leg press", "series": 3, "carga": 40.5}]'),
+                ("E", '[{"nome": "Supino"}, "Agachamento livre"]'),
+            ],
+        )
+    monkeypatch.setattr(db, "MIGRATIONS", todas)
+    db.init_db()
+
+    planos = db.listar_planos_completos(1)
+    assert planos[0][4] == [{"nome": "Supino", "series": "3"}, {"nome": "Remada"}]
+    assert planos[1][5] == "texto livre"
+    assert planos[2][4] == [] and planos[2][5] == "[]"
+    assert planos[3][4] == [{"nome": "Leg press", "series": 3, "carga": 40.5}]
+    assert planos[4][4] == []
+    assert planos[4][5] == '[{"nome": "Supino"}, "Agachamento livre"]'
+    assert db.buscar("remada")[0][1] == planos[0][0]
+    assert db.buscar("leg")[0][1] == planos[3][0]
+
+
+def test_prefix_range_limites():
+    assert db._prefix_range("Ana") == ("Ana", "Anb")
+    assert db._prefix_range("a\U0010ffff") == ("a\U0010ffff", "b")
+    assert db._prefix_range("\U0010ffff\U0010ffff")[1] is None
+    assert db._prefix_range("\ud7ff")[1] == "\ue000"
+
+
+def test_iterar_alunos(tmp_path, monkeypatch):
+    db.DB_NAME = str(tmp_path / "test.db")
+    db.init_db()
+    ana = db.adicionar_aluno("Ana", "ana@test.com")
+    bia = db.adicionar_aluno("Bia", "bia@test.com")
+    db.adicionar_aluno("Caio", "caio@test.com")
+    db.adicionar_plano(ana, "A", "d", '[{"nome": "Supino"}, {"nome": "Remada"}]')
+    db.adicionar_plano(ana, "B", "d", "texto livre")
+    db.adicionar_plano(bia, "C", "d", "[]")
+
+    alunos = list(db.iterar_alunos(tamanho_lote=2))
+    assert [a[1] for a in alunos] == ["Ana", "Bia", "Caio"]
+    assert len(alunos[0]) == 9
+
+    alunos = list(db.iterar_alunos(tamanho_lote=2, com_planos=True))
+    assert [a[1] for a in alunos] == ["Ana", "Bia", "Caio"]
+    planos = alunos[0][9]
+    assert [p[1] for p in planos] == ["A", "B"]
+    assert [e["nome"] for e in planos[0][3]] == ["Supino", "Remada"]
+    assert planos[1][3] == [] and planos[1][4] == "texto livre"
+    assert [p[1] for p in alunos[1][9]] == ["C"]
+    assert alunos[2][9] == []
+
+    statements = _trace_queries(monkeypatch)
+    list(db.iterar_alunos(com_planos=True))
+    sql = next(s for s in statements if "LEFT JOIN exercicios" in s)
+    with db.get_connection() as conn:
+        plan = [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    db.close_pool()
+
+
+def test_iterar_alunos_nao_ocupa_o_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_NAME", str(tmp_path / "stream.db"))
+    pool = functools.partial(db.ConnectionPool, size=1, timeout=0.2)
+    monkeypatch.setattr(db, "ConnectionPool", pool)
+    db.init_db()
+    db.adicionar_alunos_lote([(f"A{i}", None) + (None,) * 6 for i in range(5)])
+    stream = db.iterar_alunos(tamanho_lote=1)
+    assert next(stream)[1] == "A0"
+    # The only pooled connection is still free while the export streams.
+    assert db.contar_alunos() == 5
+    assert len(list(stream)) == 4
+    db.close_pool()
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import ia_sarah.core.adapters.repositories.db as db
+from ia_sarah.core import events
+
+
+def test_bus_delivers_and_keeps_history():
+    bus = events.EventBus(history=2)
+    recebidos = []
+    cancelar = bus.subscribe(recebidos.append)
+    bus.subscribe(lambda e: 1 / 0)  # a failing subscriber does not stop others
+    primeiro = bus.publish(events.ALUNO, events.CREATED, 1)
+    bus.publish(events.ALUNO, events.UPDATED, 1)
+    cancelar()
+    bus.publish(events.ALUNO, events.DELETED, 1)
+
+    assert [e.action for e in recebidos] == [events.CREATED, events.UPDATED]
+    assert [e.seq for e in bus.since(1)] == [2, 3]
+    assert bus.since(3) == []
+    # Event 1 already left the history; a client at seq 0 must reload.
+    assert bus.since(primeiro.seq - 1) is None
+    assert bus.since(99) is None
+
+
+def test_repository_writes_publish_events(tmp_path):
+    db.DB_NAME = str(tmp_path / "events.db")
+    db.init_db()
+    recebidos = []
+    cancelar = events.subscribe(recebidos.append)
+    try:
+        aluno_id = db.adicionar_aluno("Ana", "ana@test.com")
+        db.atualizar_aluno_campos(aluno_id, {"nome": "Ana Maria"})
+        db.atualizar_aluno_campos(aluno_id + 100, {"nome": "Nada"})
+        plano_id = db.adicionar_plano(aluno_id, "A", "", "[]")
+        db.atualizar_plano(plano_id, "B", "", "[]")
+        db.remover_plano(plano_id)
+        db.adicionar_alunos_lote([("Bia", "b@test.com") + (None,) * 6])
+        db.remover_aluno(aluno_id)
+    finally:
+        cancelar()
+
+    assert [(e.entity, e.action, e.id, e.aluno_id) for e in recebidos] == [
+        (events.ALUNO, events.CREATED, aluno_id, None),
+        (events.ALUNO, events.UPDATED, aluno_id, None),
+        (events.PLANO, events.CREATED, plano_id, aluno_id),
+        (events.PLANO, events.UPDATED, plano_id, aluno_id),
+        (events.PLANO, events.DELETED, plano_id, aluno_id),
+        (events.ALUNO, events.CREATED, None, None),
+        (events.ALUNO, events.DELETED, aluno_id, None),
+    ]
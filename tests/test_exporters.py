@@ -1,11 +1,13 @@
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from ia_sarah.core.use_cases import controllers
 
-
 EXERCISES = [{"nome": "Supino", "series": "3", "reps": "10"}]
 
 
@@ -29,3 +31,108 @@ def test_exportar_invalid(tmp_path):
         pass
     else:
         assert False, "expected KeyError"
+
+
+def test_csv_streams_generator_with_union_header(tmp_path):
+    from ia_sarah.core.adapters.services.exporters import CSVExporter
+
+    def gerar():
+        yield {"nome": "Supino", "series": 3}
+        yield {"nome": "Remada", "reps": 12}
+        yield {"nome": "Agachamento", "obs": "fora do lookahead"}
+
+    out = tmp_path / "plan.csv"
+    CSVExporter(lookahead=2).export("Treino", gerar(), out)
+    linhas = out.read_text(encoding="utf-8").splitlines()
+    assert linhas == [
+        "nome,series,reps",
+        "Supino,3,",
+        "Remada,,12",
+        "Agachamento,,",
+    ]
+
+
+def test_xlsx_streams_generator_with_schema(tmp_path):
+    import openpyxl
+
+    from ia_sarah.core.adapters.services.exporters import ExcelExporter
+
+    out = tmp_path / "plan.xlsx"
+    rows = ({"nome": f"Ex {i}", "reps": i} for i in range(3))
+    ExcelExporter(schema=["nome", "series", "reps"]).export(
+        "Treino: semana [1]", rows, out
+    )
+    ws = openpyxl.load_workbook(out).active
+    assert ws.title == "Treino_ semana _1_"
+    assert [c.value for c in ws[1]] == ["nome", "series", "reps"]
+    assert [c.value for c in ws[3]] == ["Ex 1", None, 1]
+
+
+def test_exportar_vazio(tmp_path):
+    for fmt in ("csv", "xlsx"):
+        out = tmp_path / f"vazio.{fmt}"
+        controllers.exportar_treino(fmt, "Treino", iter([]), out)
+        assert out.exists()
+
+
+def test_write_to_stream_and_fallback(tmp_path):
+    import io
+
+    from ia_sarah.core.adapters.services.exporters import Exporter
+
+    buffer = io.BytesIO()
+    controllers.exportar_treino("csv", "Treino", EXERCISES, buffer)
+    assert buffer.getvalue().startswith(b"nome,series,reps")
+    assert not buffer.closed
+
+    class FileOnly(Exporter):
+        def export(self, title, exercises, path):
+            path.write_bytes(title.encode())
+
+    assert FileOnly().to_bytes("abc", []) == b"abc"
+
+
+def test_export_failure_keeps_destination(tmp_path):
+    from ia_sarah.core.adapters.services.exporters import get_exporter
+
+    def exercicios():
+        yield EXERCISES[0]
+        raise RuntimeError("falhou")
+
+    destino = tmp_path / "treino.csv"
+    destino.write_text("anterior")
+    with pytest.raises(RuntimeError):
+        get_exporter("csv").export("Treino", exercicios(), destino)
+    assert destino.read_text() == "anterior"
+    assert list(tmp_path.iterdir()) == [destino]
+
+
+def test_import_is_lazy():
+    import subprocess
+
+    codigo = (
+        "import sys; import ia_sarah.core.use_cases.controllers; "
+        "print(sorted({'openpyxl', 'fpdf'} & set(sys.modules)))"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).parents[1] / "src")},
+    ).stdout
+    assert saida.strip() == "[]"
+
+
+def test_register_exporter_by_path(monkeypatch):
+    from ia_sarah.core.adapters.services import exporters
+
+    monkeypatch.setattr(exporters, "_REGISTRY", {})
+    exporters.register_exporter(
+        "tsv", "ia_sarah.core.adapters.services.exporters:CSVExporter"
+    )
+    exporters.register_exporter("quebrado", "modulo_inexistente:Exporter")
+    assert {"tsv", "quebrado"} <= set(controllers.listar_exportadores())
+    assert isinstance(exporters.get_exporter("tsv"), exporters.CSVExporter)
+    with pytest.raises(KeyError):
+        exporters.get_exporter("quebrado")
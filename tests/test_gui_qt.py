@@ -1,3 +1,4 @@
+import os
 import sys
 from importlib import import_module
 from pathlib import Path
@@ -6,6 +7,25 @@ import pytest
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture
+def qapp():
+    try:
+        from PySide6.QtWidgets import QApplication
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    return QApplication.instance() or QApplication([])
+
+
+def _wait_workers(qapp):
+    """Let background workers finish and deliver their signals."""
+    from PySide6.QtCore import QThreadPool
+
+    QThreadPool.globalInstance().waitForDone()
+    qapp.processEvents()
+
 
 def test_import_qt_interface():
     try:
@@ -24,7 +44,7 @@ def test_stylesheet_string():
     assert isinstance(css, str) and "QPushButton" in css
 
 
-def test_alunos_page(tmp_path):
+def test_alunos_page(tmp_path, qapp):
     try:
         gui_qt = import_module("ia_sarah.core.interfaces.views.gui_qt")
     except Exception as exc:  # pragma: no cover - env issues
@@ -35,12 +55,16 @@ def test_alunos_page(tmp_path):
     db.DB_NAME = str(tmp_path / "test_gui.db")
     db.init_db()
 
+    db.adicionar_aluno("Joao", "joao@test.com")
+
     page = gui_qt.AlunosPage()
     page.load_data()
-    assert page.table.rowCount() == 0
+    _wait_workers(qapp)
+    assert page.model.rowCount() == 1
+    assert not page.loading.busy
 
 
-def test_planos_page(tmp_path):
+def test_planos_page(tmp_path, qapp):
     try:
         gui_qt = import_module("ia_sarah.core.interfaces.views.gui_qt")
     except Exception as exc:  # pragma: no cover - env issues
@@ -52,4 +76,255 @@ def test_planos_page(tmp_path):
     aluno_id = db.adicionar_aluno("Joao", "joao@test.com")
     page = gui_qt.PlanosPage(aluno_id)
     page.load_data()
+    _wait_workers(qapp)
     assert page.table.rowCount() == 0
+    assert not page.loading.busy
+
+
+def test_planos_page_looks_up_plans_by_id(tmp_path, qapp, monkeypatch):
+    try:
+        gui_qt = import_module("ia_sarah.core.interfaces.views.gui_qt")
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    import ia_sarah.core.adapters.repositories.db as db
+    from ia_sarah.core.use_cases import controllers
+
+    db.DB_NAME = str(tmp_path / "test_gui.db")
+    controllers.init_app()
+    aluno_id = controllers.adicionar_aluno("Joao", "joao@test.com")
+    outro_id = controllers.adicionar_aluno("Ana", "ana@test.com")
+    plano_id = controllers.adicionar_plano(aluno_id, "A", "", "[]")
+    alheio = controllers.adicionar_plano(outro_id, "B", "", "[]")
+    page = gui_qt.PlanosPage(aluno_id)
+    _wait_workers(qapp)
+    assert list(page.planos) == [plano_id]
+
+    def listar(_aluno_id):
+        raise AssertionError("plan list queried again")
+
+    monkeypatch.setattr(controllers, "listar_planos", listar)
+    assert page._get_plano(plano_id).nome == "A"
+    page.planos.clear()
+    assert page._get_plano(plano_id).nome == "A"
+    assert page._get_plano(alheio) is None
+
+
+def test_student_model_fetches_pages_and_updates_in_place(tmp_path, qapp):
+    try:
+        models_qt = import_module("ia_sarah.core.interfaces.views.models_qt")
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    import ia_sarah.core.adapters.repositories.db as db
+    from ia_sarah.core.use_cases import controllers
+
+    db.DB_NAME = str(tmp_path / "test_gui.db")
+    controllers.init_app()
+    db.adicionar_alunos_lote(
+        [(f"Aluno {i:03}", f"a{i}@test.com") + (None,) * 6 for i in range(250)]
+    )
+    model = models_qt.StudentTableModel(page_size=100)
+    model.reload()
+    assert model.rowCount() == 100 and model.canFetchMore()
+    model.fetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 250 and not model.canFetchMore()
+    assert model.data(model.index(0, 1)) == "Aluno 000"
+
+    novo_id = controllers.adicionar_aluno("Aluno 000b", "b@test.com")
+    row = model.insert_student(controllers.obter_aluno(novo_id))
+    assert row == 1 and model.rowCount() == 251
+
+    editado = controllers.atualizar_aluno_campos(novo_id, {"nome": "Zeca"})
+    assert model.update_student(row, editado) == 250
+    assert model.student_at(250).nome == "Zeca"
+
+    model.remove_row(250)
+    assert model.rowCount() == 250 and model.row_of(novo_id) == -1
+
+
+def test_worker_cancel_discards_result(qapp):
+    try:
+        workers_qt = import_module("ia_sarah.core.interfaces.views.workers_qt")
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    import threading
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def task(progresso):
+        started.set()
+        release.wait(5)
+        progresso(1, 2)
+        return "done"
+
+    worker = workers_qt.Worker(task, with_progress=True)
+    seen = []
+    worker.signals.finished.connect(lambda r: seen.append(("finished", r)))
+    worker.signals.cancelled.connect(lambda: seen.append(("cancelled",)))
+    worker.start()
+    assert started.wait(5)
+    worker.cancel()
+    release.set()
+    _wait_workers(qapp)
+    assert seen == [("cancelled",)]
+
+
+def test_alunos_page_follows_changes_from_other_threads(tmp_path, qapp):
+    try:
+        gui_qt = import_module("ia_sarah.core.interfaces.views.gui_qt")
+        events_qt = import_module("ia_sarah.core.interfaces.views.events_qt")
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    import threading
+
+    from ia_sarah.core.use_cases import controllers
+
+    controllers.db.DB_NAME = str(tmp_path / "test_gui.db")
+    controllers.init_app()
+    ana = controllers.adicionar_aluno("Ana", "ana@test.com")
+    notifier = events_qt.ChangeNotifier()
+    page = gui_qt.AlunosPage(notifier)
+    _wait_workers(qapp)
+    assert page.model.rowCount() == 1
+
+    def escrever():
+        controllers.adicionar_aluno("Bia", "bia@test.com")
+        controllers.atualizar_aluno_campos(ana, {"nome": "Zoe"})
+
+    thread = threading.Thread(target=escrever)
+    thread.start()
+    thread.join()
+    qapp.processEvents()
+    _wait_workers(qapp)
+    assert [page.model.student_at(r).nome for r in range(2)] == ["Bia", "Zoe"]
+
+    controllers.remover_aluno(ana)
+    qapp.processEvents()
+    assert page.model.rowCount() == 1
+    notifier.close()
+
+
+def test_alunos_page_fetches_changes_off_the_gui_thread(tmp_path, qapp, monkeypatch):
+    try:
+        gui_qt = import_module("ia_sarah.core.interfaces.views.gui_qt")
+        events_qt = import_module("ia_sarah.core.interfaces.views.events_qt")
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    import threading
+
+    from ia_sarah.core.use_cases import controllers
+
+    controllers.db.DB_NAME = str(tmp_path / "test_gui.db")
+    controllers.init_app()
+    ana = controllers.adicionar_aluno("Ana", "ana@test.com")
+    notifier = events_qt.ChangeNotifier()
+    page = gui_qt.AlunosPage(notifier)
+    _wait_workers(qapp)
+
+    obter_aluno = controllers.obter_aluno
+    threads = []
+
+    def obter(aluno_id):
+        threads.append(threading.current_thread())
+        return obter_aluno(aluno_id)
+
+    monkeypatch.setattr(controllers, "obter_aluno", obter)
+    controllers.atualizar_aluno_campos(ana, {"nome": "Zoe"})
+    qapp.processEvents()
+    _wait_workers(qapp)
+    assert threads and threading.main_thread() not in threads
+    assert page.model.student_at(0).nome == "Zoe"
+
+    controllers.atualizar_aluno_campos(ana, {"nome": "Bia"})
+    controllers.remover_aluno(ana)
+    qapp.processEvents()
+    _wait_workers(qapp)
+    # The lookup started by the update must not bring the student back.
+    assert page.model.rowCount() == 0
+    assert not page._lookups
+    notifier.close()
+
+
+def test_alunos_page_feedback_does_not_race_change_events(tmp_path, qapp, monkeypatch):
+    try:
+        gui_qt = import_module("ia_sarah.core.interfaces.views.gui_qt")
+        events_qt = import_module("ia_sarah.core.interfaces.views.events_qt")
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    from ia_sarah.core.use_cases import controllers
+
+    controllers.db.DB_NAME = str(tmp_path / "test_gui.db")
+    controllers.init_app()
+    controllers.adicionar_aluno("Ana", "ana@test.com")
+    controllers.adicionar_aluno("Bia", "bia@test.com")
+    notifier = events_qt.ChangeNotifier()
+    page = gui_qt.AlunosPage(notifier)
+    _wait_workers(qapp)
+
+    class Dialogo:
+        def __init__(self, parent=None):
+            pass
+
+        def exec(self):
+            return gui_qt.QDialog.Accepted
+
+        def get_data(self):
+            return {"nome": "Beto", "email": "beto@test.com"}
+
+    def modal(*_args, **_kwargs):
+        # Like a message box, run the event loop while it is open.
+        qapp.processEvents()
+        _wait_workers(qapp)
+
+    monkeypatch.setattr(gui_qt, "FullStudentDialog", Dialogo)
+    monkeypatch.setattr(gui_qt, "show_feedback", modal)
+
+    def nomes():
+        return [page.model.student_at(r).nome for r in range(page.model.rowCount())]
+
+    page.adicionar()
+    _wait_workers(qapp)
+    assert nomes() == ["Ana", "Beto", "Bia"]
+
+    page.table.selectRow(0)
+    page.excluir()
+    _wait_workers(qapp)
+    assert nomes() == ["Beto", "Bia"]
+    notifier.close()
+
+
+def test_planos_page_refresh_does_not_cancel_export(tmp_path, qapp, monkeypatch):
+    try:
+        gui_qt = import_module("ia_sarah.core.interfaces.views.gui_qt")
+    except Exception as exc:  # pragma: no cover - env issues
+        pytest.skip(f"PySide6 not available: {exc}")
+    import threading
+
+    from ia_sarah.core.use_cases import controllers
+
+    controllers.db.DB_NAME = str(tmp_path / "test_gui.db")
+    controllers.init_app()
+    aluno_id = controllers.adicionar_aluno("Joao", "joao@test.com")
+    controllers.adicionar_plano(aluno_id, "A", "", "[]")
+    page = gui_qt.PlanosPage(aluno_id)
+    _wait_workers(qapp)
+    page.table.selectRow(0)
+
+    liberar = threading.Event()
+    mensagens = []
+    monkeypatch.setattr(gui_qt.QInputDialog, "getItem", lambda *a, **k: ("csv", True))
+    monkeypatch.setattr(
+        gui_qt.QFileDialog,
+        "getSaveFileName",
+        lambda *a, **k: (str(tmp_path / "a.csv"), ""),
+    )
+    monkeypatch.setattr(controllers, "exportar_treino", lambda *a, **k: liberar.wait(5))
+    monkeypatch.setattr(
+        gui_qt, "show_feedback", lambda _, msg, error=False: mensagens.append(msg)
+    )
+    page.exportar()
+    page.load_data()
+    liberar.set()
+    _wait_workers(qapp)
+    assert mensagens == ["Exportação concluída!"]
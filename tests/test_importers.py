@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import openpyxl
+
+from ia_sarah.core.adapters.services import importers
+from ia_sarah.core.use_cases import controllers
+
+
+def test_importar_csv(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    arquivo = tmp_path / "alunos.csv"
+    arquivo.write_text(
+        "nome;email;plano\n"
+        "Ana;ana@test.com;Mensal\n"
+        ";sem@nome.com;\n"
+        "Bia;invalido;\n"
+        "Caio;caio@test.com;\n",
+        encoding="utf-8",
+    )
+    report = controllers.importar_alunos_arquivo(arquivo, tamanho_lote=2)
+    assert report.inseridos == 2
+    assert [linha for linha, _ in report.erros] == [3, 4]
+    nomes = [a.nome for a in controllers.listar_alunos()]
+    assert nomes == ["Ana", "Caio"]
+
+
+def test_importar_jsonl_e_xlsx(tmp_path):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    jsonl = tmp_path / "alunos.jsonl"
+    jsonl.write_text(
+        '{"nome": "Ana", "email": "ana@test.com", "data_inicio": "2024-01-02"}\n'
+        "{quebrado\n"
+        '{"nome": "Bia", "email": "bia@test.com", "data_inicio": "02/01/2024"}\n',
+        encoding="utf-8",
+    )
+    report = controllers.importar_alunos_arquivo(jsonl)
+    assert report.inseridos == 1
+    assert [linha for linha, _ in report.erros] == [2, 3]
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["nome", "email"])
+    ws.append(["Caio", "caio@test.com"])
+    ws.append(["Davi", "davi@test.com"])
+    xlsx = tmp_path / "alunos.xlsx"
+    wb.save(xlsx)
+    report = controllers.importar_alunos_arquivo(xlsx)
+    assert report.inseridos == 2 and report.erros == []
+    assert controllers.contar_alunos() == 3
+
+
+def test_formato_nao_suportado(tmp_path):
+    try:
+        importers.ler_registros(tmp_path / "alunos.txt")
+    except ValueError:
+        pass
+    else:
+        assert False, "expected ValueError"
@@ -0,0 +1,169 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import ia_sarah.core.use_cases.controllers as controllers
+import ia_sarah.core.use_cases.jobs as jobs
+
+
+@pytest.fixture
+def fila(tmp_path, monkeypatch):
+    controllers.db.DB_NAME = str(tmp_path / "test.db")
+    controllers.init_app()
+    monkeypatch.setattr(jobs, "JOBS_DIR", tmp_path / "jobs")
+    monkeypatch.setattr(jobs, "_TAREFAS", dict(jobs._TAREFAS))
+    filas = []
+
+    def criar(**kwargs):
+        kwargs.setdefault("intervalo", 0.02)
+        fila = jobs.JobQueue(**kwargs)
+        filas.append(fila)
+        fila.start()
+        return fila
+
+    yield criar
+    for fila in filas:
+        fila.stop()
+
+
+def _aguardar(job_id, timeout=5.0):
+    fim = time.monotonic() + timeout
+    while time.monotonic() < fim:
+        job = jobs.obter(job_id)
+        if job.status in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} não terminou: {jobs.obter(job_id)}")
+
+
+def test_job_exportar_treino(fila):
+    fila(workers=1)
+    job_id = jobs.enviar(
+        "exportar_treino",
+        {"fmt": "csv", "titulo": "A", "exercicios": [{"nome": "Supino"}]},
+    )
+    job = _aguardar(job_id)
+    assert job.status == "done" and job.tentativas == 1
+    assert Path(job.resultado).read_text(encoding="utf-8").startswith("nome")
+
+
+def test_job_retry_then_fail(fila):
+    chamadas = []
+
+    def instavel(params, saida, progresso):
+        chamadas.append(1)
+        if len(chamadas) < 2:
+            raise RuntimeError("falha temporária")
+        return None
+
+    def quebrada(params, saida, progresso):
+        raise RuntimeError("sempre falha")
+
+    jobs.registrar_tarefa("instavel", instavel)
+    jobs.registrar_tarefa("quebrada", quebrada)
+    fila(workers=1, retry_delay=0.01)
+
+    job = _aguardar(jobs.enviar("instavel", {}))
+    assert job.status == "done" and job.tentativas == 2
+
+    job = _aguardar(jobs.enviar("quebrada", {}, max_tentativas=2))
+    assert job.status == "failed" and job.tentativas == 2
+    assert job.erro == "sempre falha"
+
+
+def test_job_concurrency_limit(fila):
+    ativos = 0
+    pico = 0
+    lock = threading.Lock()
+
+    def lenta(params, saida, progresso):
+        nonlocal ativos, pico
+        with lock:
+            ativos += 1
+            pico = max(pico, ativos)
+        time.sleep(0.05)
+        with lock:
+            ativos -= 1
+
+    jobs.registrar_tarefa("lenta", lenta)
+    fila(workers=3, limites={"lenta": 1})
+    ids = [jobs.enviar("lenta", {}) for _ in range(4)]
+    assert all(_aguardar(i).status == "done" for i in ids)
+    assert pico == 1
+
+
+def test_unknown_job_type(fila):
+    with pytest.raises(KeyError):
+        jobs.enviar("inexistente", {})
+
+
+def test_job_aluno_com_plano_pdf_nao_duplica_em_retry(fila, monkeypatch):
+    exportar = controllers.exportar_treino
+    chamadas = []
+
+    def falha_na_primeira(*args, **kwargs):
+        chamadas.append(1)
+        if len(chamadas) == 1:
+            raise RuntimeError("falha ao renderizar")
+        return exportar(*args, **kwargs)
+
+    monkeypatch.setattr(controllers, "exportar_treino", falha_na_primeira)
+    fila(workers=1, retry_delay=0.01)
+    job = _aguardar(
+        jobs.enviar(
+            "aluno_com_plano_pdf",
+            {"nome": "Ana", "email": "ana@test.com", "plano": "Força"},
+        )
+    )
+    assert job.status == "done" and job.tentativas == 2
+    assert controllers.contar_alunos() == 1
+    assert len(controllers.listar_planos(job.params["aluno_id"])) == 1
+
+
+def test_job_importar_alunos_nao_repete(fila, monkeypatch):
+    def quebra(*args, **kwargs):
+        raise RuntimeError("disco cheio")
+
+    monkeypatch.setattr(controllers, "importar_alunos", quebra)
+    job_id = jobs.enviar("importar_alunos", {"registros": []}, max_tentativas=3)
+    assert jobs.obter(job_id).max_tentativas == 1
+    fila(workers=1, retry_delay=0.01)
+    job = _aguardar(job_id)
+    assert job.status == "failed" and job.tentativas == 1
+
+
+def test_job_interrompido_na_ultima_tentativa_falha(fila):
+    unica = jobs.enviar("importar_alunos", {"registros": []})
+    outra = jobs.enviar("backup", {})
+    controllers.db.reservar_job(0)
+    controllers.db.reservar_job(0)
+    assert controllers.db.reiniciar_jobs_interrompidos() == 2
+    assert jobs.obter(unica).status == "failed"
+    assert jobs.obter(outra).status == "pending"
+
+
+def test_reserva_nao_segura_a_condicao(fila, monkeypatch):
+    reservando = threading.Event()
+    liberar = threading.Event()
+    reservar = controllers.db.reservar_job
+
+    def lenta(*args, **kwargs):
+        reservando.set()
+        liberar.wait(5)
+        return reservar(*args, **kwargs)
+
+    monkeypatch.setattr(controllers.db, "reservar_job", lenta)
+    f = fila(workers=1)
+    assert reservando.wait(5)
+    avisou = threading.Thread(target=f.notify)
+    avisou.start()
+    avisou.join(1)
+    try:
+        assert not avisou.is_alive()
+    finally:
+        liberar.set()
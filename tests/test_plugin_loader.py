@@ -1,11 +1,12 @@
 import importlib
+import os
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 import ia_sarah.core.plugin_loader as loader
-from ia_sarah.core.plugin_loader import load_entrypoints, list_plugins
+from ia_sarah.core.plugin_loader import list_plugins, load_entrypoints
 
 
 class Dummy:
@@ -59,3 +60,76 @@ def test_reload_entrypoints(monkeypatch):
     )
     loader.reload_entrypoints("dummy")
     assert list_plugins("dummy") == ["dummy2"]
+
+
+def test_discover_does_not_load(monkeypatch):
+    loader._CACHE = {}
+    carregados = []
+    eps = [
+        type(
+            "ep",
+            (),
+            {"name": "lento", "load": lambda self: carregados.append(1) or Dummy},
+        )()
+    ]
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group=None: eps)
+    assert list(loader.discover_entrypoints("dummy")) == ["lento"]
+    assert carregados == []
+    registry = {}
+    load_entrypoints("dummy", lambda n, o: registry.update({n: o}))
+    assert registry == {"lento": Dummy} and carregados == [1]
+    loader._CACHE = {}
+
+
+def _reset(monkeypatch, cache_file):
+    monkeypatch.setattr(loader, "PLUGIN_CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(loader, "_CACHE", {})
+    monkeypatch.setattr(loader, "_LOADED", {})
+    monkeypatch.setattr(loader, "_TIMINGS", {})
+    monkeypatch.setattr(loader, "_disk", None)
+
+
+def test_discovery_cached_on_disk(tmp_path, monkeypatch):
+    cache_file = tmp_path / "plugins.json"
+    eps = [
+        importlib.metadata.EntryPoint("um", "json:dumps", "grupo"),
+        importlib.metadata.EntryPoint("dois", "json:loads", "grupo"),
+    ]
+    _reset(monkeypatch, cache_file)
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group=None: eps)
+    assert list_plugins("grupo") == ["um", "dois"]
+    assert cache_file.exists()
+
+    # A new process with the same distributions does not scan again.
+    _reset(monkeypatch, cache_file)
+
+    def sem_scan(group=None):
+        raise AssertionError("entry points scanned despite valid cache")
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", sem_scan)
+    registry = {}
+    load_entrypoints("grupo", lambda n, o: registry.update({n: o}), threads=2)
+    import json
+
+    assert registry == {"um": json.dumps, "dois": json.loads}
+    assert set(loader.plugin_timings()) == {"grupo:um", "grupo:dois"}
+
+    # Installing or removing a distribution invalidates the cache.
+    _reset(monkeypatch, cache_file)
+    monkeypatch.setattr(loader, "_fingerprint", lambda: "outro")
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group=None: [])
+    assert list_plugins("grupo") == []
+
+
+def test_fingerprint_follows_entry_points_file(tmp_path, monkeypatch):
+    info = tmp_path / "plugin_x-1.0.dist-info"
+    info.mkdir()
+    arquivo = info / "entry_points.txt"
+    arquivo.write_text("[grupo]\num = json:dumps\n")
+    monkeypatch.setattr(sys, "path", [str(tmp_path)])
+    antes = loader._fingerprint()
+    mtime = info.stat().st_mtime_ns
+    arquivo.write_text("[grupo]\ndois = json:loads\n")
+    os.utime(arquivo, ns=(mtime + 10**9, mtime + 10**9))
+    os.utime(info, ns=(mtime, mtime))
+    assert loader._fingerprint() != antes
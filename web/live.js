@@ -0,0 +1,57 @@
+// Keep the dashboard numbers in sync with the API through /events.
+// The API address can be overridden with ?api=http://host:port.
+(function () {
+    "use strict";
+
+    var params = new URLSearchParams(window.location.search);
+    var API = params.get("api") || "http://localhost:8001";
+    var totalEl = document.getElementById("total-alunos");
+    var total = null;
+
+    function render() {
+        if (totalEl && total !== null) {
+            totalEl.textContent = String(total);
+        }
+    }
+
+    function loadStats() {
+        fetch(API + "/stats?limit=0")
+            .then(function (resp) { return resp.json(); })
+            .then(function (stats) {
+                total = stats.total_alunos;
+                render();
+            })
+            .catch(function () { /* API offline: keep the static numbers */ });
+    }
+
+    function applyChange(change) {
+        if (change.entity === "dados") {
+            loadStats();
+            return;
+        }
+        if (change.entity !== "aluno") {
+            return;
+        }
+        if (change.id === null || total === null) {
+            // Batch import or nothing loaded yet: ask for the real count.
+            loadStats();
+        } else if (change.action === "created") {
+            total += 1;
+            render();
+        } else if (change.action === "deleted") {
+            total -= 1;
+            render();
+        }
+    }
+
+    loadStats();
+    if (!window.EventSource) {
+        return;
+    }
+    var source = new EventSource(API + "/events");
+    source.addEventListener("change", function (msg) {
+        applyChange(JSON.parse(msg.data));
+    });
+    // Events were missed: start over.
+    source.addEventListener("reset", loadStats);
+})();